@@ -1,10 +1,14 @@
 """
 Aplicação Flask principal para o Sistema de Análise da Timemania.
 """
+import os
 from flask import Flask
 from dotenv import load_dotenv
 import config
 from routes import main_bp, api_bp
+from routes.api_routes import atualizacao_service
+from models.resultado_model import devolver_conexoes
+from commands import registrar_comandos
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -18,6 +22,19 @@ app.config['JSON_SORT_KEYS'] = False
 app.register_blueprint(main_bp)
 app.register_blueprint(api_bp)
 
+# Registrar comandos da CLI (flask exportar ...)
+registrar_comandos(app)
+
+# Devolver ao pool, no fim de cada requisição ou comando, as conexões com o banco
+@app.teardown_appcontext
+def liberar_conexoes(exc):
+    """Devolve ao pool as conexões usadas pela requisição."""
+    devolver_conexoes()
+
+# Agendador de atualizações (no modo debug, só no processo do reloader que serve as requisições)
+if config.AGENDADOR_ATIVO and (not config.DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+    atualizacao_service.iniciar_agendador()
+
 # Rota de teste/health check
 @app.route('/health')
 def health_check():
@@ -41,9 +58,11 @@ if __name__ == '__main__':
 ║   - GET  /                  -> Página principal        ║
 ║   - GET  /palpites          -> Gerar palpites          ║
 ║   - POST /api/atualizar     -> Atualizar base          ║
+║   - GET  /api/atualizar/ID  -> Progresso               ║
 ║   - GET  /api/estatisticas  -> Estatísticas            ║
 ║   - POST /api/gerar-palpite -> Gerar palpite           ║
 ║   - POST /api/conferir      -> Conferir palpite        ║
+║   - GET  /api/exportar      -> Exportar histórico      ║
 ║                                                        ║
 ║   Cores da Timemania:                                  ║
 ║   - Amarelo: #FFF600 (números)                         ║
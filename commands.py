@@ -0,0 +1,121 @@
+"""
+Comandos de linha de comando (flask <comando>) do sistema de análise da Timemania.
+"""
+import json
+import sys
+import click
+from flask import Flask
+import config
+from models.resultado_model import ResultadoModel
+from services.backtest_service import BacktestService
+from services.estatistica_service import EstatisticaService
+from services.exportacao_service import ExportacaoService
+from services.simulacao_service import SimulacaoService
+
+
+def registrar_comandos(app: Flask):
+    """
+    Registra os comandos na CLI do Flask.
+    
+    Args:
+        app: Aplicação Flask
+    """
+    
+    @app.cli.command('exportar')
+    @click.option('--formato', type=click.Choice(ExportacaoService.FORMATOS), default='ndjson',
+                  help='Formato da exportação')
+    @click.option('--inicio', type=int, default=None, help='Primeiro concurso (inclusive)')
+    @click.option('--fim', type=int, default=None, help='Último concurso (inclusive)')
+    @click.option('--fields', default=None, help='Colunas separadas por vírgula (padrão: todas)')
+    @click.option('--saida', type=click.Path(dir_okay=False), default=None,
+                  help='Arquivo de saída (padrão: saída padrão)')
+    def exportar(formato, inicio, fim, fields, saida):
+        """Exporta o histórico de resultados em NDJSON ou CSV."""
+        campos = None
+        if fields:
+            campos = [c.strip() for c in fields.split(',') if c.strip()]
+            invalidos = [c for c in campos if c not in ResultadoModel.CAMPOS]
+            if invalidos:
+                raise click.BadParameter(f'Campos inválidos: {", ".join(invalidos)}', param_hint='--fields')
+        
+        linhas = ExportacaoService().exportar(formato, inicio, fim, campos)
+        
+        if saida:
+            with open(saida, 'w', encoding='utf-8', newline='') as arquivo:
+                arquivo.writelines(linhas)
+        else:
+            sys.stdout.writelines(linhas)
+    
+    @app.cli.command('reconstruir-estatisticas')
+    @click.option('--verificar', is_flag=True,
+                  help='Só compara os agregados persistidos com um recálculo completo')
+    def reconstruir_estatisticas(verificar):
+        """Recalcula do zero as tabelas de estatísticas (ou confere se estão consistentes)."""
+        estatistica_service = EstatisticaService()
+        
+        if verificar:
+            resultado = estatistica_service.verificar_agregados()
+            if resultado['consistente']:
+                click.echo('Estatísticas consistentes com o histórico.')
+            else:
+                click.echo(f'Estatísticas divergentes: {", ".join(resultado["divergencias"])}')
+                sys.exit(1)
+            return
+        
+        if not estatistica_service.resultado_model.reconstruir_estatisticas():
+            raise click.ClickException('Erro ao reconstruir estatísticas')
+        click.echo('Estatísticas reconstruídas.')
+    
+    @app.cli.command('backtest')
+    @click.option('--estrategias', default=None,
+                  help='Estratégias separadas por vírgula (padrão: todas)')
+    @click.option('--numeros', type=click.IntRange(config.MIN_JOGO, config.MAX_JOGO), default=10,
+                  help='Quantidade de números por jogo')
+    @click.option('--jogos', type=click.IntRange(min=1), default=100,
+                  help='Jogos por estratégia em cada concurso')
+    @click.option('--inicio', type=int, default=None, help='Primeiro concurso avaliado')
+    @click.option('--fim', type=int, default=None, help='Último concurso avaliado')
+    @click.option('--semente', type=click.IntRange(min=0), default=None, help='Semente do backtest')
+    @click.option('--processos', type=click.IntRange(min=0), default=None,
+                  help='Processos em paralelo (0 = um por CPU, 1 = sem pool)')
+    def backtest(estrategias, numeros, jogos, inicio, fim, semente, processos):
+        """Avalia as estratégias de palpites nos concursos passados."""
+        if estrategias:
+            estrategias = [e.strip() for e in estrategias.split(',') if e.strip()]
+        
+        try:
+            resultado = BacktestService().executar(
+                estrategias, numeros, jogos, inicio, fim, semente, processos
+            )
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        
+        click.echo(json.dumps(resultado, ensure_ascii=False, indent=2))
+    
+    @app.cli.command('simular')
+    @click.option('--estrategias', default=None,
+                  help='Estratégias separadas por vírgula (padrão: todas)')
+    @click.option('--numeros', type=click.IntRange(config.MIN_JOGO, config.MAX_JOGO), default=10,
+                  help='Quantidade de números por jogo')
+    @click.option('--sorteios', type=click.IntRange(min=1), default=100000,
+                  help='Sorteios simulados')
+    @click.option('--jogos', type=click.IntRange(min=1), default=1,
+                  help='Jogos por estratégia em cada sorteio')
+    @click.option('--semente', type=click.IntRange(min=0), default=None, help='Semente da simulação')
+    @click.option('--processos', type=click.IntRange(min=0), default=None,
+                  help='Processos em paralelo (0 = um por CPU, 1 = sem pool)')
+    @click.option('--confianca', type=click.FloatRange(0, 1, min_open=True, max_open=True), default=0.95,
+                  help='Nível de confiança dos intervalos')
+    def simular(estrategias, numeros, sorteios, jogos, semente, processos, confianca):
+        """Compara as estratégias com jogos aleatórios em sorteios simulados."""
+        if estrategias:
+            estrategias = [e.strip() for e in estrategias.split(',') if e.strip()]
+        
+        try:
+            resultado = SimulacaoService().executar(
+                estrategias, numeros, sorteios, jogos, semente, processos, confianca
+            )
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        
+        click.echo(json.dumps(resultado, ensure_ascii=False, indent=2))
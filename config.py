@@ -15,12 +15,51 @@ PORT = int(os.getenv('PORT', 5058))
 
 # Configurações do Banco de Dados
 DATABASE_PATH = os.getenv('DATABASE_PATH', str(BASE_DIR / 'database.db'))
+DATABASE_TIMEOUT = float(os.getenv('DATABASE_TIMEOUT', 30))
+DATABASE_CACHE_COMANDOS = 128
+DATABASE_POOL_TAMANHO = int(os.getenv('DATABASE_POOL_TAMANHO', 8))  # conexões por processo
+TAMANHO_LOTE_INSERCAO = int(os.getenv('TAMANHO_LOTE_INSERCAO', 100))
+
+# Paginação de /api/resultados
+RESULTADOS_POR_PAGINA = 100
+RESULTADOS_MAX_POR_PAGINA = 1000
+
+# Geração de palpites em lote (/api/gerar-palpites-lote e /api/gerar-palpite/stream)
+PALPITES_LOTE_MAX_JOGOS = int(os.getenv('PALPITES_LOTE_MAX_JOGOS', 200000))
+PALPITES_STREAM_MAX_JOGOS = int(os.getenv('PALPITES_STREAM_MAX_JOGOS', 5000000))
+PALPITES_STREAM_BLOCO = int(os.getenv('PALPITES_STREAM_BLOCO', 1000))  # jogos sorteados por vez
+
+# Conferência em lote (/api/conferir-lote)
+CONFERENCIA_MAX_PALPITES = int(os.getenv('CONFERENCIA_MAX_PALPITES', 10000))
+
+# Backtest das estratégias (flask backtest)
+BACKTEST_PROCESSOS = int(os.getenv('BACKTEST_PROCESSOS', 0))  # 0 = um por CPU
+BACKTEST_HISTORICO_MINIMO = int(os.getenv('BACKTEST_HISTORICO_MINIMO', 100))  # concursos antes do primeiro avaliado
+
+# Simulação de Monte Carlo das estratégias (flask simular)
+SIMULACAO_PROCESSOS = int(os.getenv('SIMULACAO_PROCESSOS', 0))  # 0 = um por CPU
 
 # API da Caixa
 API_TIMEMANIA_URL = os.getenv(
     'API_TIMEMANIA_URL',
     'https://servicebus2.caixa.gov.br/portaldeloterias/api/timemania'
 )
+API_TIMEOUT = float(os.getenv('API_TIMEOUT', 10))
+API_PARALELISMO = int(os.getenv('API_PARALELISMO', 8))
+API_TENTATIVAS = int(os.getenv('API_TENTATIVAS', 3))
+API_BACKOFF = float(os.getenv('API_BACKOFF', 0.5))
+API_CACHE_ATIVO = os.getenv('API_CACHE_ATIVO', 'True') == 'True'
+API_CACHE_DIR = os.getenv('API_CACHE_DIR', str(BASE_DIR / 'cache_api'))
+
+# Sincronização do histórico
+SYNC_MAX_TENTATIVAS = int(os.getenv('SYNC_MAX_TENTATIVAS', 5))
+SYNC_LIMITE_POR_EXECUCAO = int(os.getenv('SYNC_LIMITE_POR_EXECUCAO', 0))  # 0 = sem limite
+
+# Agendador de atualizações (sorteios às terças, quintas e sábados à noite)
+AGENDADOR_ATIVO = os.getenv('AGENDADOR_ATIVO', 'False') == 'True'
+AGENDADOR_DIAS_SORTEIO = (1, 3, 5)  # datetime.weekday(): 0 = segunda
+AGENDADOR_HORA_INICIO = int(os.getenv('AGENDADOR_HORA_INICIO', 20))
+AGENDADOR_INTERVALO_MINUTOS = int(os.getenv('AGENDADOR_INTERVALO_MINUTOS', 30))
 
 # Constantes da Timemania
 MIN_NUMEROS = 1
@@ -29,6 +68,7 @@ NUMEROS_SORTEADOS = 7
 MIN_JOGO = 10
 MAX_JOGO = 15
 TOTAL_TIMES = 80
+PRECO_APOSTA = float(os.getenv('PRECO_APOSTA', 3.50))  # usado no valor esperado (/api/probabilidades)
 
 # Identidade Visual da Timemania
 COR_PRINCIPAL_AMARELO = '#FFF600'
@@ -96,5 +136,6 @@ ESTRATEGIAS = [
     'mista',
     'atrasados',
     'por_faixa',
-    'por_posicao'
+    'por_posicao',
+    'coocorrencia'
 ]
@@ -1,6 +1,7 @@
 """
 Módulo de modelos para o sistema de análise da Timemania.
 """
-from models.resultado_model import ResultadoModel
+from models.matriz_sorteios import MatrizSorteios
+from models.resultado_model import ResultadoModel, SnapshotResultados
 
-__all__ = ['ResultadoModel']
+__all__ = ['MatrizSorteios', 'ResultadoModel', 'SnapshotResultados']
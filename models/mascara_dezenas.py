@@ -0,0 +1,121 @@
+"""
+Máscaras de bits de 80 posições para sorteios e palpites da Timemania.
+
+Um conjunto de dezenas vira um inteiro de 80 bits (bit d - 1 ligado se a
+dezena d está no conjunto). Em NumPy, cada máscara ocupa duas palavras
+uint64 (dezenas 1-64 e 65-80), então o histórico inteiro cabe em 16 bytes
+por concurso. Interseção é um AND e a quantidade de acertos é a contagem
+de bits (popcount) do resultado.
+"""
+from typing import Iterable, List
+import numpy as np
+import config
+
+# Palavras uint64 por máscara
+PALAVRAS_MASCARA = 2
+
+# Quantidade de bits ligados de cada valor de 16 bits
+_BITS_POR_VALOR = np.array([bin(valor).count('1') for valor in range(1 << 16)], dtype=np.uint8)
+
+
+def criar_mascara(numeros: Iterable[int]) -> int:
+    """
+    Monta a máscara de um conjunto de dezenas.
+    
+    Args:
+        numeros: Dezenas (1-80); valores fora da faixa são ignorados
+        
+    Returns:
+        Inteiro de 80 bits
+    """
+    mascara = 0
+    for numero in numeros:
+        numero = int(numero)
+        if config.MIN_NUMEROS <= numero <= config.MAX_NUMEROS:
+            mascara |= 1 << (numero - 1)
+    return mascara
+
+
+def numeros_da_mascara(mascara: int) -> List[int]:
+    """
+    Lista as dezenas de uma máscara.
+    
+    Args:
+        mascara: Inteiro de 80 bits
+        
+    Returns:
+        Dezenas em ordem crescente
+    """
+    return [bit + 1 for bit in range(config.MAX_NUMEROS) if mascara >> bit & 1]
+
+
+def contar_bits(mascara: int) -> int:
+    """
+    Conta os bits ligados de uma máscara (quantidade de dezenas).
+    
+    Args:
+        mascara: Inteiro de 80 bits
+        
+    Returns:
+        Quantidade de bits ligados
+    """
+    return bin(mascara).count('1')
+
+
+def palavras_da_mascara(mascara: int) -> np.ndarray:
+    """
+    Converte uma máscara inteira nas palavras uint64 usadas em NumPy.
+    
+    Args:
+        mascara: Inteiro de 80 bits
+        
+    Returns:
+        Vetor (2,) uint64
+    """
+    return np.array([mascara & 0xFFFFFFFFFFFFFFFF, mascara >> 64], dtype=np.uint64)
+
+
+def mascara_das_palavras(palavras: np.ndarray) -> int:
+    """
+    Converte as palavras uint64 de uma máscara de volta em inteiro.
+    
+    Args:
+        palavras: Vetor (2,) uint64
+        
+    Returns:
+        Inteiro de 80 bits
+    """
+    return int(palavras[0]) | int(palavras[1]) << 64
+
+
+def empacotar_incidencia(incidencia: np.ndarray) -> np.ndarray:
+    """
+    Converte uma matriz de incidência (N, 80) em máscaras (N, 2) uint64.
+    
+    Args:
+        incidencia: Matriz (N, 80) com 1 nas dezenas presentes
+        
+    Returns:
+        Matriz (N, 2) uint64
+    """
+    largura = PALAVRAS_MASCARA * 64
+    bits = np.zeros((len(incidencia), largura), dtype=np.uint8)
+    bits[:, :incidencia.shape[1]] = incidencia != 0
+    
+    # packbits em ordem 'little' põe a dezena 1 no bit menos significativo de cada byte
+    return np.packbits(bits, axis=1, bitorder='little').view('<u8').astype(np.uint64)
+
+
+def contar_bits_palavras(palavras: np.ndarray) -> np.ndarray:
+    """
+    Conta os bits ligados de máscaras em palavras uint64, por tabela de 16 bits.
+    
+    Args:
+        palavras: Array (..., 2) uint64
+        
+    Returns:
+        Array (...) com a quantidade de bits ligados de cada máscara
+    """
+    palavras = np.ascontiguousarray(palavras, dtype=np.uint64)
+    contagens = _BITS_POR_VALOR[palavras.view(np.uint16)]
+    return contagens.reshape(*palavras.shape[:-1], -1).sum(axis=-1, dtype=np.int64)
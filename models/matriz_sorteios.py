@@ -0,0 +1,261 @@
+"""
+Representação matricial do histórico de sorteios da Timemania para cálculos vetorizados.
+"""
+import re
+from datetime import date, datetime
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import config
+from models.mascara_dezenas import empacotar_incidencia
+
+
+class MatrizSorteios:
+    """
+    Histórico de sorteios em matrizes NumPy, em ordem cronológica
+    (linha 0 = concurso mais antigo).
+    
+    Atributos:
+        concursos: Vetor (N,) com o número de cada concurso
+        incidencia: Matriz (N, 80) uint8; incidencia[i, d - 1] == 1 se a dezena d saiu
+        posicoes: Matriz (N, 7) uint8 com as dezenas na ordem do sorteio (0 = ausente)
+        times: Vetor (N,) com o código do time do coração (-1 = ausente)
+        nomes_times: Nomes dos times, indexados pelo código
+        datas: Vetor (N,) datetime64[D] com a data de apuração
+        premios: Matriz (N, 8) com o prêmio por aposta de cada quantidade de
+            acertos (0 fora das faixas premiadas), de listaRateioPremio
+        premios_time: Vetor (N,) com o prêmio da faixa Time do Coração
+    
+    mascaras guarda cada sorteio como máscara de 80 bits (duas palavras
+    uint64): o histórico inteiro ocupa 16 bytes por concurso e acertos
+    viram contagem de bits (ver models.mascara_dezenas).
+    
+    As somas acumuladas (frequencia_acumulada, posicoes_acumuladas,
+    times_acumulados) têm uma linha a mais que a matriz: a linha i soma os
+    concursos das linhas 0..i-1, então a contagem de qualquer janela de
+    linhas [inicio, fim) é acumulado[fim] - acumulado[inicio].
+    """
+    
+    def __init__(self, resultados: List[Dict]):
+        """
+        Monta as matrizes a partir dos resultados.
+        
+        Args:
+            resultados: Resultados ordenados do mais recente ao mais antigo
+                (mesma ordem de ResultadoModel.buscar_todos)
+        """
+        total = len(resultados)
+        
+        self.concursos = np.zeros(total, dtype=np.int64)
+        self.incidencia = np.zeros((total, config.MAX_NUMEROS), dtype=np.uint8)
+        self.posicoes = np.zeros((total, config.NUMEROS_SORTEADOS), dtype=np.uint8)
+        self.times = np.full(total, -1, dtype=np.int32)
+        self.nomes_times = []
+        datas = np.full(total, np.datetime64('NaT'), dtype='datetime64[D]')
+        self.premios = np.zeros((total, config.NUMEROS_SORTEADOS + 1))
+        self.premios_time = np.zeros(total)
+        
+        # Códigos de time atribuídos do mais recente ao mais antigo
+        codigos_times = {}
+        
+        for idx, resultado in enumerate(resultados):
+            linha = total - 1 - idx
+            self.concursos[linha] = resultado.get('numero') or 0
+            
+            dezenas = [int(d) for d in resultado.get('listaDezenas', [])]
+            dezenas = [d for d in dezenas if config.MIN_NUMEROS <= d <= config.MAX_NUMEROS]
+            self.incidencia[linha, np.array(dezenas, dtype=np.int64) - 1] = 1
+            
+            ordem = resultado.get('dezenasSorteadasOrdemSorteio', [])[:config.NUMEROS_SORTEADOS]
+            self.posicoes[linha, :len(ordem)] = [int(d) for d in ordem]
+            
+            time = resultado.get('nomeTimeCoracaoMesSorte', '')
+            if time:
+                if time not in codigos_times:
+                    codigos_times[time] = len(self.nomes_times)
+                    self.nomes_times.append(time)
+                self.times[linha] = codigos_times[time]
+            
+            data = self._converter_data(resultado.get('dataApuracao'))
+            if data is not None:
+                datas[linha] = data
+            
+            for faixa in resultado.get('listaRateioPremio') or []:
+                acertos = self._acertos_faixa(faixa)
+                valor = float(faixa.get('valorPremio') or 0)
+                if acertos is None:
+                    continue
+                if acertos == 0:
+                    self.premios_time[linha] = valor
+                else:
+                    self.premios[linha, acertos] = valor
+        
+        # Concursos sem data herdam a do concurso anterior (NaT é o menor inteiro)
+        self.datas = np.maximum.accumulate(datas.view(np.int64)).view('datetime64[D]')
+    
+    @staticmethod
+    def _converter_data(texto: Optional[str]) -> Optional[np.datetime64]:
+        """
+        Converte a data de apuração da API (dd/mm/aaaa).
+        
+        Args:
+            texto: Data como texto
+            
+        Returns:
+            Data ou None se ausente ou inválida
+        """
+        try:
+            return np.datetime64(datetime.strptime(texto, '%d/%m/%Y').date(), 'D')
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def _acertos_faixa(faixa: Dict) -> Optional[int]:
+        """
+        Identifica uma faixa do rateio de prêmios.
+        
+        A descrição ('7 acertos', 'Time do Coração') tem prioridade; sem ela,
+        vale a numeração oficial (faixas 1 a 5 = 7 a 3 acertos, 6 = time).
+        
+        Args:
+            faixa: Item de listaRateioPremio
+            
+        Returns:
+            Quantidade de acertos (3 a 7), 0 para o Time do Coração ou None
+            se a faixa não for reconhecida
+        """
+        descricao = str(faixa.get('descricaoFaixa') or '').lower()
+        encontrado = re.search(r'(\d+)\s*acerto', descricao)
+        if encontrado:
+            acertos = int(encontrado.group(1))
+            return acertos if 3 <= acertos <= config.NUMEROS_SORTEADOS else None
+        if 'time' in descricao:
+            return 0
+        
+        numero = faixa.get('faixa')
+        if isinstance(numero, int) and 1 <= numero <= 5:
+            return config.NUMEROS_SORTEADOS + 1 - numero
+        if numero == 6:
+            return 0
+        return None
+    
+    def __len__(self) -> int:
+        """Quantidade de concursos na matriz."""
+        return len(self.concursos)
+    
+    @cached_property
+    def mascaras(self) -> np.ndarray:
+        """Matriz (N, 2) uint64 com a máscara de bits das dezenas de cada concurso."""
+        return empacotar_incidencia(self.incidencia)
+    
+    def linha_concurso(self, numero: int) -> Optional[int]:
+        """
+        Localiza a linha de um concurso.
+        
+        Args:
+            numero: Número do concurso
+            
+        Returns:
+            Índice da linha ou None se o concurso não estiver na matriz
+        """
+        linha = int(np.searchsorted(self.concursos, numero))
+        if linha < len(self) and self.concursos[linha] == numero:
+            return linha
+        return None
+    
+    @cached_property
+    def frequencia_acumulada(self) -> np.ndarray:
+        """Matriz (N + 1, 80) com a contagem acumulada de cada dezena."""
+        return self._acumular(self.incidencia)
+    
+    @cached_property
+    def incidencia_posicoes(self) -> np.ndarray:
+        """Matriz (N, 7, 80) uint8; [i, p - 1, d - 1] == 1 se a dezena d saiu na posição p."""
+        largura = config.MAX_NUMEROS + 1
+        uma_quente = np.zeros((len(self), config.NUMEROS_SORTEADOS, largura), dtype=np.uint8)
+        linhas, posicoes = np.indices(self.posicoes.shape)
+        uma_quente[linhas, posicoes, self.posicoes] = 1
+        # Coluna 0 = posição ausente
+        return uma_quente[:, :, 1:]
+    
+    @cached_property
+    def posicoes_acumuladas(self) -> np.ndarray:
+        """Matriz (N + 1, 7, 80) com a contagem acumulada de cada dezena por posição."""
+        return self._acumular(self.incidencia_posicoes)
+    
+    @cached_property
+    def times_acumulados(self) -> np.ndarray:
+        """Matriz (N + 1, T) com a contagem acumulada de cada time, indexada pelo código."""
+        uma_quente = np.zeros((len(self), len(self.nomes_times)), dtype=np.uint8)
+        com_time = np.nonzero(self.times >= 0)[0]
+        uma_quente[com_time, self.times[com_time]] = 1
+        return self._acumular(uma_quente)
+    
+    @cached_property
+    def ultima_linha_dezena(self) -> np.ndarray:
+        """Matriz (N, 80) com a última linha <= i em que cada dezena saiu (-1 = nenhuma)."""
+        return self._ultima_linha(self.incidencia)
+    
+    @cached_property
+    def ultima_linha_posicao(self) -> np.ndarray:
+        """Matriz (N, 7, 80) com a última linha <= i em que cada dezena saiu em cada posição."""
+        return self._ultima_linha(self.incidencia_posicoes)
+    
+    @cached_property
+    def ultima_linha_time(self) -> np.ndarray:
+        """Matriz (N, T) com a última linha <= i em que cada time saiu (-1 = nenhuma)."""
+        uma_quente = np.zeros((len(self), len(self.nomes_times)), dtype=np.uint8)
+        com_time = np.nonzero(self.times >= 0)[0]
+        uma_quente[com_time, self.times[com_time]] = 1
+        return self._ultima_linha(uma_quente)
+    
+    def linhas_por_data(
+        self,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> Tuple[int, int]:
+        """
+        Converte um intervalo de datas em um intervalo de linhas [inicio, fim).
+        
+        Args:
+            data_inicio: Primeira data (inclusive; None para o início do histórico)
+            data_fim: Última data (inclusive; None para o fim do histórico)
+            
+        Returns:
+            Tupla (inicio, fim) de linhas
+        """
+        inicio, fim = 0, len(self)
+        if data_inicio is not None:
+            inicio = int(np.searchsorted(self.datas, np.datetime64(data_inicio, 'D'), side='left'))
+        if data_fim is not None:
+            fim = int(np.searchsorted(self.datas, np.datetime64(data_fim, 'D'), side='right'))
+        return inicio, max(inicio, fim)
+    
+    @staticmethod
+    def _acumular(matriz: np.ndarray) -> np.ndarray:
+        """
+        Soma acumulada ao longo das linhas, com uma linha de zeros no início.
+        
+        Args:
+            matriz: Matriz (N, ...) de contagens por concurso
+            
+        Returns:
+            Matriz (N + 1, ...) int32
+        """
+        acumulado = np.zeros((matriz.shape[0] + 1,) + matriz.shape[1:], dtype=np.int32)
+        np.cumsum(matriz, axis=0, dtype=np.int32, out=acumulado[1:])
+        return acumulado
+    
+    @staticmethod
+    def _ultima_linha(matriz: np.ndarray) -> np.ndarray:
+        """
+        Para cada linha i e coluna, a última linha <= i com valor diferente de zero.
+        
+        Args:
+            matriz: Matriz (N, ...) de ocorrências
+            
+        Returns:
+            Matriz (N, ...) int32 (-1 = nenhuma ocorrência até a linha)
+        """
+        linhas = np.arange(matriz.shape[0], dtype=np.int32).reshape((-1,) + (1,) * (matriz.ndim - 1))
+        return np.maximum.accumulate(np.where(matriz > 0, linhas, -1), axis=0).astype(np.int32)
@@ -1,10 +1,87 @@
 """
 Model para armazenar e gerenciar resultados da Timemania no banco de dados SQLite.
 """
+import queue
 import sqlite3
 import json
-from typing import List, Dict, Optional
+import threading
+from collections import Counter
+from itertools import combinations
+from typing import List, Dict, Iterator, Optional, Tuple
 import config
+from models.matriz_sorteios import MatrizSorteios
+
+
+class SnapshotResultados:
+    """
+    Cópia em memória de todos os resultados, do mais recente ao mais antigo.
+    
+    A versão identifica o conteúdo do snapshot: (geração, maior número, total).
+    A geração é um contador gravado no banco junto com cada escrita, então
+    dois snapshots com a mesma versão têm sempre os mesmos dados, mesmo
+    que a escrita tenha vindo de outro processo.
+    """
+    
+    def __init__(self, resultados: List[Dict], geracao: int):
+        """
+        Inicializa o snapshot.
+        
+        Args:
+            resultados: Resultados ordenados do mais recente ao mais antigo
+            geracao: Geração dos dados no banco no momento da carga
+        """
+        self.resultados = tuple(resultados)
+        maior_numero = self.resultados[0].get('numero', 0) if self.resultados else 0
+        self.versao = (geracao, maior_numero, len(self.resultados))
+        self._matriz = None
+    
+    @property
+    def matriz(self) -> MatrizSorteios:
+        """Matrizes NumPy do histórico, montadas na primeira vez que são usadas."""
+        if self._matriz is None:
+            self._matriz = MatrizSorteios(self.resultados)
+        return self._matriz
+
+
+# Snapshots carregados por caminho de banco, compartilhados entre instâncias
+_snapshots: Dict[str, SnapshotResultados] = {}
+_versoes: Dict[str, Tuple[int, int, int]] = {}
+_snapshot_lock = threading.Lock()
+
+# Pool de conexões por caminho de banco: uma fila com config.DATABASE_POOL_TAMANHO
+# vagas, cada uma com uma conexão já aberta ou None (abrir na primeira retirada)
+_pools: Dict[str, queue.LifoQueue] = {}
+_pools_lock = threading.Lock()
+
+# Conexões retiradas do pool pela thread atual, até devolver_conexoes()
+_conexoes_locais = threading.local()
+
+# Bancos cujas tabelas já foram criadas neste processo
+_bancos_inicializados = set()
+_inicializacao_lock = threading.Lock()
+
+
+def devolver_conexoes():
+    """
+    Devolve ao pool as conexões retiradas pela thread atual.
+    
+    Chamada no teardown de cada requisição (app.teardown_appcontext) e no
+    fim das tarefas em segundo plano. Uma transação deixada aberta é
+    desfeita antes de a conexão voltar ao pool.
+    """
+    conexoes = getattr(_conexoes_locais, 'conexoes', None)
+    if not conexoes:
+        return
+    
+    for db_path, conn in list(conexoes.items()):
+        del conexoes[db_path]
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            conn = None
+        _pools[db_path].put(conn)
 
 
 class ResultadoModel:
@@ -12,14 +89,115 @@ class ResultadoModel:
     Classe para gerenciar resultados da Timemania no banco de dados SQLite.
     """
     
+    # Colunas da tabela resultados que podem ser projetadas em buscar_pagina
+    CAMPOS = (
+        'numero',
+        'acumulado',
+        'dataApuracao',
+        'dataProximoConcurso',
+        'dezenasSorteadasOrdemSorteio',
+        'exibirDetalhamentoPorCidade',
+        'indicadorConcursoEspecial',
+        'listaDezenas',
+        'listaDezenasSegundoSorteio',
+        'listaMunicipioUFGanhadores',
+        'listaRateioPremio',
+        'localSorteio',
+        'nomeMunicipioUFSorteio',
+        'nomeTimeCoracaoMesSorte',
+        'time_coracao_nome',
+        'time_coracao_numero',
+        'numeroConcursoAnterior',
+        'numeroConcursoFinal_0_5',
+        'numeroConcursoProximo',
+        'numeroJogo',
+        'tipoJogo',
+        'valorArrecadado',
+        'valorAcumuladoConcurso_0_5',
+        'valorAcumuladoProximoConcurso',
+        'valorEstimadoProximoConcurso'
+    )
+    
+    # Versão do conteúdo das tabelas estatisticas_*; mudar força a reconstrução
+    VERSAO_ESTATISTICAS = 2
+    
     def __init__(self):
         """Inicializa o modelo e cria a tabela se não existir."""
         self.db_path = config.DATABASE_PATH
-        self._criar_tabela()
+        
+        if self.db_path not in _bancos_inicializados:
+            with _inicializacao_lock:
+                if self.db_path not in _bancos_inicializados:
+                    self._criar_tabela()
+                    self._migrar_dezenas()
+                    self._migrar_estatisticas()
+                    _bancos_inicializados.add(self.db_path)
+                    
+                    # A criação roda na importação; não prender uma vaga do pool
+                    devolver_conexoes()
+    
+    def _conectar(self) -> sqlite3.Connection:
+        """
+        Retorna a conexão da thread atual com o banco, retirando-a do pool na
+        primeira chamada.
+        
+        A conexão fica com a thread até devolver_conexoes() (no fim de cada
+        requisição, pelo teardown da aplicação). As conexões do pool são
+        abertas uma vez, com journal WAL (leitores não bloqueiam o escritor)
+        e cache de comandos preparados, e reaproveitadas entre requisições.
+        Com todas as vagas em uso, espera até config.DATABASE_TIMEOUT.
+        
+        Returns:
+            Conexão SQLite da thread atual
+            
+        Raises:
+            sqlite3.OperationalError: Se nenhuma conexão vagar a tempo
+        """
+        conexoes = getattr(_conexoes_locais, 'conexoes', None)
+        if conexoes is None:
+            conexoes = _conexoes_locais.conexoes = {}
+        
+        conn = conexoes.get(self.db_path)
+        if conn is not None:
+            return conn
+        
+        pool = _pools.get(self.db_path)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(self.db_path)
+                if pool is None:
+                    pool = queue.LifoQueue()
+                    for _ in range(max(1, config.DATABASE_POOL_TAMANHO)):
+                        pool.put(None)
+                    _pools[self.db_path] = pool
+        
+        try:
+            conn = pool.get(timeout=config.DATABASE_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError('Nenhuma conexão livre no pool do banco de dados')
+        
+        if conn is None:
+            try:
+                # A conexão passa entre threads, mas só uma a usa por vez
+                conn = sqlite3.connect(
+                    self.db_path,
+                    timeout=config.DATABASE_TIMEOUT,
+                    cached_statements=config.DATABASE_CACHE_COMANDOS,
+                    check_same_thread=False
+                )
+                conn.row_factory = sqlite3.Row
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            except Exception:
+                pool.put(None)
+                raise
+        
+        conexoes[self.db_path] = conn
+        return conn
     
     def _criar_tabela(self):
-        """Cria a tabela de resultados se não existir."""
-        conn = sqlite3.connect(self.db_path)
+        """Cria as tabelas de resultados, de dezenas, de estatísticas e de sincronização se não existirem."""
+        conn = self._conectar()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -52,8 +230,161 @@ class ResultadoModel:
             )
         ''')
         
+        # Uma linha por dezena sorteada, para consultas indexadas por dezena e posição
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS dezenas (
+                numero_concurso INTEGER NOT NULL,
+                posicao INTEGER NOT NULL,
+                dezena INTEGER NOT NULL,
+                PRIMARY KEY (numero_concurso, posicao)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_dezenas_dezena
+            ON dezenas (dezena, numero_concurso)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_dezenas_posicao
+            ON dezenas (posicao, dezena)
+        ''')
+        
+        # Busca do último concurso de cada time do coração
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_resultados_time
+            ON resultados (nomeTimeCoracaoMesSorte, numero)
+        ''')
+        
+        # Agregados mantidos de forma incremental pelas gravações
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estatisticas_dezenas (
+                dezena INTEGER PRIMARY KEY,
+                frequencia INTEGER NOT NULL,
+                ultimo_concurso INTEGER
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estatisticas_posicoes (
+                posicao INTEGER NOT NULL,
+                dezena INTEGER NOT NULL,
+                frequencia INTEGER NOT NULL,
+                PRIMARY KEY (posicao, dezena)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estatisticas_times (
+                nome TEXT PRIMARY KEY,
+                frequencia INTEGER NOT NULL,
+                ultimo_concurso INTEGER
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estatisticas_pares (
+                dezena_a INTEGER NOT NULL,
+                dezena_b INTEGER NOT NULL,
+                frequencia INTEGER NOT NULL,
+                PRIMARY KEY (dezena_a, dezena_b)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estatisticas_trios (
+                dezena_a INTEGER NOT NULL,
+                dezena_b INTEGER NOT NULL,
+                dezena_c INTEGER NOT NULL,
+                frequencia INTEGER NOT NULL,
+                PRIMARY KEY (dezena_a, dezena_b, dezena_c)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_trios_frequencia
+            ON estatisticas_trios (frequencia DESC, dezena_a, dezena_b, dezena_c)
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estatisticas_estado (
+                chave TEXT PRIMARY KEY,
+                valor INTEGER NOT NULL
+            )
+        ''')
+        
+        # Estado da sincronização com a API: concursos que falharam e checkpoint
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sincronizacao_falhas (
+                numero INTEGER PRIMARY KEY,
+                tentativas INTEGER NOT NULL,
+                ultimo_erro TEXT,
+                atualizado_em TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sincronizacao_estado (
+                chave TEXT PRIMARY KEY,
+                valor TEXT
+            )
+        ''')
+        
         conn.commit()
-        conn.close()
+    
+    def _migrar_dezenas(self):
+        """
+        Preenche a tabela de dezenas para os concursos que ainda não estão nela,
+        a partir das colunas JSON da tabela de resultados.
+        """
+        conn = self._conectar()
+        
+        rows = conn.execute('''
+            SELECT numero, listaDezenas, dezenasSorteadasOrdemSorteio
+            FROM resultados
+            WHERE numero NOT IN (SELECT DISTINCT numero_concurso FROM dezenas)
+        ''').fetchall()
+        
+        if not rows:
+            return
+        
+        linhas = []
+        for row in rows:
+            resultado = self._row_to_dict(row)
+            linhas.extend(self._linhas_dezenas(resultado))
+        
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO dezenas (numero_concurso, posicao, dezena) VALUES (?, ?, ?)',
+                linhas
+            )
+        
+        print(f"Tabela de dezenas migrada: {len(rows)} concursos")
+    
+    def _migrar_estatisticas(self):
+        """
+        Preenche as tabelas de estatísticas na primeira execução após a sua
+        criação ou após uma mudança de VERSAO_ESTATISTICAS.
+        """
+        conn = self._conectar()
+        
+        row = conn.execute(
+            "SELECT valor FROM estatisticas_estado WHERE chave = 'versao'"
+        ).fetchone()
+        if row is None or row[0] < self.VERSAO_ESTATISTICAS:
+            self.reconstruir_estatisticas()
+    
+    def _linhas_dezenas(self, resultado: Dict) -> List[Tuple[int, int, int]]:
+        """
+        Monta as linhas da tabela de dezenas para um resultado.
+        
+        A posição segue a ordem do sorteio; quando ela não está disponível,
+        segue a ordem de listaDezenas.
+        
+        Args:
+            resultado: Dicionário com os dados do resultado
+            
+        Returns:
+            Lista de tuplas (numero_concurso, posicao, dezena)
+        """
+        dezenas = resultado.get('dezenasSorteadasOrdemSorteio') or resultado.get('listaDezenas') or []
+        numero = resultado.get('numero')
+        
+        return [
+            (numero, posicao, int(dezena))
+            for posicao, dezena in enumerate(dezenas, start=1)
+        ]
     
     def inserir(self, resultado: Dict) -> bool:
         """
@@ -65,62 +396,433 @@ class ResultadoModel:
         Returns:
             True se a operação foi bem-sucedida, False caso contrário
         """
+        return self.inserir_lote([resultado]) > 0
+    
+    def inserir_lote(self, resultados: List[Dict]) -> int:
+        """
+        Insere ou atualiza vários resultados em uma única transação.
+        
+        Args:
+            resultados: Lista de dicionários com os dados dos resultados da API
+            
+        Returns:
+            Quantidade de resultados gravados (0 se o lote foi desfeito por erro)
+        """
+        if not resultados:
+            return 0
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conn = self._conectar()
             
-            # Extrair time do coração
-            time_coracao_nome = resultado.get('nomeTimeCoracaoMesSorte', '')
-            time_coracao_numero = self._extrair_numero_time(time_coracao_nome)
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO resultados (
-                    numero, acumulado, dataApuracao, dataProximoConcurso,
-                    dezenasSorteadasOrdemSorteio, exibirDetalhamentoPorCidade,
-                    indicadorConcursoEspecial, listaDezenas, listaDezenasSegundoSorteio,
-                    listaMunicipioUFGanhadores, listaRateioPremio, localSorteio,
-                    nomeMunicipioUFSorteio, nomeTimeCoracaoMesSorte, time_coracao_nome,
-                    time_coracao_numero, numeroConcursoAnterior, numeroConcursoFinal_0_5,
-                    numeroConcursoProximo, numeroJogo, tipoJogo, valorArrecadado,
-                    valorAcumuladoConcurso_0_5, valorAcumuladoProximoConcurso,
-                    valorEstimadoProximoConcurso
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                resultado.get('numero'),
-                resultado.get('acumulado'),
-                resultado.get('dataApuracao'),
-                resultado.get('dataProximoConcurso'),
-                json.dumps(resultado.get('dezenasSorteadasOrdemSorteio', [])),
-                resultado.get('exibirDetalhamentoPorCidade'),
-                resultado.get('indicadorConcursoEspecial'),
-                json.dumps(resultado.get('listaDezenas', [])),
-                json.dumps(resultado.get('listaDezenasSegundoSorteio')),
-                json.dumps(resultado.get('listaMunicipioUFGanhadores', [])),
-                json.dumps(resultado.get('listaRateioPremio', [])),
-                resultado.get('localSorteio'),
-                resultado.get('nomeMunicipioUFSorteio'),
-                resultado.get('nomeTimeCoracaoMesSorte'),
-                time_coracao_nome,
-                time_coracao_numero,
-                resultado.get('numeroConcursoAnterior'),
-                resultado.get('numeroConcursoFinal_0_5'),
-                resultado.get('numeroConcursoProximo'),
-                resultado.get('numeroJogo'),
-                resultado.get('tipoJogo'),
-                resultado.get('valorArrecadado'),
-                resultado.get('valorAcumuladoConcurso_0_5'),
-                resultado.get('valorAcumuladoProximoConcurso'),
-                resultado.get('valorEstimadoProximoConcurso')
-            ))
-            
-            conn.commit()
-            conn.close()
+            # Commit ao sair do bloco; rollback de todo o lote em caso de erro
+            with conn:
+                anteriores = self._ler_anteriores(conn, resultados)
+                
+                conn.executemany(
+                    'DELETE FROM dezenas WHERE numero_concurso = ?',
+                    [(resultado.get('numero'),) for resultado in resultados]
+                )
+                conn.executemany(
+                    'INSERT OR REPLACE INTO dezenas (numero_concurso, posicao, dezena) VALUES (?, ?, ?)',
+                    [
+                        linha
+                        for resultado in resultados
+                        for linha in self._linhas_dezenas(resultado)
+                    ]
+                )
+                conn.executemany('''
+                    INSERT OR REPLACE INTO resultados (
+                        numero, acumulado, dataApuracao, dataProximoConcurso,
+                        dezenasSorteadasOrdemSorteio, exibirDetalhamentoPorCidade,
+                        indicadorConcursoEspecial, listaDezenas, listaDezenasSegundoSorteio,
+                        listaMunicipioUFGanhadores, listaRateioPremio, localSorteio,
+                        nomeMunicipioUFSorteio, nomeTimeCoracaoMesSorte, time_coracao_nome,
+                        time_coracao_numero, numeroConcursoAnterior, numeroConcursoFinal_0_5,
+                        numeroConcursoProximo, numeroJogo, tipoJogo, valorArrecadado,
+                        valorAcumuladoConcurso_0_5, valorAcumuladoProximoConcurso,
+                        valorEstimadoProximoConcurso
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [self._parametros_insercao(resultado) for resultado in resultados])
+                
+                self._atualizar_estatisticas(conn, anteriores, resultados)
+                self._incrementar_geracao(conn)
+            
+            self.invalidar_snapshot()
+            return len(resultados)
+            
+        except Exception as e:
+            print(f"Erro ao inserir lote de {len(resultados)} resultados: {e}")
+            return 0
+    
+    def _parametros_insercao(self, resultado: Dict) -> Tuple:
+        """
+        Monta os parâmetros do INSERT da tabela de resultados.
+        
+        Args:
+            resultado: Dicionário com os dados do resultado da API
+            
+        Returns:
+            Tupla na ordem das colunas do INSERT
+        """
+        # Extrair time do coração
+        time_coracao_nome = resultado.get('nomeTimeCoracaoMesSorte', '')
+        time_coracao_numero = self._extrair_numero_time(time_coracao_nome)
+        
+        return (
+            resultado.get('numero'),
+            resultado.get('acumulado'),
+            resultado.get('dataApuracao'),
+            resultado.get('dataProximoConcurso'),
+            json.dumps(resultado.get('dezenasSorteadasOrdemSorteio', [])),
+            resultado.get('exibirDetalhamentoPorCidade'),
+            resultado.get('indicadorConcursoEspecial'),
+            json.dumps(resultado.get('listaDezenas', [])),
+            json.dumps(resultado.get('listaDezenasSegundoSorteio')),
+            json.dumps(resultado.get('listaMunicipioUFGanhadores', [])),
+            json.dumps(resultado.get('listaRateioPremio', [])),
+            resultado.get('localSorteio'),
+            resultado.get('nomeMunicipioUFSorteio'),
+            resultado.get('nomeTimeCoracaoMesSorte'),
+            time_coracao_nome,
+            time_coracao_numero,
+            resultado.get('numeroConcursoAnterior'),
+            resultado.get('numeroConcursoFinal_0_5'),
+            resultado.get('numeroConcursoProximo'),
+            resultado.get('numeroJogo'),
+            resultado.get('tipoJogo'),
+            resultado.get('valorArrecadado'),
+            resultado.get('valorAcumuladoConcurso_0_5'),
+            resultado.get('valorAcumuladoProximoConcurso'),
+            resultado.get('valorEstimadoProximoConcurso')
+        )
+    
+    def _ler_anteriores(self, conn: sqlite3.Connection, resultados: List[Dict]) -> Dict[int, Tuple]:
+        """
+        Lê o que já está gravado para os concursos de um lote, antes de substituí-los.
+        
+        Args:
+            conn: Conexão com a transação do lote
+            resultados: Resultados que serão gravados
+            
+        Returns:
+            Dicionário numero -> (linhas (posicao, dezena), nome do time) dos
+            concursos que já existiam
+        """
+        anteriores = {}
+        for numero in {resultado.get('numero') for resultado in resultados}:
+            row = conn.execute(
+                'SELECT nomeTimeCoracaoMesSorte FROM resultados WHERE numero = ?', (numero,)
+            ).fetchone()
+            if row is None:
+                continue
+            
+            linhas = conn.execute(
+                'SELECT posicao, dezena FROM dezenas WHERE numero_concurso = ?', (numero,)
+            ).fetchall()
+            anteriores[numero] = ([tuple(linha) for linha in linhas], row[0])
+        
+        return anteriores
+    
+    def _atualizar_estatisticas(
+        self,
+        conn: sqlite3.Connection,
+        anteriores: Dict[int, Tuple],
+        resultados: List[Dict]
+    ):
+        """
+        Aplica às tabelas de estatísticas a diferença causada por um lote.
+        
+        Os contadores recebem só o delta (contribuição nova menos a antiga dos
+        concursos substituídos); o último concurso é relido pelos índices
+        apenas para as dezenas e os times presentes nos concursos gravados ou
+        substituídos (mesmo com delta zero, o último concurso pode mudar).
+        
+        Args:
+            conn: Conexão com a transação do lote
+            anteriores: Retorno de _ler_anteriores, lido antes da gravação
+            resultados: Resultados gravados
+        """
+        # Em caso de número repetido no lote, prevalece o último (como no INSERT OR REPLACE)
+        novos = {resultado.get('numero'): resultado for resultado in resultados}
+        
+        delta_dezenas = Counter()
+        delta_posicoes = Counter()
+        delta_times = Counter()
+        delta_pares = Counter()
+        delta_trios = Counter()
+        
+        for linhas, time in anteriores.values():
+            for posicao, dezena in linhas:
+                delta_dezenas[dezena] -= 1
+                delta_posicoes[(posicao, dezena)] -= 1
+            if time:
+                delta_times[time] -= 1
+            sorteadas = sorted({dezena for _, dezena in linhas})
+            delta_pares.subtract(combinations(sorteadas, 2))
+            delta_trios.subtract(combinations(sorteadas, 3))
+        
+        for resultado in novos.values():
+            linhas = self._linhas_dezenas(resultado)
+            for _, posicao, dezena in linhas:
+                delta_dezenas[dezena] += 1
+                delta_posicoes[(posicao, dezena)] += 1
+            time = resultado.get('nomeTimeCoracaoMesSorte', '')
+            if time:
+                delta_times[time] += 1
+            sorteadas = sorted({dezena for _, _, dezena in linhas})
+            delta_pares.update(combinations(sorteadas, 2))
+            delta_trios.update(combinations(sorteadas, 3))
+        
+        dezenas = [(dezena, delta) for dezena, delta in delta_dezenas.items() if delta]
+        times = [(time, delta) for time, delta in delta_times.items() if delta]
+        
+        conn.executemany('''
+            INSERT INTO estatisticas_dezenas (dezena, frequencia) VALUES (?, ?)
+            ON CONFLICT(dezena) DO UPDATE SET frequencia = frequencia + excluded.frequencia
+        ''', dezenas)
+        conn.executemany('''
+            UPDATE estatisticas_dezenas
+            SET ultimo_concurso = (SELECT MAX(numero_concurso) FROM dezenas WHERE dezena = ?)
+            WHERE dezena = ?
+        ''', [(dezena, dezena) for dezena in delta_dezenas])
+        
+        conn.executemany('''
+            INSERT INTO estatisticas_posicoes (posicao, dezena, frequencia) VALUES (?, ?, ?)
+            ON CONFLICT(posicao, dezena) DO UPDATE SET frequencia = frequencia + excluded.frequencia
+        ''', [(posicao, dezena, delta) for (posicao, dezena), delta in delta_posicoes.items() if delta])
+        
+        conn.executemany('''
+            INSERT INTO estatisticas_times (nome, frequencia) VALUES (?, ?)
+            ON CONFLICT(nome) DO UPDATE SET frequencia = frequencia + excluded.frequencia
+        ''', times)
+        conn.executemany('''
+            UPDATE estatisticas_times
+            SET ultimo_concurso = (
+                SELECT MAX(numero) FROM resultados WHERE nomeTimeCoracaoMesSorte = ?
+            )
+            WHERE nome = ?
+        ''', [(time, time) for time in delta_times])
+        
+        conn.executemany('''
+            INSERT INTO estatisticas_pares (dezena_a, dezena_b, frequencia) VALUES (?, ?, ?)
+            ON CONFLICT(dezena_a, dezena_b) DO UPDATE SET frequencia = frequencia + excluded.frequencia
+        ''', [par + (delta,) for par, delta in delta_pares.items() if delta])
+        conn.executemany('''
+            INSERT INTO estatisticas_trios (dezena_a, dezena_b, dezena_c, frequencia) VALUES (?, ?, ?, ?)
+            ON CONFLICT(dezena_a, dezena_b, dezena_c) DO UPDATE SET frequencia = frequencia + excluded.frequencia
+        ''', [trio + (delta,) for trio, delta in delta_trios.items() if delta])
+        
+        conn.execute('''
+            INSERT INTO estatisticas_estado (chave, valor) VALUES ('total_concursos', ?)
+            ON CONFLICT(chave) DO UPDATE SET valor = valor + excluded.valor
+        ''', (len(novos) - len(anteriores),))
+        
+        # Contadores zerados (concursos corrigidos) não têm mais ocorrências
+        conn.execute('DELETE FROM estatisticas_dezenas WHERE frequencia <= 0')
+        conn.execute('DELETE FROM estatisticas_posicoes WHERE frequencia <= 0')
+        conn.execute('DELETE FROM estatisticas_times WHERE frequencia <= 0')
+        conn.executemany(
+            'DELETE FROM estatisticas_pares WHERE dezena_a = ? AND dezena_b = ? AND frequencia <= 0',
+            [par for par, delta in delta_pares.items() if delta < 0]
+        )
+        conn.executemany(
+            'DELETE FROM estatisticas_trios WHERE dezena_a = ? AND dezena_b = ? AND dezena_c = ? AND frequencia <= 0',
+            [trio for trio, delta in delta_trios.items() if delta < 0]
+        )
+    
+    @staticmethod
+    def _incrementar_geracao(conn: sqlite3.Connection):
+        """
+        Avança a geração dos dados, na mesma transação da escrita.
+        
+        Todos os processos que usam o banco comparam a geração a cada leitura
+        (versao_dados, obter_snapshot), então a escrita de um processo
+        invalida os snapshots e caches dos demais.
+        
+        Args:
+            conn: Conexão com a transação da escrita aberta
+        """
+        conn.execute('''
+            INSERT INTO estatisticas_estado (chave, valor) VALUES ('geracao_dados', 1)
+            ON CONFLICT(chave) DO UPDATE SET valor = valor + 1
+        ''')
+    
+    def _geracao_banco(self) -> int:
+        """
+        Lê a geração dos dados gravada no banco (uma consulta pela chave primária).
+        
+        Returns:
+            Geração atual (0 se o banco nunca foi escrito)
+        """
+        row = self._conectar().execute(
+            "SELECT valor FROM estatisticas_estado WHERE chave = 'geracao_dados'"
+        ).fetchone()
+        return row[0] if row else 0
+    
+    def reconstruir_estatisticas(self) -> bool:
+        """
+        Recalcula do zero as tabelas de estatísticas a partir dos resultados gravados.
+        
+        Returns:
+            True se a operação foi bem-sucedida, False caso contrário
+        """
+        try:
+            conn = self._conectar()
+            with conn:
+                conn.execute('DELETE FROM estatisticas_dezenas')
+                conn.execute('''
+                    INSERT INTO estatisticas_dezenas (dezena, frequencia, ultimo_concurso)
+                    SELECT dezena, COUNT(*), MAX(numero_concurso)
+                    FROM dezenas
+                    GROUP BY dezena
+                ''')
+                
+                conn.execute('DELETE FROM estatisticas_posicoes')
+                conn.execute('''
+                    INSERT INTO estatisticas_posicoes (posicao, dezena, frequencia)
+                    SELECT posicao, dezena, COUNT(*)
+                    FROM dezenas
+                    GROUP BY posicao, dezena
+                ''')
+                
+                conn.execute('DELETE FROM estatisticas_times')
+                conn.execute('''
+                    INSERT INTO estatisticas_times (nome, frequencia, ultimo_concurso)
+                    SELECT nomeTimeCoracaoMesSorte, COUNT(*), MAX(numero)
+                    FROM resultados
+                    WHERE nomeTimeCoracaoMesSorte IS NOT NULL AND nomeTimeCoracaoMesSorte != ''
+                    GROUP BY nomeTimeCoracaoMesSorte
+                ''')
+                
+                conn.execute('DELETE FROM estatisticas_pares')
+                conn.execute('''
+                    INSERT INTO estatisticas_pares (dezena_a, dezena_b, frequencia)
+                    SELECT a.dezena, b.dezena, COUNT(*)
+                    FROM dezenas a
+                    JOIN dezenas b ON b.numero_concurso = a.numero_concurso AND b.dezena > a.dezena
+                    GROUP BY a.dezena, b.dezena
+                ''')
+                
+                conn.execute('DELETE FROM estatisticas_trios')
+                conn.execute('''
+                    INSERT INTO estatisticas_trios (dezena_a, dezena_b, dezena_c, frequencia)
+                    SELECT a.dezena, b.dezena, c.dezena, COUNT(*)
+                    FROM dezenas a
+                    JOIN dezenas b ON b.numero_concurso = a.numero_concurso AND b.dezena > a.dezena
+                    JOIN dezenas c ON c.numero_concurso = a.numero_concurso AND c.dezena > b.dezena
+                    GROUP BY a.dezena, b.dezena, c.dezena
+                ''')
+                
+                conn.execute('''
+                    INSERT OR REPLACE INTO estatisticas_estado (chave, valor)
+                    SELECT 'total_concursos', COUNT(*) FROM resultados
+                ''')
+                conn.execute(
+                    "INSERT OR REPLACE INTO estatisticas_estado (chave, valor) VALUES ('versao', ?)",
+                    (self.VERSAO_ESTATISTICAS,)
+                )
+                self._incrementar_geracao(conn)
+            
+            self.invalidar_snapshot()
             return True
             
         except Exception as e:
-            print(f"Erro ao inserir resultado: {e}")
+            print(f"Erro ao reconstruir estatísticas: {e}")
             return False
     
+    def obter_estatisticas(self) -> Dict:
+        """
+        Lê os agregados mantidos pelas gravações, sem percorrer o histórico.
+        
+        O atraso é a quantidade de concursos gravados depois do último
+        concurso em que a dezena (ou o time) saiu.
+        
+        Returns:
+            Dicionário com:
+            - total_concursos: Quantidade de concursos
+            - dezenas: Lista de (dezena, frequencia, atraso) das dezenas já sorteadas
+            - posicoes: Lista de (posicao, dezena, frequencia)
+            - times: Lista de (nome, frequencia, atraso), do sorteado mais
+              recentemente ao mais antigo
+        """
+        try:
+            conn = self._conectar()
+            
+            row = conn.execute(
+                "SELECT valor FROM estatisticas_estado WHERE chave = 'total_concursos'"
+            ).fetchone()
+            
+            dezenas = conn.execute('''
+                SELECT e.dezena, e.frequencia,
+                       (SELECT COUNT(*) FROM resultados r WHERE r.numero > e.ultimo_concurso)
+                FROM estatisticas_dezenas e
+            ''').fetchall()
+            
+            posicoes = conn.execute(
+                'SELECT posicao, dezena, frequencia FROM estatisticas_posicoes'
+            ).fetchall()
+            
+            times = conn.execute('''
+                SELECT e.nome, e.frequencia,
+                       (SELECT COUNT(*) FROM resultados r WHERE r.numero > e.ultimo_concurso)
+                FROM estatisticas_times e
+                ORDER BY e.ultimo_concurso DESC
+            ''').fetchall()
+            
+            return {
+                'total_concursos': row[0] if row else 0,
+                'dezenas': [tuple(linha) for linha in dezenas],
+                'posicoes': [tuple(linha) for linha in posicoes],
+                'times': [tuple(linha) for linha in times]
+            }
+            
+        except Exception as e:
+            print(f"Erro ao obter estatísticas: {e}")
+            return {'total_concursos': 0, 'dezenas': [], 'posicoes': [], 'times': []}
+    
+    def obter_pares(self) -> List[Tuple[int, int, int]]:
+        """
+        Lê a contagem de coocorrência de todos os pares de dezenas que já saíram juntos.
+        
+        Returns:
+            Lista de (dezena_a, dezena_b, frequencia), com dezena_a < dezena_b
+        """
+        try:
+            conn = self._conectar()
+            rows = conn.execute(
+                'SELECT dezena_a, dezena_b, frequencia FROM estatisticas_pares'
+            ).fetchall()
+            return [tuple(row) for row in rows]
+            
+        except Exception as e:
+            print(f"Erro ao obter pares de dezenas: {e}")
+            return []
+    
+    def buscar_trios_frequentes(self, limite: int = 10) -> List[Tuple[int, int, int, int]]:
+        """
+        Busca os trios de dezenas que mais saíram juntos.
+        
+        Args:
+            limite: Quantidade de trios
+            
+        Returns:
+            Lista de (dezena_a, dezena_b, dezena_c, frequencia), da maior para a
+            menor frequência
+        """
+        try:
+            conn = self._conectar()
+            rows = conn.execute('''
+                SELECT dezena_a, dezena_b, dezena_c, frequencia
+                FROM estatisticas_trios
+                ORDER BY frequencia DESC, dezena_a, dezena_b, dezena_c
+                LIMIT ?
+            ''', (limite,)).fetchall()
+            return [tuple(row) for row in rows]
+            
+        except Exception as e:
+            print(f"Erro ao buscar trios de dezenas: {e}")
+            return []
+    
     def buscar_ultimo(self) -> Optional[Dict]:
         """
         Busca o último resultado cadastrado.
@@ -129,15 +831,12 @@ class ResultadoModel:
             Dicionário com o último resultado ou None se não houver dados
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._conectar()
             cursor = conn.cursor()
             
             cursor.execute('SELECT * FROM resultados ORDER BY numero DESC LIMIT 1')
             row = cursor.fetchone()
             
-            conn.close()
-            
             if row:
                 return self._row_to_dict(row)
             return None
@@ -157,8 +856,7 @@ class ResultadoModel:
             Lista de dicionários com os resultados
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._conectar()
             cursor = conn.cursor()
             
             if limite:
@@ -167,7 +865,6 @@ class ResultadoModel:
                 cursor.execute('SELECT * FROM resultados ORDER BY numero DESC')
             
             rows = cursor.fetchall()
-            conn.close()
             
             return [self._row_to_dict(row) for row in rows]
             
@@ -175,6 +872,195 @@ class ResultadoModel:
             print(f"Erro ao buscar resultados: {e}")
             return []
     
+    def buscar_pagina(
+        self,
+        limite: int,
+        apos: Optional[int] = None,
+        antes: Optional[int] = None,
+        campos: Optional[List[str]] = None
+    ) -> Tuple[List[Dict], bool]:
+        """
+        Busca uma página de resultados por cursor (keyset), do mais recente ao mais antigo.
+        
+        Sem cursores, retorna os concursos mais recentes. Com 'antes', retorna
+        os concursos imediatamente anteriores ao cursor; com 'apos' (e sem
+        'antes'), os imediatamente posteriores. Só as colunas pedidas são lidas
+        e decodificadas; 'numero' é sempre incluído.
+        
+        Args:
+            limite: Tamanho da página
+            apos: Retornar só concursos com número maior que este
+            antes: Retornar só concursos com número menor que este
+            campos: Colunas a retornar (None para todas; nomes fora de CAMPOS são ignorados)
+            
+        Returns:
+            Tupla (resultados da página, True se há mais concursos na direção da busca)
+        """
+        try:
+            colunas = self.colunas_projetadas(campos)
+            
+            condicoes = []
+            parametros = []
+            if apos is not None:
+                condicoes.append('numero > ?')
+                parametros.append(apos)
+            if antes is not None:
+                condicoes.append('numero < ?')
+                parametros.append(antes)
+            
+            # Só 'apos': a página é a mais próxima do cursor, então ordena crescente
+            crescente = apos is not None and antes is None
+            
+            sql = f'SELECT {", ".join(colunas)} FROM resultados'
+            if condicoes:
+                sql += ' WHERE ' + ' AND '.join(condicoes)
+            sql += f' ORDER BY numero {"ASC" if crescente else "DESC"} LIMIT ?'
+            parametros.append(limite + 1)
+            
+            conn = self._conectar()
+            cursor = conn.cursor()
+            cursor.execute(sql, parametros)
+            rows = cursor.fetchall()
+            
+            tem_mais = len(rows) > limite
+            rows = rows[:limite]
+            if crescente:
+                rows.reverse()
+            
+            return [self._row_to_dict(row) for row in rows], tem_mais
+            
+        except Exception as e:
+            print(f"Erro ao buscar página de resultados: {e}")
+            return [], False
+    
+    def iterar_resultados(
+        self,
+        inicio: Optional[int] = None,
+        fim: Optional[int] = None,
+        campos: Optional[List[str]] = None,
+        decodificar: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Percorre os resultados em ordem crescente de concurso, lendo do cursor
+        do SQLite aos poucos, sem carregar o histórico inteiro na memória.
+        
+        Usa uma conexão própria, fechada ao fim da iteração.
+        
+        Args:
+            inicio: Primeiro concurso (inclusive; None para o primeiro)
+            fim: Último concurso (inclusive; None para o último)
+            campos: Colunas a retornar (None para todas; nomes fora de CAMPOS são ignorados)
+            decodificar: Se False, as colunas JSON vêm como texto, como estão no banco
+            
+        Yields:
+            Dicionários com os resultados
+        """
+        condicoes = []
+        parametros = []
+        if inicio is not None:
+            condicoes.append('numero >= ?')
+            parametros.append(inicio)
+        if fim is not None:
+            condicoes.append('numero <= ?')
+            parametros.append(fim)
+        
+        sql = f'SELECT {", ".join(self.colunas_projetadas(campos))} FROM resultados'
+        if condicoes:
+            sql += ' WHERE ' + ' AND '.join(condicoes)
+        sql += ' ORDER BY numero ASC'
+        
+        conn = sqlite3.connect(self.db_path, timeout=config.DATABASE_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(sql, parametros)
+            while True:
+                rows = cursor.fetchmany(config.TAMANHO_LOTE_INSERCAO)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_dict(row) if decodificar else dict(row)
+        finally:
+            conn.close()
+    
+    def colunas_projetadas(self, campos: Optional[List[str]]) -> List[str]:
+        """
+        Monta a lista de colunas de uma projeção, na ordem de CAMPOS.
+        
+        Args:
+            campos: Colunas pedidas (None para todas)
+            
+        Returns:
+            Colunas válidas, sempre começando por 'numero'
+        """
+        if not campos:
+            return list(self.CAMPOS)
+        return ['numero'] + [c for c in self.CAMPOS if c in campos and c != 'numero']
+    
+    def obter_snapshot(self) -> SnapshotResultados:
+        """
+        Retorna o snapshot em memória de todos os resultados.
+        
+        Cada chamada só confere a geração gravada no banco; os resultados
+        são relidos na primeira chamada ou quando a geração mudou (escrita
+        deste ou de outro processo). As demais chamadas devolvem o mesmo objeto.
+        
+        Returns:
+            Snapshot com os resultados e a versão dos dados
+        """
+        geracao = self._geracao_banco()
+        snapshot = _snapshots.get(self.db_path)
+        if snapshot is not None and snapshot.versao[0] == geracao:
+            return snapshot
+        
+        with _snapshot_lock:
+            snapshot = _snapshots.get(self.db_path)
+            if snapshot is None or snapshot.versao[0] != geracao:
+                # Uma escrita entre a leitura da geração e a dos resultados
+                # só faz a próxima chamada recarregar de novo
+                snapshot = SnapshotResultados(self.buscar_todos(), geracao)
+                _snapshots[self.db_path] = snapshot
+            return snapshot
+    
+    def versao_dados(self) -> Tuple[int, int, int]:
+        """
+        Retorna a versão atual dos dados (geração, maior número, total).
+        
+        A cada chamada, só a geração é lida do banco (pela chave primária).
+        Se ela bate com a do snapshot, a versão é a dele; sem snapshot, o
+        maior número e o total são consultados uma vez por geração e
+        guardados em memória. Escritas de outros processos mudam a geração
+        e, com ela, a versão.
+        
+        Returns:
+            Tupla identificando o conteúdo do snapshot atual
+        """
+        try:
+            geracao = self._geracao_banco()
+            
+            snapshot = _snapshots.get(self.db_path)
+            if snapshot is not None and snapshot.versao[0] == geracao:
+                return snapshot.versao
+            
+            versao = _versoes.get(self.db_path)
+            if versao is not None and versao[0] == geracao:
+                return versao
+            
+            # Sem snapshot atual, a versão sai do banco sem ler os resultados
+            row = self._conectar().execute('SELECT MAX(numero), COUNT(*) FROM resultados').fetchone()
+            versao = (geracao, row[0] or 0, row[1])
+            _versoes[self.db_path] = versao
+            return versao
+            
+        except Exception as e:
+            print(f"Erro ao obter versão dos dados: {e}")
+            return self.obter_snapshot().versao
+    
+    def invalidar_snapshot(self):
+        """Descarta o snapshot em memória; a próxima leitura recarrega do banco."""
+        with _snapshot_lock:
+            _snapshots.pop(self.db_path, None)
+            _versoes.pop(self.db_path, None)
+    
     def buscar_por_numero(self, numero: int) -> Optional[Dict]:
         """
         Busca um resultado específico pelo número do concurso.
@@ -186,15 +1072,12 @@ class ResultadoModel:
             Dicionário com o resultado ou None se não encontrado
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._conectar()
             cursor = conn.cursor()
             
             cursor.execute('SELECT * FROM resultados WHERE numero = ?', (numero,))
             row = cursor.fetchone()
             
-            conn.close()
-            
             if row:
                 return self._row_to_dict(row)
             return None
@@ -203,6 +1086,64 @@ class ResultadoModel:
             print(f"Erro ao buscar resultado: {e}")
             return None
     
+    def buscar_ocorrencias_dezena(
+        self,
+        dezena: int,
+        posicao: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Busca os concursos em que uma dezena saiu, do mais recente ao mais antigo.
+        
+        Args:
+            dezena: Dezena procurada (1-80)
+            posicao: Restringe à posição do sorteio (1-7), None para qualquer posição
+            
+        Returns:
+            Lista de {concurso, posicao}
+        """
+        try:
+            conn = self._conectar()
+            
+            if posicao is None:
+                rows = conn.execute('''
+                    SELECT numero_concurso, posicao FROM dezenas
+                    WHERE dezena = ?
+                    ORDER BY numero_concurso DESC
+                ''', (dezena,)).fetchall()
+            else:
+                rows = conn.execute('''
+                    SELECT numero_concurso, posicao FROM dezenas
+                    WHERE posicao = ? AND dezena = ?
+                    ORDER BY numero_concurso DESC
+                ''', (posicao, dezena)).fetchall()
+            
+            return [{'concurso': row[0], 'posicao': row[1]} for row in rows]
+            
+        except Exception as e:
+            print(f"Erro ao buscar ocorrências da dezena {dezena}: {e}")
+            return []
+    
+    def contar_concursos_apos(self, numero: int) -> int:
+        """
+        Conta os concursos cadastrados depois de um número de concurso.
+        Usado para calcular atrasos a partir da tabela de dezenas.
+        
+        Args:
+            numero: Número do concurso de referência
+            
+        Returns:
+            Quantidade de concursos com número maior que o informado
+        """
+        try:
+            conn = self._conectar()
+            return conn.execute(
+                'SELECT COUNT(*) FROM resultados WHERE numero > ?', (numero,)
+            ).fetchone()[0]
+            
+        except Exception as e:
+            print(f"Erro ao contar concursos: {e}")
+            return 0
+    
     def _row_to_dict(self, row: sqlite3.Row) -> Dict:
         """
         Converte uma linha do banco em dicionário.
@@ -255,15 +1196,142 @@ class ResultadoModel:
             Número total de resultados
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conectar()
             cursor = conn.cursor()
             
             cursor.execute('SELECT COUNT(*) FROM resultados')
             count = cursor.fetchone()[0]
             
-            conn.close()
             return count
             
         except Exception as e:
             print(f"Erro ao contar resultados: {e}")
             return 0
+    
+    def listar_concursos_faltantes(self, ate: int) -> List[int]:
+        """
+        Detecta os concursos de 1 até `ate` que não estão cadastrados.
+        
+        Args:
+            ate: Maior número de concurso considerado (inclusive)
+            
+        Returns:
+            Números faltantes, do mais recente ao mais antigo
+        """
+        try:
+            conn = self._conectar()
+            rows = conn.execute('''
+                WITH RECURSIVE sequencia(numero) AS (
+                    SELECT 1
+                    UNION ALL
+                    SELECT numero + 1 FROM sequencia WHERE numero < ?
+                )
+                SELECT numero FROM sequencia
+                WHERE numero NOT IN (SELECT numero FROM resultados)
+                ORDER BY numero DESC
+            ''', (ate,)).fetchall()
+            return [row[0] for row in rows]
+            
+        except Exception as e:
+            print(f"Erro ao listar concursos faltantes: {e}")
+            return []
+    
+    def registrar_falhas(self, falhas: Dict[int, str]):
+        """
+        Registra concursos cuja sincronização falhou, incrementando as tentativas.
+        
+        Args:
+            falhas: Dicionário numero -> mensagem de erro
+        """
+        if not falhas:
+            return
+        
+        try:
+            conn = self._conectar()
+            with conn:
+                conn.executemany('''
+                    INSERT INTO sincronizacao_falhas (numero, tentativas, ultimo_erro, atualizado_em)
+                    VALUES (?, 1, ?, datetime('now'))
+                    ON CONFLICT(numero) DO UPDATE SET
+                        tentativas = tentativas + 1,
+                        ultimo_erro = excluded.ultimo_erro,
+                        atualizado_em = excluded.atualizado_em
+                ''', list(falhas.items()))
+            
+        except Exception as e:
+            print(f"Erro ao registrar falhas de sincronização: {e}")
+    
+    def remover_falhas(self, numeros: List[int]):
+        """
+        Remove concursos da lista de falhas (após serem gravados com sucesso).
+        
+        Args:
+            numeros: Números dos concursos
+        """
+        if not numeros:
+            return
+        
+        try:
+            conn = self._conectar()
+            with conn:
+                conn.executemany(
+                    'DELETE FROM sincronizacao_falhas WHERE numero = ?',
+                    [(numero,) for numero in numeros]
+                )
+            
+        except Exception as e:
+            print(f"Erro ao remover falhas de sincronização: {e}")
+    
+    def listar_falhas(self) -> List[Dict]:
+        """
+        Lista os concursos cuja sincronização falhou.
+        
+        Returns:
+            Lista de {numero, tentativas, ultimo_erro, atualizado_em}
+        """
+        try:
+            conn = self._conectar()
+            rows = conn.execute(
+                'SELECT * FROM sincronizacao_falhas ORDER BY numero DESC'
+            ).fetchall()
+            return [dict(row) for row in rows]
+            
+        except Exception as e:
+            print(f"Erro ao listar falhas de sincronização: {e}")
+            return []
+    
+    def salvar_checkpoint(self, checkpoint: Dict):
+        """
+        Persiste o progresso da sincronização em andamento.
+        
+        Args:
+            checkpoint: Dicionário serializável em JSON
+        """
+        try:
+            conn = self._conectar()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sincronizacao_estado (chave, valor) VALUES ('checkpoint', ?)",
+                    (json.dumps(checkpoint),)
+                )
+            
+        except Exception as e:
+            print(f"Erro ao salvar checkpoint de sincronização: {e}")
+    
+    def obter_checkpoint(self) -> Optional[Dict]:
+        """
+        Retorna o último checkpoint de sincronização salvo.
+        
+        Returns:
+            Dicionário do checkpoint ou None se nunca houve sincronização
+        """
+        try:
+            conn = self._conectar()
+            row = conn.execute(
+                "SELECT valor FROM sincronizacao_estado WHERE chave = 'checkpoint'"
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+            
+        except Exception as e:
+            print(f"Erro ao obter checkpoint de sincronização: {e}")
+            return None
@@ -1,9 +1,19 @@
 """
 Rotas da API REST para o sistema de análise da Timemania.
 """
-from flask import Blueprint, jsonify, request
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+import config
 from services.api_caixa_service import ApiCaixaService
+from services.atualizacao_service import AtualizacaoService
 from services.estatistica_service import EstatisticaService
+from services.exportacao_service import ExportacaoService
+from services.probabilidade_service import ProbabilidadeService
 from services.timemania_service import TimemaniaService
 from models.resultado_model import ResultadoModel
 
@@ -12,21 +22,205 @@ api_bp = Blueprint('api', __name__, url_prefix='/api')
 # Instanciar serviços
 api_caixa_service = ApiCaixaService()
 estatistica_service = EstatisticaService()
+exportacao_service = ExportacaoService()
+probabilidade_service = ProbabilidadeService()
 timemania_service = TimemaniaService()
 resultado_model = ResultadoModel()
+atualizacao_service = AtualizacaoService(api_caixa_service)
+
+# Corpos JSON já serializados: chave -> (versão dos dados, corpo, etag), em
+# ordem de uso (LRU); as requisições rodam em threads, então sempre sob o lock
+_respostas_cache: 'OrderedDict[Hashable, Tuple]' = OrderedDict()
+_respostas_cache_lock = threading.Lock()
+MAX_RESPOSTAS_CACHE = 64
+
+
+def _ler_campos() -> Optional[List[str]]:
+    """
+    Lê a projeção de colunas do parâmetro 'fields' (separadas por vírgula).
+    
+    Returns:
+        Lista de colunas ou None se o parâmetro não foi informado
+    
+    Raises:
+        ValueError: Se alguma coluna não existir
+    """
+    if not request.args.get('fields'):
+        return None
+    
+    campos = [c.strip() for c in request.args['fields'].split(',') if c.strip()]
+    invalidos = [c for c in campos if c not in resultado_model.CAMPOS]
+    if invalidos:
+        raise ValueError(f'Campos inválidos: {", ".join(invalidos)}')
+    return campos
+
+
+def _ler_janela() -> Optional[Dict]:
+    """
+    Lê a janela do histórico dos parâmetros 'ultimos', 'de' e 'ate'.
+    
+    Returns:
+        Dicionário com ultimos, de e ate (datas em ISO), ou None para o histórico todo
+    
+    Raises:
+        ValueError: Se algum parâmetro for inválido
+    """
+    ultimos = request.args.get('ultimos')
+    de = request.args.get('de')
+    ate = request.args.get('ate')
+    if not (ultimos or de or ate):
+        return None
+    
+    try:
+        janela = {
+            'ultimos': int(ultimos) if ultimos else None,
+            'de': date.fromisoformat(de).isoformat() if de else None,
+            'ate': date.fromisoformat(ate).isoformat() if ate else None
+        }
+    except ValueError:
+        raise ValueError('Janela inválida: use ultimos=N e datas no formato AAAA-MM-DD')
+    
+    if janela['ultimos'] is not None and janela['ultimos'] < 1:
+        raise ValueError('Janela inválida: ultimos deve ser um inteiro positivo')
+    if janela['de'] and janela['ate'] and janela['de'] > janela['ate']:
+        raise ValueError('Janela inválida: a data inicial é posterior à final')
+    return janela
+
+
+def _chave_janela(janela: Optional[Dict]) -> Optional[Tuple]:
+    """Chave de cache de uma janela lida por _ler_janela."""
+    return (janela['ultimos'], janela['de'], janela['ate']) if janela else None
+
+
+def _filtros_janela(janela: Optional[Dict]) -> Dict:
+    """
+    Converte uma janela lida por _ler_janela nos argumentos dos métodos de janela
+    do EstatisticaService.
+    
+    Args:
+        janela: Janela do histórico (None para o histórico todo)
+    
+    Returns:
+        Dicionário com ultimos, data_inicio e data_fim
+    """
+    if janela is None:
+        return {'ultimos': None, 'data_inicio': None, 'data_fim': None}
+    
+    return {
+        'ultimos': janela['ultimos'],
+        'data_inicio': date.fromisoformat(janela['de']) if janela['de'] else None,
+        'data_fim': date.fromisoformat(janela['ate']) if janela['ate'] else None
+    }
+
+
+def _agregados_janela(janela: Optional[Dict]) -> Dict:
+    """
+    Calcula os agregados estatísticos de uma janela lida por _ler_janela.
+    
+    Args:
+        janela: Janela do histórico (None para o histórico todo)
+    
+    Returns:
+        Agregados para os métodos calcular_* do EstatisticaService
+    """
+    if janela is None:
+        return estatistica_service.calcular_agregados()
+    
+    return estatistica_service.calcular_agregados_janela(**_filtros_janela(janela))
+
+
+def _ler_semente(data: Dict) -> Optional[int]:
+    """
+    Lê a semente opcional de um corpo JSON de geração de palpites.
+    
+    Args:
+        data: Corpo JSON da requisição
+    
+    Returns:
+        Semente ou None se não foi informada
+    
+    Raises:
+        ValueError: Se a semente não for um inteiro não negativo
+    """
+    semente = data.get('semente')
+    if semente is not None and (not isinstance(semente, int) or isinstance(semente, bool) or semente < 0):
+        raise ValueError('A semente deve ser um inteiro não negativo')
+    return semente
+
+
+def _ler_booleano(data: Dict, chave: str) -> bool:
+    """
+    Lê uma opção booleana de um corpo JSON.
+    
+    Args:
+        data: Corpo JSON da requisição
+        chave: Nome da opção (ausente equivale a false)
+    
+    Returns:
+        Valor da opção
+    
+    Raises:
+        ValueError: Se o valor não for um booleano JSON (true ou false)
+    """
+    valor = data.get(chave, False)
+    if not isinstance(valor, bool):
+        raise ValueError(f'{chave} deve ser true ou false')
+    return valor
+
+
+def _resposta_em_cache(chave: Hashable, gerar: Callable[[], Dict]):
+    """
+    Monta uma resposta JSON reaproveitando o corpo serializado enquanto os
+    dados não mudarem, com ETag forte e resposta 304 para If-None-Match.
+    
+    Args:
+        chave: Identifica a resposta (endpoint e parâmetros)
+        gerar: Função que monta o payload quando o cache está desatualizado
+    
+    Returns:
+        Resposta Flask (200 com o corpo ou 304 sem corpo)
+    """
+    versao = resultado_model.versao_dados()
+    
+    with _respostas_cache_lock:
+        entrada = _respostas_cache.get(chave)
+        if entrada is not None:
+            _respostas_cache.move_to_end(chave)
+    
+    if entrada is None or entrada[0] != versao:
+        # Montar fora do lock: payloads lentos não bloqueiam as outras chaves
+        corpo = current_app.json.dumps(gerar()).encode('utf-8')
+        entrada = (versao, corpo, hashlib.sha1(corpo).hexdigest())
+        
+        with _respostas_cache_lock:
+            _respostas_cache[chave] = entrada
+            _respostas_cache.move_to_end(chave)
+            while len(_respostas_cache) > MAX_RESPOSTAS_CACHE:
+                _respostas_cache.popitem(last=False)
+    
+    _, corpo, etag = entrada
+    response = current_app.response_class(corpo, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 
 @api_bp.route('/atualizar', methods=['POST'])
 def atualizar():
     """
-    Atualiza a base de dados com os concursos mais recentes.
+    Inicia a atualização da base de dados em segundo plano.
+    
+    Se já houver uma atualização em andamento, retorna a tarefa existente.
     
     Returns:
-        JSON com resultado da atualização
+        JSON com a tarefa de atualização (acompanhar em GET /api/atualizar/<id>)
     """
     try:
-        resultado = api_caixa_service.atualizar_base_completa()
-        return jsonify(resultado), 200 if resultado.get('sucesso') else 500
+        tarefa = atualizacao_service.iniciar_atualizacao()
+        return jsonify({
+            'sucesso': True,
+            'tarefa': tarefa
+        }), 202
     except Exception as e:
         return jsonify({
             'sucesso': False,
@@ -34,6 +228,60 @@ def atualizar():
         }), 500
 
 
+@api_bp.route('/atualizar', methods=['GET'])
+@api_bp.route('/atualizar/<tarefa_id>', methods=['GET'])
+def status_atualizacao(tarefa_id=None):
+    """
+    Retorna o status e o progresso de uma atualização.
+    
+    Args:
+        tarefa_id: Id da tarefa (padrão: a mais recente)
+    
+    Returns:
+        JSON com status, progresso (baixados, falhas, restantes, taxa),
+        resultado e o checkpoint da última sincronização gravado no banco
+    """
+    try:
+        tarefa = atualizacao_service.obter_status(tarefa_id)
+        checkpoint = resultado_model.obter_checkpoint()
+        if tarefa or (tarefa_id is None and checkpoint):
+            # Sem tarefa em memória (ex.: após reiniciar), o checkpoint mostra
+            # se a última sincronização foi interrompida
+            return jsonify({
+                'sucesso': True,
+                'tarefa': tarefa,
+                'checkpoint': checkpoint
+            }), 200
+        else:
+            return jsonify({
+                'sucesso': False,
+                'mensagem': 'Tarefa de atualização não encontrada'
+            }), 404
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao consultar atualização: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/reprocessar-cache', methods=['POST'])
+def reprocessar_cache():
+    """
+    Regrava no banco os concursos do cache em disco, sem acessar a API.
+    
+    Returns:
+        JSON com o total de concursos no cache e de concursos regravados
+    """
+    try:
+        resultado = api_caixa_service.reprocessar_cache()
+        return jsonify(resultado), 200 if resultado.get('sucesso') else 500
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao reprocessar cache: {str(e)}'
+        }), 500
+
+
 @api_bp.route('/ultimo-resultado', methods=['GET'])
 def ultimo_resultado():
     """
@@ -64,23 +312,58 @@ def ultimo_resultado():
 @api_bp.route('/resultados', methods=['GET'])
 def resultados():
     """
-    Lista resultados com paginação.
+    Lista resultados com paginação por cursor, do mais recente ao mais antigo.
     
     Query params:
-        limite: Quantidade de resultados (padrão: todos)
+        limite: Tamanho da página (padrão: config.RESULTADOS_POR_PAGINA)
+        before: Concursos anteriores a este número (próxima página)
+        after: Concursos posteriores a este número (página anterior)
+        fields: Colunas separadas por vírgula (padrão: todas)
     
     Returns:
-        JSON com lista de resultados
+        JSON com a página de resultados e os cursores das páginas vizinhas
     """
     try:
-        limite = request.args.get('limite', type=int)
-        resultados_list = resultado_model.buscar_todos(limite)
+        limite = request.args.get('limite', config.RESULTADOS_POR_PAGINA, type=int)
+        limite = min(max(1, limite), config.RESULTADOS_MAX_POR_PAGINA)
+        antes = request.args.get('before', type=int)
+        apos = request.args.get('after', type=int)
+        
+        campos = _ler_campos()
+        
+        def gerar():
+            resultados_list, tem_mais = resultado_model.buscar_pagina(limite, apos, antes, campos)
+            
+            # Só 'after' pagina em direção aos mais recentes
+            em_direcao_recentes = apos is not None and antes is None
+            primeiro = resultados_list[0]['numero'] if resultados_list else None
+            ultimo = resultados_list[-1]['numero'] if resultados_list else None
+            
+            if em_direcao_recentes:
+                cursor_before = ultimo
+                cursor_after = primeiro if tem_mais else None
+            else:
+                cursor_before = ultimo if tem_mais else None
+                cursor_after = primeiro if (antes is not None or apos is not None) else None
+            
+            return {
+                'sucesso': True,
+                'total': len(resultados_list),
+                'resultados': resultados_list,
+                'paginacao': {
+                    'limite': limite,
+                    'before': cursor_before,
+                    'after': cursor_after
+                }
+            }
         
+        chave = ('resultados', limite, antes, apos, tuple(campos) if campos else None)
+        return _resposta_em_cache(chave, gerar)
+    except ValueError as e:
         return jsonify({
-            'sucesso': True,
-            'total': len(resultados_list),
-            'resultados': resultados_list
-        }), 200
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'sucesso': False,
@@ -88,6 +371,44 @@ def resultados():
         }), 500
 
 
+@api_bp.route('/exportar', methods=['GET'])
+def exportar():
+    """
+    Exporta o histórico de resultados em streaming, em ordem crescente de concurso.
+    
+    Query params:
+        formato: 'ndjson' (padrão) ou 'csv'
+        inicio: Primeiro concurso (inclusive)
+        fim: Último concurso (inclusive)
+        fields: Colunas separadas por vírgula (padrão: todas)
+    
+    Returns:
+        Resposta em streaming com um concurso por linha
+    """
+    try:
+        formato = request.args.get('formato', 'ndjson')
+        inicio = request.args.get('inicio', type=int)
+        fim = request.args.get('fim', type=int)
+        campos = _ler_campos()
+        
+        linhas = exportacao_service.exportar(formato, inicio, fim, campos)
+        mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+        
+        response = Response(stream_with_context(linhas), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=timemania.{formato}'
+        return response
+    except ValueError as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao exportar resultados: {str(e)}'
+        }), 500
+
+
 @api_bp.route('/resultado/<int:numero>', methods=['GET'])
 def resultado_especifico(numero):
     """
@@ -123,15 +444,32 @@ def estatisticas():
     """
     Retorna todas as estatísticas calculadas.
     
+    Query params:
+        ultimos: Considerar só os N concursos mais recentes
+        de: Data de apuração inicial (AAAA-MM-DD, inclusive)
+        ate: Data de apuração final (AAAA-MM-DD, inclusive)
+    
     Returns:
-        JSON com estatísticas completas
+        JSON com estatísticas completas (do histórico todo ou da janela pedida)
     """
     try:
-        stats = estatistica_service.calcular_estatisticas_completas()
+        janela = _ler_janela()
+        
+        def gerar():
+            return {
+                'sucesso': True,
+                'janela': janela,
+                'estatisticas': estatistica_service.calcular_estatisticas_completas(
+                    _agregados_janela(janela)
+                )
+            }
+        
+        return _resposta_em_cache(('estatisticas', _chave_janela(janela)), gerar)
+    except ValueError as e:
         return jsonify({
-            'sucesso': True,
-            'estatisticas': stats
-        }), 200
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'sucesso': False,
@@ -144,15 +482,218 @@ def estatisticas_times_coracao():
     """
     Retorna estatísticas específicas dos times do coração.
     
+    Query params:
+        ultimos, de, ate: Janela do histórico (ver /api/estatisticas)
+    
     Returns:
         JSON com estatísticas dos times
     """
     try:
-        stats = {
-            'frequencia': estatistica_service.calcular_frequencia_times_coracao(),
-            'mais_sorteados': estatistica_service.calcular_times_mais_sorteados(10),
-            'mais_atrasados': estatistica_service.calcular_times_mais_atrasados(10)
-        }
+        janela = _ler_janela()
+        
+        def gerar():
+            agregados = _agregados_janela(janela)
+            return {
+                'sucesso': True,
+                'janela': janela,
+                'estatisticas': {
+                    'frequencia': estatistica_service.calcular_frequencia_times_coracao(agregados),
+                    'mais_sorteados': estatistica_service.calcular_times_mais_sorteados(10, agregados),
+                    'mais_atrasados': estatistica_service.calcular_times_mais_atrasados(10, agregados)
+                }
+            }
+        
+        return _resposta_em_cache(('estatisticas/times-coracao', _chave_janela(janela)), gerar)
+    except ValueError as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao calcular estatísticas dos times: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/estatisticas/posicoes', methods=['GET'])
+def estatisticas_posicoes():
+    """
+    Retorna a análise posicional completa: matrizes 7 x 80 (posição x dezena)
+    de frequência, atraso e probabilidades condicionais.
+    
+    Query params:
+        ultimos, de, ate: Janela do histórico (ver /api/estatisticas)
+    
+    Returns:
+        JSON com a análise posicional
+    """
+    try:
+        janela = _ler_janela()
+        
+        def gerar():
+            return {
+                'sucesso': True,
+                'janela': janela,
+                'analise': estatistica_service.calcular_analise_posicional(**_filtros_janela(janela))
+            }
+        
+        return _resposta_em_cache(('estatisticas/posicoes', _chave_janela(janela)), gerar)
+    except ValueError as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao calcular análise posicional: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/estatisticas/coocorrencia', methods=['GET'])
+def estatisticas_coocorrencia():
+    """
+    Retorna a coocorrência de dezenas: matriz 80 x 80 de pares e os pares e
+    trios que mais saíram juntos.
+    
+    Query params:
+        pares: Quantidade de pares mais frequentes (padrão: 20)
+        trios: Quantidade de trios mais frequentes (padrão: 10)
+    
+    Returns:
+        JSON com a coocorrência
+    """
+    try:
+        limite_pares = request.args.get('pares', 20, type=int)
+        limite_trios = request.args.get('trios', 10, type=int)
+        
+        if limite_pares < 0 or limite_trios < 0:
+            raise ValueError('Os limites de pares e trios não podem ser negativos')
+        
+        def gerar():
+            return {
+                'sucesso': True,
+                'coocorrencia': estatistica_service.calcular_resumo_coocorrencia(limite_pares, limite_trios)
+            }
+        
+        return _resposta_em_cache(('estatisticas/coocorrencia', limite_pares, limite_trios), gerar)
+    except ValueError as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao calcular coocorrência: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/estatisticas/combinacao', methods=['GET'])
+def estatisticas_combinacao():
+    """
+    Retorna quantas vezes um conjunto de dezenas saiu inteiro no histórico e
+    a distribuição de acertos desse conjunto por concurso.
+    
+    Query params:
+        dezenas: Dezenas separadas por vírgula (1 a 15 dezenas distintas)
+    
+    Returns:
+        JSON com frequência, atraso, concursos e acertos do conjunto
+    """
+    try:
+        texto = request.args.get('dezenas', '')
+        numeros = [int(d) for d in texto.split(',') if d.strip()]
+        
+        if (
+            not 1 <= len(numeros) <= config.MAX_JOGO
+            or len(set(numeros)) != len(numeros)
+            or not all(config.MIN_NUMEROS <= d <= config.MAX_NUMEROS for d in numeros)
+        ):
+            raise ValueError(f'Informe de 1 a {config.MAX_JOGO} dezenas distintas entre 1 e 80')
+        
+        return jsonify({
+            'sucesso': True,
+            'combinacao': estatistica_service.calcular_combinacao(numeros)
+        }), 200
+    except ValueError as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao calcular combinação: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/probabilidades', methods=['GET'])
+def probabilidades():
+    """
+    Retorna as chances exatas de cada faixa e o valor esperado de um jogo.
+    
+    Query params:
+        quantidade_numeros: Quantidade de números do jogo (padrão: 10)
+        preco: Preço da aposta (padrão: PRECO_APOSTA)
+    
+    Returns:
+        JSON com probabilidades, rateio médio histórico e valor esperado
+    """
+    try:
+        quantidade_numeros = request.args.get('quantidade_numeros', 10, type=int)
+        preco = request.args.get('preco', type=float)
+        
+        def gerar():
+            return {
+                'sucesso': True,
+                'calculo': probabilidade_service.calcular_valor_esperado(quantidade_numeros, preco)
+            }
+        
+        return _resposta_em_cache(('probabilidades', quantidade_numeros, preco), gerar)
+    except ValueError as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao calcular probabilidades: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/dezenas/<int:dezena>', methods=['GET'])
+def estatisticas_dezena(dezena):
+    """
+    Retorna as estatísticas de uma dezena e os concursos em que ela saiu.
+    
+    Args:
+        dezena: Dezena analisada (1-80)
+    
+    Query params:
+        posicao: Restringe à posição do sorteio (1-7, padrão: qualquer)
+    
+    Returns:
+        JSON com frequência, atraso e ocorrências da dezena
+    """
+    try:
+        posicao = request.args.get('posicao', type=int)
+        
+        if not config.MIN_NUMEROS <= dezena <= config.MAX_NUMEROS:
+            return jsonify({
+                'sucesso': False,
+                'mensagem': 'Dezena inválida'
+            }), 400
+        
+        if posicao is not None and not 1 <= posicao <= config.NUMEROS_SORTEADOS:
+            return jsonify({
+                'sucesso': False,
+                'mensagem': 'Posição inválida'
+            }), 400
+        
+        stats = estatistica_service.calcular_estatisticas_dezena(dezena, posicao)
         return jsonify({
             'sucesso': True,
             'estatisticas': stats
@@ -160,7 +701,7 @@ def estatisticas_times_coracao():
     except Exception as e:
         return jsonify({
             'sucesso': False,
-            'mensagem': f'Erro ao calcular estatísticas dos times: {str(e)}'
+            'mensagem': f'Erro ao calcular estatísticas da dezena: {str(e)}'
         }), 500
 
 
@@ -227,6 +768,110 @@ def gerar_palpite():
         }), 500
 
 
+@api_bp.route('/gerar-palpite/stream', methods=['POST'])
+def gerar_palpite_stream():
+    """
+    Gera um lote de palpites em streaming, um jogo por linha (NDJSON).
+    
+    Os jogos são sorteados em blocos à medida que o cliente lê a resposta,
+    então o primeiro byte sai logo e o lote nunca fica inteiro em memória.
+    
+    Body JSON:
+        estrategia: Tipo de estratégia (padrão: equilibrada)
+        quantidade_numeros: Quantidade de números por jogo (padrão: 10)
+        quantidade_jogos: Quantidade de jogos (padrão: 1000)
+        semente: Semente do gerador (opcional; volta no cabeçalho X-Semente)
+        sem_repeticao: Se true, nenhum jogo se repete no lote (padrão: false)
+    
+    Returns:
+        Resposta em streaming com um objeto {numeros, time_coracao} por linha e,
+        na última linha, {fim: true, quantidade_jogos, completo}; completo é
+        false quando sem_repeticao esgotou os jogos distintos antes do pedido
+    """
+    try:
+        data = request.get_json() or {}
+        
+        quantidade_jogos = int(data.get('quantidade_jogos', 1000))
+        semente, blocos = timemania_service.iterar_lote(
+            estrategia=data.get('estrategia', 'equilibrada'),
+            quantidade_numeros=int(data.get('quantidade_numeros', 10)),
+            quantidade_jogos=quantidade_jogos,
+            semente=_ler_semente(data),
+            sem_repeticao=_ler_booleano(data, 'sem_repeticao')
+        )
+        
+        def gerar():
+            gerados = 0
+            # Um trecho por bloco de jogos, em vez de um por linha
+            for numeros, times in blocos:
+                gerados += len(times)
+                yield ''.join(
+                    json.dumps({'numeros': jogo, 'time_coracao': time}, ensure_ascii=False) + '\n'
+                    for jogo, time in zip(numeros.tolist(), times)
+                )
+            
+            yield json.dumps({
+                'fim': True,
+                'quantidade_jogos': gerados,
+                'completo': gerados == quantidade_jogos
+            }) + '\n'
+        
+        response = Response(stream_with_context(gerar()), mimetype='application/x-ndjson')
+        response.headers['X-Semente'] = str(semente)
+        return response
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao gerar palpites: {str(e)}'
+        }), 500
+
+
+@api_bp.route('/gerar-palpites-lote', methods=['POST'])
+def gerar_palpites_lote():
+    """
+    Gera um lote grande de jogos (bolões) de forma vetorizada e reprodutível.
+    
+    Body JSON:
+        estrategia: Tipo de estratégia (padrão: equilibrada)
+        quantidade_numeros: Quantidade de números por jogo (padrão: 10)
+        quantidade_jogos: Quantidade de jogos (padrão: 1000)
+        semente: Semente do gerador (opcional; a resposta traz a usada)
+    
+    Returns:
+        JSON com os jogos (listas de números) e o time sugerido de cada um
+    """
+    try:
+        data = request.get_json() or {}
+        
+        lote = timemania_service.gerar_lote(
+            estrategia=data.get('estrategia', 'equilibrada'),
+            quantidade_numeros=int(data.get('quantidade_numeros', 10)),
+            quantidade_jogos=int(data.get('quantidade_jogos', 1000)),
+            semente=_ler_semente(data)
+        )
+        lote['numeros'] = lote['numeros'].tolist()
+        
+        return jsonify({
+            'sucesso': True,
+            'lote': lote
+        }), 200
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao gerar lote de palpites: {str(e)}'
+        }), 500
+
+
 @api_bp.route('/conferir', methods=['POST'])
 def conferir():
     """
@@ -253,6 +898,21 @@ def conferir():
                 'mensagem': 'Parâmetros inválidos'
             }), 400
         
+        # Concurso como inteiro ou texto com dígitos ("123"), como o banco aceitava
+        if isinstance(numero_concurso, str) and numero_concurso.strip().isdigit():
+            numero_concurso = int(numero_concurso)
+        if not isinstance(numero_concurso, int) or isinstance(numero_concurso, bool) or numero_concurso < 1:
+            return jsonify({
+                'sucesso': False,
+                'mensagem': 'Número do concurso inválido'
+            }), 400
+        
+        if not isinstance(numeros, list) or not all(isinstance(n, int) and not isinstance(n, bool) for n in numeros):
+            return jsonify({
+                'sucesso': False,
+                'mensagem': 'Os números devem ser uma lista de inteiros'
+            }), 400
+        
         resultado = timemania_service.conferir_palpite(
             numeros=numeros,
             time_coracao=time_coracao,
@@ -267,6 +927,50 @@ def conferir():
         }), 500
 
 
+@api_bp.route('/conferir-lote', methods=['POST'])
+def conferir_lote():
+    """
+    Confere muitos palpites contra um intervalo de concursos em uma chamada.
+    
+    Body JSON:
+        palpites: Lista de {numeros, time_coracao (opcional)}
+        inicio: Primeiro concurso (opcional, padrão: o mais antigo)
+        fim: Último concurso (opcional, padrão: o mais recente)
+        detalhar: Se true, inclui cada premiação (padrão: false)
+    
+    Returns:
+        JSON com o resumo por palpite e por faixa e os valores de prêmio
+    """
+    try:
+        data = request.get_json() or {}
+        
+        palpites = data.get('palpites')
+        if not isinstance(palpites, list):
+            raise ValueError('Informe a lista de palpites')
+        
+        inicio = data.get('inicio')
+        fim = data.get('fim')
+        
+        resultado = timemania_service.conferir_lote(
+            palpites=palpites,
+            inicio=int(inicio) if inicio is not None else None,
+            fim=int(fim) if fim is not None else None,
+            detalhar=_ler_booleano(data, 'detalhar')
+        )
+        
+        return jsonify(resultado), 200
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'sucesso': False,
+            'mensagem': f'Erro ao conferir palpites: {str(e)}'
+        }), 500
+
+
 @api_bp.route('/health', methods=['GET'])
 def health():
     """
@@ -2,7 +2,13 @@
 Módulo de serviços para o sistema de análise da Timemania.
 """
 from services.api_caixa_service import ApiCaixaService
+from services.atualizacao_service import AtualizacaoService
+from services.backtest_service import BacktestService
+from services.cache_api_service import CacheApiService
 from services.estatistica_service import EstatisticaService
+from services.exportacao_service import ExportacaoService
+from services.probabilidade_service import ProbabilidadeService
+from services.simulacao_service import SimulacaoService
 from services.timemania_service import TimemaniaService
 
-__all__ = ['ApiCaixaService', 'EstatisticaService', 'TimemaniaService']
+__all__ = ['ApiCaixaService', 'AtualizacaoService', 'BacktestService', 'CacheApiService', 'EstatisticaService', 'ExportacaoService', 'ProbabilidadeService', 'SimulacaoService', 'TimemaniaService']
@@ -1,10 +1,15 @@
 """
 Serviço para integração com a API da Caixa para obter resultados da Timemania.
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import requests
-from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import config
 from models.resultado_model import ResultadoModel
+from services.cache_api_service import CacheApiService
 
 
 class ApiCaixaService:
@@ -12,26 +17,187 @@ class ApiCaixaService:
     Classe para gerenciar a comunicação com a API da Caixa.
     """
     
-    def __init__(self):
-        """Inicializa o serviço da API."""
-        self.api_url = config.API_TIMEMANIA_URL
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        paralelismo: Optional[int] = None,
+        cache: Optional[CacheApiService] = None
+    ):
+        """
+        Inicializa o serviço da API.
+        
+        Args:
+            api_url: URL base da API (padrão: config.API_TIMEMANIA_URL)
+            paralelismo: Máximo de requisições simultâneas (padrão: config.API_PARALELISMO)
+            cache: Cache em disco das respostas (padrão: config.API_CACHE_DIR)
+        """
+        self.api_url = api_url or config.API_TIMEMANIA_URL
+        self.paralelismo = max(1, paralelismo or config.API_PARALELISMO)
         self.resultado_model = ResultadoModel()
+        self.cache = cache or CacheApiService()
+        self.session = self._criar_sessao()
+    
+    def _criar_sessao(self) -> requests.Session:
+        """
+        Cria a sessão HTTP compartilhada pelas requisições.
+        
+        A sessão mantém as conexões abertas (keep-alive) com um pool do tamanho
+        do paralelismo e repete automaticamente requisições com falha de rede
+        ou erro 429/5xx, com espera exponencial entre as tentativas.
+        
+        Returns:
+            Sessão configurada
+        """
+        retry = Retry(
+            total=config.API_TENTATIVAS,
+            backoff_factor=config.API_BACKOFF,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET'])
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.paralelismo,
+            max_retries=retry
+        )
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _baixar(self, url: str, chave: Union[int, str]) -> Tuple[Dict, bool]:
+        """
+        Faz o GET de uma URL da API e decodifica o JSON, usando o cache em disco.
+        
+        Se a resposta estiver no cache, a requisição é condicional (If-None-Match /
+        If-Modified-Since) e um 304 devolve os dados do cache sem baixar o corpo.
+        
+        Args:
+            url: URL completa
+            chave: Chave da resposta no cache (número do concurso ou 'ultimo')
+            
+        Returns:
+            Tupla (resposta da API, True se a resposta mudou desde a última gravação no cache)
+        """
+        entrada = self.cache.obter(chave)
+        headers = {}
+        if entrada:
+            if entrada.get('etag'):
+                headers['If-None-Match'] = entrada['etag']
+            if entrada.get('last_modified'):
+                headers['If-Modified-Since'] = entrada['last_modified']
+        
+        response = self.session.get(url, headers=headers, timeout=config.API_TIMEOUT)
+        if response.status_code == 304 and entrada:
+            return entrada['dados'], False
+        
+        response.raise_for_status()
+        data = response.json()
+        self.cache.salvar(
+            chave,
+            data,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+        return data, True
+    
+    def _concurso_finalizado(self, numero: int) -> bool:
+        """
+        Indica se um concurso já foi sucedido por outro, ou seja, se seus dados
+        não mudam mais e a cópia do cache pode ser usada sem consultar a API.
+        
+        Args:
+            numero: Número do concurso
+            
+        Returns:
+            True se o concurso é anterior ao último concurso conhecido da API
+        """
+        ultimo = self.cache.obter(CacheApiService.CHAVE_ULTIMO)
+        return bool(ultimo) and numero < (ultimo['dados'].get('numero') or 0)
+    
+    def baixar_concurso(self, numero: int) -> Optional[Dict]:
+        """
+        Baixa um concurso específico da API sem salvá-lo no banco.
+        
+        Args:
+            numero: Número do concurso
+            
+        Returns:
+            Dicionário com os dados do concurso ou None em caso de erro
+        """
+        data, _ = self._baixar_concurso(numero)
+        return data
+    
+    def _baixar_concurso(self, numero: int) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Baixa um concurso específico da API, devolvendo o motivo em caso de falha.
+        
+        Args:
+            numero: Número do concurso
+            
+        Returns:
+            Tupla (dados do concurso ou None, mensagem de erro ou None)
+        """
+        try:
+            entrada = self.cache.obter(numero)
+            if entrada and self._concurso_finalizado(numero):
+                return entrada['dados'], None
+            
+            data, _ = self._baixar(f"{self.api_url}/{numero}", numero)
+            if data and data.get('numero'):
+                return data, None
+            return None, 'Resposta sem número de concurso'
+            
+        except requests.exceptions.RequestException as e:
+            print(f"Erro ao buscar concurso {numero}: {e}")
+            return None, str(e)
+        except Exception as e:
+            print(f"Erro inesperado ao buscar concurso {numero}: {e}")
+            return None, str(e)
+    
+    def baixar_concursos(
+        self,
+        numeros: Iterable[int]
+    ) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+        """
+        Baixa vários concursos em paralelo, limitado por self.paralelismo.
+        
+        Os resultados são entregues conforme ficam prontos, não na ordem pedida.
+        
+        Args:
+            numeros: Números dos concursos
+            
+        Yields:
+            Tuplas (numero, dados do concurso ou None, mensagem de erro ou None)
+        """
+        with ThreadPoolExecutor(max_workers=self.paralelismo) as executor:
+            futuros = {
+                executor.submit(self._baixar_concurso, numero): numero
+                for numero in numeros
+            }
+            for futuro in as_completed(futuros):
+                data, erro = futuro.result()
+                yield futuros[futuro], data, erro
     
     def buscar_ultimo_concurso(self) -> Optional[Dict]:
         """
         Busca o último concurso da Timemania na API da Caixa.
         
+        A requisição é condicional: se a API responder que nada mudou e o
+        concurso já estiver no banco, ele não é gravado de novo.
+        
         Returns:
             Dicionário com os dados do último concurso ou None em caso de erro
         """
         try:
-            response = requests.get(self.api_url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data, modificado = self._baixar(self.api_url, CacheApiService.CHAVE_ULTIMO)
             
             # Salvar no banco de dados
             if data and data.get('numero'):
-                self.resultado_model.inserir(data)
+                if modificado:
+                    self.cache.salvar(data['numero'], data)
+                if modificado or not self.resultado_model.buscar_por_numero(data['numero']):
+                    self.resultado_model.inserir(data)
             
             return data
             
@@ -52,38 +218,47 @@ class ApiCaixaService:
         Returns:
             Dicionário com os dados do concurso ou None em caso de erro
         """
-        try:
-            url = f"{self.api_url}/{numero}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Salvar no banco de dados
-            if data and data.get('numero'):
-                self.resultado_model.inserir(data)
-            
-            return data
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Erro ao buscar concurso {numero}: {e}")
-            return None
-        except Exception as e:
-            print(f"Erro inesperado ao buscar concurso {numero}: {e}")
-            return None
+        data = self.baixar_concurso(numero)
+        
+        # Salvar no banco de dados
+        if data:
+            self.resultado_model.inserir(data)
+        
+        return data
     
-    def atualizar_base_completa(self) -> Dict[str, any]:
+    def atualizar_base_completa(
+        self,
+        progresso: Optional[Callable[[Dict], None]] = None
+    ) -> Dict[str, any]:
         """
-        Atualiza a base de dados com todos os concursos disponíveis.
-        Busca incrementalmente do último concurso cadastrado até o mais recente.
+        Sincroniza a base de dados com todos os concursos disponíveis na API.
+        
+        Detecta todos os concursos faltantes de 1 até o mais recente (inclusive
+        lacunas no meio do histórico), baixa-os em paralelo, do mais recente ao
+        mais antigo, e grava em lotes. Cada lote gravado atualiza o checkpoint,
+        então uma execução interrompida continua de onde parou. Concursos que
+        falham são registrados e tentados de novo nas execuções seguintes, até
+        config.SYNC_MAX_TENTATIVAS vezes.
+        
+        Args:
+            progresso: Função chamada a cada concurso processado com
+                {total, baixados, falhas, gravados}
         
         Returns:
             Dicionário com estatísticas da atualização:
             - total_cadastrados: Total de concursos cadastrados
             - novos: Novos concursos adicionados
             - erros: Número de erros encontrados
+            - pendentes: Concursos que continuam faltando e serão tentados de novo
+            - ignorados: Concursos que esgotaram as tentativas
+            - retomada: Se a execução continuou uma sincronização interrompida
         """
         try:
-            # Buscar último concurso da API
+            # Buscar último concurso do banco antes que o da API seja gravado
+            ultimo_db = self.resultado_model.buscar_ultimo()
+            numero_ultimo_db = ultimo_db.get('numero', 0) if ultimo_db else 0
+            
+            # Buscar (e gravar) último concurso da API
             ultimo_api = self.buscar_ultimo_concurso()
             if not ultimo_api:
                 return {
@@ -96,44 +271,118 @@ class ApiCaixaService:
             
             numero_ultimo_api = ultimo_api.get('numero', 0)
             
-            # Buscar último concurso do banco
-            ultimo_db = self.resultado_model.buscar_ultimo()
-            numero_ultimo_db = ultimo_db.get('numero', 0) if ultimo_db else 0
+            # Lacunas no histórico, sem os concursos que esgotaram as tentativas
+            esgotados = {
+                falha['numero'] for falha in self.resultado_model.listar_falhas()
+                if falha['tentativas'] >= config.SYNC_MAX_TENTATIVAS
+            }
+            faltantes = [
+                numero for numero in self.resultado_model.listar_concursos_faltantes(numero_ultimo_api)
+                if numero not in esgotados
+            ]
+            
+            # O último concurso já foi gravado acima
+            novos = 1 if numero_ultimo_api > numero_ultimo_db else 0
             
             # Se já está atualizado
-            if numero_ultimo_db >= numero_ultimo_api:
+            if not faltantes:
                 return {
                     'sucesso': True,
                     'mensagem': 'Base de dados já está atualizada',
                     'total_cadastrados': self.resultado_model.contar_resultados(),
-                    'novos': 0,
-                    'erros': 0
+                    'novos': novos,
+                    'erros': 0,
+                    'pendentes': 0,
+                    'ignorados': len(esgotados),
+                    'ultimo_concurso': numero_ultimo_api
                 }
             
-            # Buscar concursos faltantes
-            novos = 0
-            erros = 0
-            
-            # Se não há dados no banco, buscar os últimos 100 concursos
-            if numero_ultimo_db == 0:
-                inicio = max(1, numero_ultimo_api - 99)
+            if config.SYNC_LIMITE_POR_EXECUCAO > 0:
+                a_buscar = faltantes[:config.SYNC_LIMITE_POR_EXECUCAO]
             else:
-                inicio = numero_ultimo_db + 1
+                a_buscar = faltantes
+            
+            checkpoint = {
+                'ultimo_concurso_api': numero_ultimo_api,
+                'iniciado_em': datetime.now().isoformat(timespec='seconds'),
+                'total': len(a_buscar),
+                'gravados': 0,
+                'erros': 0,
+                'concluido': False
+            }
+            
+            # Execução anterior interrompida: as lacunas acima já excluem o que
+            # ela gravou; registrar de onde esta execução continua
+            anterior = self.resultado_model.obter_checkpoint()
+            if anterior and not anterior.get('concluido'):
+                checkpoint['retomado_de'] = {
+                    'iniciado_em': anterior.get('iniciado_em'),
+                    'total': anterior.get('total', 0),
+                    'gravados': anterior.get('gravados', 0)
+                }
+                print(f"Retomando sincronização iniciada em {anterior.get('iniciado_em')} "
+                      f"({anterior.get('gravados', 0)} de {anterior.get('total', 0)} concursos gravados)")
+            
+            self.resultado_model.salvar_checkpoint(checkpoint)
             
-            for numero in range(inicio, numero_ultimo_api + 1):
-                resultado = self.buscar_concurso_especifico(numero)
+            # Download em paralelo; gravação em lotes na thread atual
+            lote = []
+            falhas = {}
+            baixados = 0
+            total_falhas = 0
+            for numero, resultado, erro in self.baixar_concursos(a_buscar):
                 if resultado:
-                    novos += 1
+                    lote.append(resultado)
+                    baixados += 1
                 else:
-                    erros += 1
+                    falhas[numero] = erro
+                    total_falhas += 1
+                
+                if len(lote) >= config.TAMANHO_LOTE_INSERCAO:
+                    self._gravar_lote(lote, falhas, checkpoint)
+                    lote = []
+                    falhas = {}
+                
+                if progresso:
+                    progresso({
+                        'total': len(a_buscar),
+                        'baixados': baixados,
+                        'falhas': total_falhas,
+                        'gravados': checkpoint['gravados']
+                    })
+            
+            self._gravar_lote(lote, falhas, checkpoint)
+            
+            if progresso:
+                progresso({
+                    'total': len(a_buscar),
+                    'baixados': baixados,
+                    'falhas': total_falhas,
+                    'gravados': checkpoint['gravados']
+                })
+            
+            checkpoint['concluido'] = True
+            checkpoint['concluido_em'] = datetime.now().isoformat(timespec='seconds')
+            self.resultado_model.salvar_checkpoint(checkpoint)
+            
+            # Garantir que as leituras seguintes vejam a base completa
+            self.resultado_model.invalidar_snapshot()
+            
+            pendentes = len([
+                numero for numero in self.resultado_model.listar_concursos_faltantes(numero_ultimo_api)
+                if numero not in esgotados
+            ])
             
             return {
                 'sucesso': True,
                 'mensagem': f'Base atualizada com sucesso',
                 'total_cadastrados': self.resultado_model.contar_resultados(),
-                'novos': novos,
-                'erros': erros,
-                'ultimo_concurso': numero_ultimo_api
+                'novos': novos + checkpoint['gravados'],
+                'erros': checkpoint['erros'],
+                'pendentes': pendentes,
+                'ignorados': len(esgotados),
+                'ultimo_concurso': numero_ultimo_api,
+                'retomada': 'retomado_de' in checkpoint
             }
             
         except Exception as e:
@@ -145,3 +394,70 @@ class ApiCaixaService:
                 'novos': 0,
                 'erros': 0
             }
+    
+    def _gravar_lote(self, lote: List[Dict], falhas: Dict[int, str], checkpoint: Dict):
+        """
+        Grava um lote de concursos baixados, registra as falhas e salva o checkpoint.
+        
+        Args:
+            lote: Concursos baixados com sucesso
+            falhas: Dicionário numero -> erro dos concursos que falharam
+            checkpoint: Checkpoint da sincronização (atualizado no lugar)
+        """
+        gravados = self.resultado_model.inserir_lote(lote)
+        numeros = [resultado['numero'] for resultado in lote]
+        
+        if lote and not gravados:
+            falhas = dict(falhas)
+            falhas.update({numero: 'Erro ao gravar no banco' for numero in numeros})
+        else:
+            self.resultado_model.remover_falhas(numeros)
+        
+        self.resultado_model.registrar_falhas(falhas)
+        
+        checkpoint['gravados'] += gravados
+        checkpoint['erros'] += len(falhas)
+        self.resultado_model.salvar_checkpoint(checkpoint)
+    
+    def reprocessar_cache(self) -> Dict[str, any]:
+        """
+        Regrava no banco todos os concursos do cache em disco, sem acessar a API.
+        
+        Útil para reconstruir a base (por exemplo, após uma mudança de esquema).
+        
+        Returns:
+            Dicionário com sucesso, mensagem, total_cache, gravados e total_cadastrados
+        """
+        try:
+            numeros = self.cache.listar_concursos()
+            gravados = 0
+            lote = []
+            
+            for numero in numeros:
+                entrada = self.cache.obter(numero)
+                if entrada and entrada['dados'].get('numero'):
+                    lote.append(entrada['dados'])
+                
+                if len(lote) >= config.TAMANHO_LOTE_INSERCAO:
+                    gravados += self.resultado_model.inserir_lote(lote)
+                    lote = []
+            
+            gravados += self.resultado_model.inserir_lote(lote)
+            
+            return {
+                'sucesso': True,
+                'mensagem': f'{gravados} concursos regravados a partir do cache',
+                'total_cache': len(numeros),
+                'gravados': gravados,
+                'total_cadastrados': self.resultado_model.contar_resultados()
+            }
+            
+        except Exception as e:
+            print(f"Erro ao reprocessar cache da API: {e}")
+            return {
+                'sucesso': False,
+                'mensagem': f'Erro ao reprocessar cache: {str(e)}',
+                'total_cache': 0,
+                'gravados': 0,
+                'total_cadastrados': 0
+            }
@@ -0,0 +1,208 @@
+"""
+Serviço para executar a atualização da base em segundo plano, com acompanhamento de progresso.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+import config
+from models.resultado_model import devolver_conexoes
+from services.api_caixa_service import ApiCaixaService
+
+
+class AtualizacaoService:
+    """
+    Classe para executar a sincronização com a API da Caixa fora das requisições HTTP.
+    
+    Cada atualização roda em uma thread própria e é identificada por um id de
+    tarefa; só uma atualização roda por vez. O agendador opcional dispara
+    atualizações periódicas nos dias de sorteio.
+    """
+    
+    # Quantidade de tarefas finalizadas mantidas para consulta
+    MAX_TAREFAS_HISTORICO = 20
+    
+    def __init__(self, api_caixa_service: Optional[ApiCaixaService] = None):
+        """
+        Inicializa o serviço de atualização.
+        
+        Args:
+            api_caixa_service: Serviço da API usado na sincronização (padrão: novo)
+        """
+        self.api_caixa_service = api_caixa_service or ApiCaixaService()
+        self._tarefas: Dict[str, Dict] = {}
+        self._tarefa_ativa: Optional[str] = None
+        self._lock = threading.Lock()
+        self._agendador: Optional[threading.Thread] = None
+        self._parar_agendador = threading.Event()
+    
+    def iniciar_atualizacao(self, origem: str = 'manual') -> Dict:
+        """
+        Inicia uma atualização em segundo plano.
+        
+        Se já houver uma atualização em andamento, nenhuma nova é criada e
+        a tarefa em andamento é retornada.
+        
+        Args:
+            origem: Quem disparou a atualização ('manual' ou 'agendador')
+            
+        Returns:
+            Status da tarefa (ver obter_status)
+        """
+        with self._lock:
+            if self._tarefa_ativa is not None:
+                return self._formatar_status(self._tarefas[self._tarefa_ativa])
+            
+            tarefa_id = uuid.uuid4().hex
+            tarefa = {
+                'id': tarefa_id,
+                'status': 'pendente',
+                'origem': origem,
+                'criada_em': datetime.now().isoformat(timespec='seconds'),
+                'iniciada_em': None,
+                'concluida_em': None,
+                'inicio': None,
+                'progresso': {'total': 0, 'baixados': 0, 'falhas': 0, 'gravados': 0},
+                'resultado': None
+            }
+            self._tarefas[tarefa_id] = tarefa
+            self._tarefa_ativa = tarefa_id
+            self._descartar_tarefas_antigas()
+        
+        thread = threading.Thread(
+            target=self._executar,
+            args=(tarefa_id,),
+            name=f'atualizacao-{tarefa_id[:8]}',
+            daemon=True
+        )
+        thread.start()
+        
+        return self.obter_status(tarefa_id)
+    
+    def obter_status(self, tarefa_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Retorna o status de uma tarefa de atualização.
+        
+        Args:
+            tarefa_id: Id da tarefa (None para a mais recente)
+            
+        Returns:
+            Dicionário com id, status ('pendente', 'executando', 'concluida' ou
+            'erro'), datas, progresso (total, baixados, falhas, gravados,
+            restantes, taxa em concursos/s) e resultado, ou None se não existir
+        """
+        with self._lock:
+            if tarefa_id is None:
+                if not self._tarefas:
+                    return None
+                tarefa_id = next(reversed(self._tarefas))
+            
+            tarefa = self._tarefas.get(tarefa_id)
+            return self._formatar_status(tarefa) if tarefa else None
+    
+    def _formatar_status(self, tarefa: Dict) -> Dict:
+        """
+        Monta a representação pública de uma tarefa (chamar com o lock adquirido).
+        
+        Args:
+            tarefa: Registro interno da tarefa
+            
+        Returns:
+            Dicionário com o status da tarefa
+        """
+        progresso = dict(tarefa['progresso'])
+        processados = progresso['baixados'] + progresso['falhas']
+        progresso['restantes'] = max(0, progresso['total'] - processados)
+        
+        decorrido = time.monotonic() - tarefa['inicio'] if tarefa['inicio'] else 0
+        progresso['taxa'] = round(processados / decorrido, 2) if decorrido > 0 else 0
+        
+        return {
+            'id': tarefa['id'],
+            'status': tarefa['status'],
+            'origem': tarefa['origem'],
+            'criada_em': tarefa['criada_em'],
+            'iniciada_em': tarefa['iniciada_em'],
+            'concluida_em': tarefa['concluida_em'],
+            'progresso': progresso,
+            'resultado': tarefa['resultado']
+        }
+    
+    def _executar(self, tarefa_id: str):
+        """
+        Executa a sincronização de uma tarefa (roda na thread da tarefa).
+        
+        Args:
+            tarefa_id: Id da tarefa
+        """
+        tarefa = self._tarefas[tarefa_id]
+        
+        with self._lock:
+            tarefa['status'] = 'executando'
+            tarefa['iniciada_em'] = datetime.now().isoformat(timespec='seconds')
+            tarefa['inicio'] = time.monotonic()
+        
+        def atualizar_progresso(progresso: Dict):
+            with self._lock:
+                tarefa['progresso'] = progresso
+        
+        try:
+            resultado = self.api_caixa_service.atualizar_base_completa(progresso=atualizar_progresso)
+            status = 'concluida' if resultado.get('sucesso') else 'erro'
+        except Exception as e:
+            print(f"Erro na atualização em segundo plano: {e}")
+            resultado = {'sucesso': False, 'mensagem': f'Erro ao atualizar base: {str(e)}'}
+            status = 'erro'
+        finally:
+            # A thread da tarefa termina aqui; devolver a conexão ao pool
+            devolver_conexoes()
+        
+        with self._lock:
+            tarefa['status'] = status
+            tarefa['resultado'] = resultado
+            tarefa['concluida_em'] = datetime.now().isoformat(timespec='seconds')
+            self._tarefa_ativa = None
+    
+    def _descartar_tarefas_antigas(self):
+        """Remove as tarefas finalizadas mais antigas além do limite do histórico."""
+        excedentes = len(self._tarefas) - self.MAX_TAREFAS_HISTORICO
+        for tarefa_id in list(self._tarefas):
+            if excedentes <= 0:
+                break
+            if tarefa_id != self._tarefa_ativa:
+                del self._tarefas[tarefa_id]
+                excedentes -= 1
+    
+    def iniciar_agendador(self):
+        """
+        Inicia o agendador que dispara atualizações periódicas nos dias de sorteio
+        (config.AGENDADOR_DIAS_SORTEIO), a partir de config.AGENDADOR_HORA_INICIO,
+        a cada config.AGENDADOR_INTERVALO_MINUTOS.
+        """
+        if self._agendador is not None and self._agendador.is_alive():
+            return
+        
+        self._parar_agendador.clear()
+        self._agendador = threading.Thread(
+            target=self._loop_agendador,
+            name='agendador-atualizacao',
+            daemon=True
+        )
+        self._agendador.start()
+    
+    def parar_agendador(self):
+        """Sinaliza o agendador para encerrar."""
+        self._parar_agendador.set()
+    
+    def _loop_agendador(self):
+        """Laço do agendador (roda na thread do agendador)."""
+        intervalo = config.AGENDADOR_INTERVALO_MINUTOS * 60
+        
+        while not self._parar_agendador.is_set():
+            agora = datetime.now()
+            if (agora.weekday() in config.AGENDADOR_DIAS_SORTEIO
+                    and agora.hour >= config.AGENDADOR_HORA_INICIO):
+                self.iniciar_atualizacao(origem='agendador')
+            
+            self._parar_agendador.wait(intervalo)
@@ -0,0 +1,239 @@
+"""
+Serviço para avaliar as estratégias de palpites reprocessando o histórico.
+"""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+import config
+from models.matriz_sorteios import MatrizSorteios
+from models.resultado_model import ResultadoModel
+from services.estatistica_service import EstatisticaService
+from services.timemania_service import TimemaniaService
+
+# Estado de cada processo do pool, preparado por _inicializar_processo
+_estado_processo: Dict = {}
+
+
+def _inicializar_processo(matriz: MatrizSorteios):
+    """
+    Prepara um processo do pool com a matriz do histórico e os serviços.
+    
+    Args:
+        matriz: Matriz de sorteios em ordem cronológica
+    """
+    _estado_processo['matriz'] = matriz
+    _estado_processo['estatistica_service'] = EstatisticaService()
+    _estado_processo['timemania_service'] = TimemaniaService()
+
+
+def _executar_trecho(
+    inicio: int,
+    fim: int,
+    estrategias: List[str],
+    quantidade_numeros: int,
+    jogos_por_concurso: int,
+    semente: np.random.SeedSequence
+) -> Dict[str, np.ndarray]:
+    """
+    Reprocessa as linhas [inicio, fim) da matriz em um processo do pool.
+    
+    Para cada linha k, as estatísticas vêm das linhas 0..k-1 (somas
+    acumuladas da matriz); a coocorrência é mantida somando o concurso
+    anterior a cada passo, sem recalcular o histórico. Os jogos e os times
+    saem das próprias estratégias de gerar_palpite (gerar_numeros e
+    sugerir_time_coracao), sorteadas com um random.Random da semente do trecho.
+    
+    Args:
+        inicio: Primeira linha avaliada (inclusive)
+        fim: Última linha avaliada (exclusive)
+        estrategias: Estratégias avaliadas
+        quantidade_numeros: Quantidade de números por jogo
+        jogos_por_concurso: Jogos gerados por estratégia em cada concurso
+        semente: Semente do trecho
+        
+    Returns:
+        Dicionário estrategia -> matriz (2, 8): linha 0 = jogos por quantidade
+        de acertos (0 a 7), linha 1 = jogos que também acertaram o time
+    """
+    matriz = _estado_processo['matriz']
+    estatistica_service = _estado_processo['estatistica_service']
+    timemania_service = _estado_processo['timemania_service']
+    timemania_service.aleatorio = random.Random(int(semente.generate_state(1)[0]))
+    
+    incidencia = matriz.incidencia.astype(np.int64)
+    coocorrencia = incidencia[:inicio].T @ incidencia[:inicio]
+    np.fill_diagonal(coocorrencia, 0)
+    
+    placar = {estrategia: np.zeros((2, config.NUMEROS_SORTEADOS + 1), dtype=np.int64) for estrategia in estrategias}
+    
+    for linha in range(inicio, fim):
+        rankings = estatistica_service.montar_rankings(
+            estatistica_service.agregar_linhas(matriz, 0, linha), coocorrencia
+        )
+        sorteadas = matriz.incidencia[linha]
+        codigo_time = matriz.times[linha]
+        time_sorteado = matriz.nomes_times[codigo_time].strip().upper() if codigo_time >= 0 else None
+        
+        for estrategia in estrategias:
+            acertos = np.empty(jogos_por_concurso, dtype=np.int64)
+            acertou_time = np.zeros(jogos_por_concurso, dtype=bool)
+            for jogo in range(jogos_por_concurso):
+                numeros = timemania_service.gerar_numeros(estrategia, quantidade_numeros, rankings)
+                time = timemania_service.sugerir_time_coracao(estrategia, rankings)['time']
+                
+                # Mesma conferência de conferir_palpite
+                acertos[jogo] = sorteadas[np.asarray(numeros, dtype=np.int64) - 1].sum()
+                acertou_time[jogo] = time_sorteado is not None and time.strip().upper() == time_sorteado
+            
+            placar[estrategia][0] += np.bincount(acertos, minlength=config.NUMEROS_SORTEADOS + 1)
+            placar[estrategia][1] += np.bincount(acertos[acertou_time], minlength=config.NUMEROS_SORTEADOS + 1)
+        
+        coocorrencia += np.outer(incidencia[linha], incidencia[linha])
+        np.fill_diagonal(coocorrencia, 0)
+    
+    return placar
+
+
+class BacktestService:
+    """
+    Classe para medir o desempenho das estratégias em concursos passados.
+    
+    Cada concurso k é tratado como se fosse o próximo: os rankings saem só
+    dos concursos anteriores a k, cada estratégia gera seus jogos com o mesmo
+    código de gerar_palpite e eles são conferidos com o resultado de k. Os
+    concursos são divididos em trechos de tamanho fixo, executados em
+    paralelo em um pool de processos; cada trecho tem sua própria semente
+    (SeedSequence.spawn), então o resultado depende só da semente, nunca da
+    quantidade de processos.
+    """
+    
+    # Concursos por trecho enviado ao pool
+    TAMANHO_TRECHO = 50
+    
+    def __init__(self):
+        """Inicializa o serviço de backtest."""
+        self.resultado_model = ResultadoModel()
+    
+    def executar(
+        self,
+        estrategias: Optional[List[str]] = None,
+        quantidade_numeros: int = 10,
+        jogos_por_concurso: int = 100,
+        inicio: Optional[int] = None,
+        fim: Optional[int] = None,
+        semente: Optional[int] = None,
+        processos: Optional[int] = None
+    ) -> Dict:
+        """
+        Executa o backtest das estratégias.
+        
+        Args:
+            estrategias: Estratégias avaliadas (None para todas de config.ESTRATEGIAS)
+            quantidade_numeros: Quantidade de números por jogo (10-15)
+            jogos_por_concurso: Jogos gerados por estratégia em cada concurso
+            inicio: Primeiro concurso avaliado (padrão: o primeiro com
+                config.BACKTEST_HISTORICO_MINIMO concursos anteriores)
+            fim: Último concurso avaliado (padrão: o mais recente)
+            semente: Semente do backtest (None para sortear uma)
+            processos: Processos do pool (padrão: config.BACKTEST_PROCESSOS;
+                0 = um por CPU, 1 = sem pool)
+                
+        Returns:
+            Dicionário com os parâmetros, a semente e, por estratégia, a
+            distribuição de acertos, média de acertos, premiados (3 ou mais
+            acertos) e acertos do time do coração
+            
+        Raises:
+            ValueError: Se algum parâmetro for inválido
+        """
+        estrategias = list(estrategias or config.ESTRATEGIAS)
+        invalidas = [estrategia for estrategia in estrategias if estrategia not in config.ESTRATEGIAS]
+        if invalidas:
+            raise ValueError(f'Estratégias inválidas: {", ".join(invalidas)}')
+        
+        if not config.MIN_JOGO <= quantidade_numeros <= config.MAX_JOGO:
+            raise ValueError(f'Quantidade de números deve estar entre {config.MIN_JOGO} e {config.MAX_JOGO}')
+        
+        if jogos_por_concurso < 1:
+            raise ValueError('A quantidade de jogos por concurso deve ser positiva')
+        
+        if semente is None:
+            semente = int(np.random.SeedSequence().generate_state(1)[0])
+        
+        matriz = self.resultado_model.obter_snapshot().matriz
+        
+        # Linhas avaliadas: concursos de inicio a fim, com algum histórico antes
+        primeira = config.BACKTEST_HISTORICO_MINIMO
+        if inicio is not None:
+            primeira = max(1, int(np.searchsorted(matriz.concursos, inicio)))
+        ultima = len(matriz)
+        if fim is not None:
+            ultima = int(np.searchsorted(matriz.concursos, fim, side='right'))
+        
+        if primeira >= ultima:
+            raise ValueError('Nenhum concurso no intervalo avaliado')
+        
+        trechos = [
+            (linha, min(linha + self.TAMANHO_TRECHO, ultima))
+            for linha in range(primeira, ultima, self.TAMANHO_TRECHO)
+        ]
+        sementes = np.random.SeedSequence(semente).spawn(len(trechos))
+        argumentos = [
+            (trecho_inicio, trecho_fim, estrategias, quantidade_numeros, jogos_por_concurso, trecho_semente)
+            for (trecho_inicio, trecho_fim), trecho_semente in zip(trechos, sementes)
+        ]
+        
+        if processos is None:
+            processos = config.BACKTEST_PROCESSOS
+        processos = min(processos or os.cpu_count() or 1, len(trechos))
+        
+        if processos <= 1:
+            _inicializar_processo(matriz)
+            placares = [_executar_trecho(*args) for args in argumentos]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processos,
+                initializer=_inicializar_processo,
+                initargs=(matriz,)
+            ) as executor:
+                placares = list(executor.map(_executar_trecho, *zip(*argumentos)))
+        
+        return {
+            'concurso_inicial': int(matriz.concursos[primeira]),
+            'concurso_final': int(matriz.concursos[ultima - 1]),
+            'total_concursos': ultima - primeira,
+            'quantidade_numeros': quantidade_numeros,
+            'jogos_por_concurso': jogos_por_concurso,
+            'semente': semente,
+            'estrategias': {
+                estrategia: self._resumir(sum(placar[estrategia] for placar in placares))
+                for estrategia in estrategias
+            }
+        }
+    
+    @staticmethod
+    def _resumir(placar: np.ndarray) -> Dict:
+        """
+        Resume o placar de uma estratégia.
+        
+        Args:
+            placar: Matriz (2, 8) de _executar_trecho somada entre os trechos
+            
+        Returns:
+            Dicionário com jogos, acertos (jogos por quantidade de acertos),
+            media_acertos, premiados, acertos_time e premiados_com_time
+        """
+        por_acertos, com_time = placar
+        jogos = int(por_acertos.sum())
+        
+        return {
+            'jogos': jogos,
+            'acertos': {str(quantidade): int(total) for quantidade, total in enumerate(por_acertos)},
+            'media_acertos': round(float(por_acertos @ np.arange(len(por_acertos)) / jogos), 4) if jogos else 0,
+            'premiados': int(por_acertos[3:].sum()),
+            'acertos_time': int(com_time.sum()),
+            # premiado em conferir_palpite: 3 ou mais acertos ou o time do coração
+            'premiados_com_time': int(por_acertos[3:].sum() + com_time[:3].sum())
+        }
@@ -0,0 +1,130 @@
+"""
+Serviço de cache em disco das respostas brutas da API da Caixa.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import config
+
+
+class CacheApiService:
+    """
+    Classe para guardar em disco o JSON bruto de cada concurso baixado da API.
+    
+    Cada entrada é um arquivo <chave>.json com os dados e os cabeçalhos de
+    validação (ETag e Last-Modified) da resposta. A chave é o número do
+    concurso ou 'ultimo' para o endpoint do concurso mais recente.
+    """
+    
+    CHAVE_ULTIMO = 'ultimo'
+    
+    def __init__(self, diretorio: Optional[str] = None, ativo: Optional[bool] = None):
+        """
+        Inicializa o cache.
+        
+        Args:
+            diretorio: Diretório dos arquivos (padrão: config.API_CACHE_DIR)
+            ativo: Se False, o cache não lê nem grava nada (padrão: config.API_CACHE_ATIVO)
+        """
+        self.diretorio = Path(diretorio or config.API_CACHE_DIR)
+        self.ativo = config.API_CACHE_ATIVO if ativo is None else ativo
+        
+        if self.ativo:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+    
+    def _caminho(self, chave: Union[int, str]) -> Path:
+        """
+        Retorna o caminho do arquivo de uma chave.
+        
+        Args:
+            chave: Número do concurso ou 'ultimo'
+            
+        Returns:
+            Caminho do arquivo
+        """
+        return self.diretorio / f'{chave}.json'
+    
+    def obter(self, chave: Union[int, str]) -> Optional[Dict]:
+        """
+        Lê uma entrada do cache.
+        
+        Args:
+            chave: Número do concurso ou 'ultimo'
+            
+        Returns:
+            Dicionário com dados, etag, last_modified e salvo_em, ou None se
+            não existir (ou estiver corrompida)
+        """
+        if not self.ativo:
+            return None
+        
+        try:
+            with open(self._caminho(chave), 'r', encoding='utf-8') as arquivo:
+                entrada = json.load(arquivo)
+            return entrada if entrada.get('dados') else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Erro ao ler cache da API ({chave}): {e}")
+            return None
+    
+    def salvar(
+        self,
+        chave: Union[int, str],
+        dados: Dict,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """
+        Grava uma entrada no cache, substituindo o arquivo de forma atômica.
+        
+        Args:
+            chave: Número do concurso ou 'ultimo'
+            dados: JSON da resposta da API
+            etag: Cabeçalho ETag da resposta
+            last_modified: Cabeçalho Last-Modified da resposta
+        """
+        if not self.ativo:
+            return
+        
+        entrada = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'salvo_em': datetime.now().isoformat(timespec='seconds'),
+            'dados': dados
+        }
+        
+        temporario = None
+        try:
+            descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+            with os.fdopen(descritor, 'w', encoding='utf-8') as arquivo:
+                json.dump(entrada, arquivo, ensure_ascii=False)
+            os.replace(temporario, self._caminho(chave))
+            temporario = None
+        except Exception as e:
+            print(f"Erro ao gravar cache da API ({chave}): {e}")
+        finally:
+            # Não deixar o .tmp para trás se a gravação falhou antes do replace
+            if temporario is not None:
+                try:
+                    os.unlink(temporario)
+                except OSError:
+                    pass
+    
+    def listar_concursos(self) -> List[int]:
+        """
+        Lista os números dos concursos presentes no cache.
+        
+        Returns:
+            Números dos concursos em ordem crescente
+        """
+        if not self.ativo:
+            return []
+        
+        return sorted(
+            int(caminho.stem) for caminho in self.diretorio.glob('*.json')
+            if caminho.stem.isdigit()
+        )
@@ -1,9 +1,14 @@
 """
 Serviço para cálculos estatísticos dos resultados da Timemania.
 """
-from typing import Dict, List, Tuple
-from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+from itertools import combinations
+import numpy as np
 import config
+from models.mascara_dezenas import contar_bits_palavras, criar_mascara, palavras_da_mascara
+from models.matriz_sorteios import MatrizSorteios
 from models.resultado_model import ResultadoModel
 
 
@@ -15,108 +20,354 @@ class EstatisticaService:
     def __init__(self):
         """Inicializa o serviço de estatísticas."""
         self.resultado_model = ResultadoModel()
+        self._agregados_cache = None
+        self._rankings_cache = None
+        self._posicional_cache = None
+        self._coocorrencia_cache = None
     
-    def calcular_estatisticas_completas(self) -> Dict:
+    def calcular_estatisticas_completas(self, agregados: Optional[Dict] = None) -> Dict:
         """
         Calcula todas as estatísticas disponíveis.
         
+        Os resultados são lidos e agregados uma única vez; cada estatística
+        é derivada dos mesmos agregados.
+        
+        Args:
+            agregados: Agregados já calculados, por exemplo de uma janela
+                (None para todo o histórico)
+        
         Returns:
             Dicionário com todas as estatísticas
         """
+        if agregados is None:
+            agregados = self.calcular_agregados()
+        
         return {
-            'total_concursos': self.resultado_model.contar_resultados(),
-            'frequencia_numeros': self.calcular_frequencia_numeros(),
-            'atrasos': self.calcular_atrasos(),
-            'pares_impares': self.calcular_pares_impares(),
-            'por_faixa': self.calcular_por_faixa(),
-            'por_digito': self.calcular_por_digito(),
-            'por_posicao': self.calcular_por_posicao_sorteio(),
+            'total_concursos': agregados['total_concursos'],
+            'frequencia_numeros': self.calcular_frequencia_numeros(agregados),
+            'atrasos': self.calcular_atrasos(agregados),
+            'pares_impares': self.calcular_pares_impares(agregados),
+            'por_faixa': self.calcular_por_faixa(agregados),
+            'por_digito': self.calcular_por_digito(agregados),
+            'por_posicao': self.calcular_por_posicao_sorteio(agregados, limite=10),
             'times_coracao': {
-                'frequencia': self.calcular_frequencia_times_coracao(),
-                'mais_sorteados': self.calcular_times_mais_sorteados(),
-                'mais_atrasados': self.calcular_times_mais_atrasados()
+                'frequencia': self.calcular_frequencia_times_coracao(agregados),
+                'mais_sorteados': self.calcular_times_mais_sorteados(agregados=agregados),
+                'mais_atrasados': self.calcular_times_mais_atrasados(agregados=agregados)
             }
         }
     
-    def calcular_frequencia_numeros(self) -> List[Dict]:
+    def calcular_agregados(self) -> Dict:
+        """
+        Retorna todos os contadores usados pelos métodos calcular_*.
+        
+        Os contadores vêm das tabelas de estatísticas mantidas a cada gravação
+        (ResultadoModel.obter_estatisticas), sem percorrer o histórico, e
+        ficam em cache até a versão dos dados mudar.
+        
+        Returns:
+            Dicionário com os agregados (vetores indexados por numero - 1):
+            - total_concursos: Quantidade de concursos analisados
+            - frequencia: Vetor (80,) com a frequência de cada número
+            - atraso: Vetor (80,) com concursos desde a última aparição
+            - posicoes: Matriz (7, 80) com a frequência de cada número por posição
+            - times_nomes: Nomes dos times, do sorteado mais recentemente ao mais antigo
+            - times_frequencia: Vetor com a frequência de cada time
+            - times_atraso: Vetor com concursos desde a última aparição de cada time
+        """
+        versao = self.resultado_model.versao_dados()
+        cache = self._agregados_cache
+        if cache is not None and cache[0] == versao:
+            return cache[1]
+        
+        agregados = self._agregados_persistidos()
+        
+        self._agregados_cache = (versao, agregados)
+        return agregados
+    
+    def _agregados_persistidos(self) -> Dict:
+        """
+        Converte as tabelas de estatísticas nos vetores de calcular_agregados.
+        
+        Returns:
+            Dicionário com os agregados
+        """
+        estatisticas = self.resultado_model.obter_estatisticas()
+        total = estatisticas['total_concursos']
+        
+        frequencia = np.zeros(config.MAX_NUMEROS, dtype=np.int64)
+        atraso = np.full(config.MAX_NUMEROS, total, dtype=np.int64)
+        for dezena, quantidade, atraso_dezena in estatisticas['dezenas']:
+            if config.MIN_NUMEROS <= dezena <= config.MAX_NUMEROS:
+                frequencia[dezena - 1] = quantidade
+                atraso[dezena - 1] = atraso_dezena
+        
+        posicoes = np.zeros((config.NUMEROS_SORTEADOS, config.MAX_NUMEROS), dtype=np.int64)
+        for posicao, dezena, quantidade in estatisticas['posicoes']:
+            if 1 <= posicao <= config.NUMEROS_SORTEADOS and config.MIN_NUMEROS <= dezena <= config.MAX_NUMEROS:
+                posicoes[posicao - 1, dezena - 1] = quantidade
+        
+        times = estatisticas['times']
+        
+        return {
+            'total_concursos': total,
+            'frequencia': frequencia,
+            'atraso': atraso,
+            'posicoes': posicoes,
+            'times_nomes': [nome for nome, _, _ in times],
+            'times_frequencia': np.array([quantidade for _, quantidade, _ in times], dtype=np.int64),
+            'times_atraso': np.array([atraso_time for _, _, atraso_time in times], dtype=np.int64)
+        }
+    
+    def verificar_agregados(self) -> Dict:
+        """
+        Compara os agregados persistidos com um recálculo completo a partir do histórico.
+        
+        Returns:
+            Dicionário com consistente (bool) e divergencias (nomes dos agregados diferentes)
+        """
+        snapshot = self.resultado_model.obter_snapshot()
+        persistidos = self._agregados_persistidos()
+        recalculados = self._agregar_matriz(snapshot.matriz)
+        
+        divergencias = []
+        for chave, valor in recalculados.items():
+            if chave == 'times_nomes':
+                iguais = list(valor) == list(persistidos[chave])
+            else:
+                iguais = np.array_equal(valor, persistidos[chave])
+            if not iguais:
+                divergencias.append(chave)
+        
+        incidencia = snapshot.matriz.incidencia.astype(np.int32)
+        coocorrencia = incidencia.T @ incidencia
+        np.fill_diagonal(coocorrencia, 0)
+        if not np.array_equal(coocorrencia, self._coocorrencia_persistida()):
+            divergencias.append('coocorrencia_pares')
+        
+        trios = Counter()
+        for resultado in snapshot.resultados:
+            dezenas = sorted({int(d) for d in resultado.get('listaDezenas', [])})
+            trios.update(combinations(dezenas, 3))
+        trios_persistidos = {
+            (a, b, c): frequencia
+            for a, b, c, frequencia in self.resultado_model.buscar_trios_frequentes(len(trios) + 1)
+        }
+        if dict(trios) != trios_persistidos:
+            divergencias.append('coocorrencia_trios')
+        
+        return {
+            'consistente': not divergencias,
+            'divergencias': divergencias
+        }
+    
+    def calcular_agregados_janela(
+        self,
+        ultimos: Optional[int] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> Dict:
+        """
+        Calcula os agregados de calcular_agregados para uma janela do histórico.
+        
+        Cada contador é a diferença de duas linhas das somas acumuladas da
+        matriz de sorteios, então o custo não depende do tamanho da janela.
+        Todos os métodos calcular_* aceitam o resultado como agregados.
+        
+        Args:
+            ultimos: Considerar só os N concursos mais recentes (do intervalo de datas, se houver)
+            data_inicio: Primeira data de apuração (inclusive)
+            data_fim: Última data de apuração (inclusive)
+            
+        Returns:
+            Dicionário com os agregados da janela
+        """
+        matriz = self.resultado_model.obter_snapshot().matriz
+        inicio, fim = self._linhas_janela(matriz, ultimos, data_inicio, data_fim)
+        return self.agregar_linhas(matriz, inicio, fim)
+    
+    def _linhas_janela(
+        self,
+        matriz: MatrizSorteios,
+        ultimos: Optional[int] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> Tuple[int, int]:
+        """
+        Converte os filtros de janela em um intervalo de linhas [inicio, fim) da matriz.
+        
+        Args:
+            matriz: Matriz de sorteios em ordem cronológica
+            ultimos: Considerar só os N concursos mais recentes (do intervalo de datas, se houver)
+            data_inicio: Primeira data de apuração (inclusive)
+            data_fim: Última data de apuração (inclusive)
+            
+        Returns:
+            Tupla (inicio, fim) de linhas
+        """
+        inicio, fim = matriz.linhas_por_data(data_inicio, data_fim)
+        if ultimos is not None:
+            inicio = max(inicio, fim - max(0, ultimos))
+        return inicio, fim
+    
+    def agregar_linhas(self, matriz: MatrizSorteios, inicio: int, fim: int) -> Dict:
+        """
+        Monta os agregados das linhas [inicio, fim) da matriz a partir das somas acumuladas.
+        
+        Com inicio 0, são os agregados de antes da linha fim (o que o backtest
+        usa para cada concurso reprocessado).
+        
+        Args:
+            matriz: Matriz de sorteios em ordem cronológica
+            inicio: Primeira linha (inclusive)
+            fim: Última linha (exclusive)
+            
+        Returns:
+            Dicionário com os agregados
+        """
+        total = fim - inicio
+        
+        frequencia = (matriz.frequencia_acumulada[fim] - matriz.frequencia_acumulada[inicio]).astype(np.int64)
+        posicoes = (matriz.posicoes_acumuladas[fim] - matriz.posicoes_acumuladas[inicio]).astype(np.int64)
+        times_frequencia = (matriz.times_acumulados[fim] - matriz.times_acumulados[inicio]).astype(np.int64)
+        
+        if total:
+            ultima_dezena = matriz.ultima_linha_dezena[fim - 1]
+            ultima_time = matriz.ultima_linha_time[fim - 1]
+        else:
+            ultima_dezena = np.full(config.MAX_NUMEROS, -1)
+            ultima_time = np.full(len(matriz.nomes_times), -1)
+        
+        atraso = np.where(ultima_dezena >= inicio, fim - 1 - ultima_dezena, total).astype(np.int64)
+        
+        # Só os times sorteados na janela, do sorteado mais recentemente ao mais antigo
+        codigos = np.nonzero(times_frequencia)[0]
+        codigos = codigos[np.argsort(-ultima_time[codigos], kind='stable')]
+        
+        return {
+            'total_concursos': total,
+            'frequencia': frequencia,
+            'atraso': atraso,
+            'posicoes': posicoes,
+            'times_nomes': [matriz.nomes_times[codigo] for codigo in codigos],
+            'times_frequencia': times_frequencia[codigos],
+            'times_atraso': (fim - 1 - ultima_time[codigos]).astype(np.int64)
+        }
+    
+    def _agregar_matriz(self, matriz: MatrizSorteios) -> Dict:
+        """
+        Reduz a matriz de sorteios aos agregados de calcular_agregados,
+        percorrendo todo o histórico (usado para conferir os persistidos).
+        
+        Args:
+            matriz: Matriz de sorteios em ordem cronológica
+            
+        Returns:
+            Dicionário com os agregados
+        """
+        total = len(matriz)
+        incidencia = matriz.incidencia
+        
+        frequencia = incidencia.sum(axis=0, dtype=np.int64)
+        
+        # Primeira ocorrência percorrendo do mais recente ao mais antigo
+        if total:
+            atraso = np.argmax(incidencia[::-1], axis=0)
+            atraso[frequencia == 0] = total
+        else:
+            atraso = np.zeros(config.MAX_NUMEROS, dtype=np.int64)
+        
+        # Contagem por (posição, dezena) em um único bincount; dezena 0 = ausente
+        largura = config.MAX_NUMEROS + 1
+        deslocamento = np.arange(config.NUMEROS_SORTEADOS) * largura
+        posicoes = np.bincount(
+            (matriz.posicoes.astype(np.int64) + deslocamento).ravel(),
+            minlength=config.NUMEROS_SORTEADOS * largura
+        )[:config.NUMEROS_SORTEADOS * largura].reshape(config.NUMEROS_SORTEADOS, largura)[:, 1:]
+        
+        quantidade_times = len(matriz.nomes_times)
+        com_time = matriz.times >= 0
+        times_frequencia = np.bincount(matriz.times[com_time], minlength=quantidade_times)
+        times_atraso = np.full(quantidade_times, total, dtype=np.int64)
+        linhas = np.nonzero(com_time)[0]
+        # Atribuição em ordem cronológica: a ocorrência mais recente prevalece
+        times_atraso[matriz.times[linhas]] = total - 1 - linhas
+        
+        return {
+            'total_concursos': total,
+            'frequencia': frequencia,
+            'atraso': atraso,
+            'posicoes': posicoes,
+            'times_nomes': matriz.nomes_times,
+            'times_frequencia': times_frequencia,
+            'times_atraso': times_atraso
+        }
+    
+    def calcular_frequencia_numeros(self, agregados: Optional[Dict] = None) -> List[Dict]:
         """
         Calcula a frequência de cada número (01-80).
         
+        Args:
+            agregados: Agregados já calculados (None para calcular)
+        
         Returns:
             Lista ordenada por frequência decrescente com {numero, frequencia}
         """
-        resultados = self.resultado_model.buscar_todos()
-        contador = Counter()
+        if agregados is None:
+            agregados = self.calcular_agregados()
         
-        for resultado in resultados:
-            dezenas = resultado.get('listaDezenas', [])
-            for dezena in dezenas:
-                numero = int(dezena)
-                contador[numero] += 1
+        frequencia = agregados['frequencia']
         
-        # Garantir que todos os números de 1 a 80 estejam presentes
-        for i in range(1, config.MAX_NUMEROS + 1):
-            if i not in contador:
-                contador[i] = 0
+        # Ordenar por frequência decrescente (empates pelo menor número)
+        ordem = np.argsort(-frequencia, kind='stable')
         
-        # Ordenar por frequência decrescente
-        frequencias = [
+        return [
             {'numero': num, 'frequencia': freq}
-            for num, freq in contador.most_common()
+            for num, freq in zip((ordem + 1).tolist(), frequencia[ordem].tolist())
         ]
-        
-        return frequencias
     
-    def calcular_atrasos(self) -> List[Dict]:
+    def calcular_atrasos(self, agregados: Optional[Dict] = None) -> List[Dict]:
         """
         Calcula o atraso de cada número (concursos sem aparecer).
         
+        Args:
+            agregados: Agregados já calculados (None para calcular)
+        
         Returns:
             Lista ordenada por atraso decrescente com {numero, atraso}
         """
-        resultados = self.resultado_model.buscar_todos()
-        if not resultados:
+        if agregados is None:
+            agregados = self.calcular_agregados()
+        
+        if not agregados['total_concursos']:
             return []
         
-        # Inicializar atrasos com valor alto
-        atrasos = {i: len(resultados) for i in range(1, config.MAX_NUMEROS + 1)}
-        
-        # Percorrer resultados do mais recente ao mais antigo
-        for idx, resultado in enumerate(resultados):
-            dezenas = resultado.get('listaDezenas', [])
-            for dezena in dezenas:
-                numero = int(dezena)
-                # Atualizar apenas se ainda não foi encontrado (mais recente)
-                if atrasos[numero] == len(resultados):
-                    atrasos[numero] = idx
-        
-        # Converter para lista ordenada
-        lista_atrasos = [
-            {'numero': num, 'atraso': atraso}
-            for num, atraso in sorted(atrasos.items(), key=lambda x: x[1], reverse=True)
-        ]
+        # Números que nunca saíram ficam com o total de concursos
+        atraso = agregados['atraso']
+        ordem = np.argsort(-atraso, kind='stable')
         
-        return lista_atrasos
+        return [
+            {'numero': num, 'atraso': valor}
+            for num, valor in zip((ordem + 1).tolist(), atraso[ordem].tolist())
+        ]
     
-    def calcular_pares_impares(self) -> Dict:
+    def calcular_pares_impares(self, agregados: Optional[Dict] = None) -> Dict:
         """
         Calcula a distribuição de números pares e ímpares.
         
+        Args:
+            agregados: Agregados já calculados (None para calcular)
+        
         Returns:
             Dicionário com contagens e percentuais de pares/ímpares
         """
-        resultados = self.resultado_model.buscar_todos()
-        total_pares = 0
-        total_impares = 0
+        if agregados is None:
+            agregados = self.calcular_agregados()
         
-        for resultado in resultados:
-            dezenas = resultado.get('listaDezenas', [])
-            for dezena in dezenas:
-                numero = int(dezena)
-                if numero % 2 == 0:
-                    total_pares += 1
-                else:
-                    total_impares += 1
+        # Índice 0 = número 1, então os índices ímpares são os números pares
+        frequencia = agregados['frequencia']
+        total_pares = int(frequencia[1::2].sum())
+        total_impares = int(frequencia[0::2].sum())
         
         total = total_pares + total_impares
         
@@ -127,168 +378,410 @@ class EstatisticaService:
             'percentual_impares': round(total_impares / total * 100, 2) if total > 0 else 0
         }
     
-    def calcular_por_faixa(self) -> List[Dict]:
+    def calcular_por_faixa(self, agregados: Optional[Dict] = None) -> List[Dict]:
         """
         Calcula a frequência de números por faixa de dezenas.
         Faixas: 01-10, 11-20, 21-30, 31-40, 41-50, 51-60, 61-70, 71-80
         
+        Args:
+            agregados: Agregados já calculados (None para calcular)
+        
         Returns:
             Lista com frequência por faixa
         """
-        resultados = self.resultado_model.buscar_todos()
-        faixas = {
-            '01-10': 0, '11-20': 0, '21-30': 0, '31-40': 0,
-            '41-50': 0, '51-60': 0, '61-70': 0, '71-80': 0
-        }
+        if agregados is None:
+            agregados = self.calcular_agregados()
         
-        for resultado in resultados:
-            dezenas = resultado.get('listaDezenas', [])
-            for dezena in dezenas:
-                numero = int(dezena)
-                if 1 <= numero <= 10:
-                    faixas['01-10'] += 1
-                elif 11 <= numero <= 20:
-                    faixas['11-20'] += 1
-                elif 21 <= numero <= 30:
-                    faixas['21-30'] += 1
-                elif 31 <= numero <= 40:
-                    faixas['31-40'] += 1
-                elif 41 <= numero <= 50:
-                    faixas['41-50'] += 1
-                elif 51 <= numero <= 60:
-                    faixas['51-60'] += 1
-                elif 61 <= numero <= 70:
-                    faixas['61-70'] += 1
-                elif 71 <= numero <= 80:
-                    faixas['71-80'] += 1
+        faixas = agregados['frequencia'].reshape(-1, 10).sum(axis=1)
         
         return [
-            {'faixa': faixa, 'frequencia': freq}
-            for faixa, freq in faixas.items()
+            {'faixa': f'{inicio:02d}-{inicio + 9:02d}', 'frequencia': freq}
+            for inicio, freq in zip(range(1, config.MAX_NUMEROS + 1, 10), faixas.tolist())
         ]
     
-    def calcular_por_digito(self) -> List[Dict]:
+    def calcular_por_digito(self, agregados: Optional[Dict] = None) -> List[Dict]:
         """
         Calcula a frequência por dígito final (0-9).
         
+        Args:
+            agregados: Agregados já calculados (None para calcular)
+        
         Returns:
             Lista com frequência por dígito
         """
-        resultados = self.resultado_model.buscar_todos()
-        digitos = {i: 0 for i in range(10)}
+        if agregados is None:
+            agregados = self.calcular_agregados()
         
-        for resultado in resultados:
-            dezenas = resultado.get('listaDezenas', [])
-            for dezena in dezenas:
-                numero = int(dezena)
-                digito = numero % 10
-                digitos[digito] += 1
+        # A coluna j de cada faixa contém os números com dígito final (j + 1) % 10
+        digitos = np.roll(agregados['frequencia'].reshape(-1, 10).sum(axis=0), 1)
         
         return [
             {'digito': dig, 'frequencia': freq}
-            for dig, freq in sorted(digitos.items())
+            for dig, freq in enumerate(digitos.tolist())
         ]
     
-    def calcular_por_posicao_sorteio(self) -> List[Dict]:
+    def calcular_por_posicao_sorteio(
+        self,
+        agregados: Optional[Dict] = None,
+        limite: Optional[int] = 10
+    ) -> List[Dict]:
         """
         Analisa a frequência de cada número em cada posição do sorteio (1ª a 7ª).
         
+        Args:
+            agregados: Agregados já calculados (None para calcular)
+            limite: Números por posição (None para todos os que já saíram na posição)
+        
         Returns:
             Lista com frequência por posição e número
         """
-        resultados = self.resultado_model.buscar_todos()
-        
-        # Dicionário: posicao -> numero -> frequencia
-        posicoes = {i: Counter() for i in range(1, 8)}
+        if agregados is None:
+            agregados = self.calcular_agregados()
         
-        for resultado in resultados:
-            dezenas_ordem = resultado.get('dezenasSorteadasOrdemSorteio', [])
-            for idx, dezena in enumerate(dezenas_ordem[:7], start=1):
-                numero = int(dezena)
-                posicoes[idx][numero] += 1
+        # Matriz posicao x numero -> frequencia
+        posicoes = agregados['posicoes']
         
         # Converter para formato de retorno
         resultado_posicoes = []
-        for posicao in range(1, 8):
+        for idx, linha in enumerate(posicoes):
+            ordem = np.argsort(-linha, kind='stable')[:limite]
+            ordem = ordem[linha[ordem] > 0]
             numeros_freq = [
                 {'numero': num, 'frequencia': freq}
-                for num, freq in posicoes[posicao].most_common(10)  # Top 10 por posição
+                for num, freq in zip((ordem + 1).tolist(), linha[ordem].tolist())
             ]
             resultado_posicoes.append({
-                'posicao': posicao,
+                'posicao': idx + 1,
                 'numeros': numeros_freq
             })
         
         return resultado_posicoes
     
-    def calcular_frequencia_times_coracao(self) -> List[Dict]:
+    def calcular_analise_posicional(
+        self,
+        ultimos: Optional[int] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> Dict:
+        """
+        Calcula a matriz completa posição x dezena (7 x 80) do histórico ou de uma janela.
+        
+        Tudo sai das somas acumuladas e das últimas ocorrências por posição da
+        matriz de sorteios em uma única passada vetorizada. O resultado do
+        histórico todo fica em cache até a versão dos dados mudar.
+        
+        Args:
+            ultimos: Considerar só os N concursos mais recentes
+            data_inicio: Primeira data de apuração (inclusive)
+            data_fim: Última data de apuração (inclusive)
+        
+        Returns:
+            Dicionário com total_concursos e matrizes 7 x 80 (linha = posição 1-7,
+            coluna = dezena 1-80):
+            - frequencia: Vezes em que a dezena saiu na posição
+            - atraso: Concursos desde a última vez em que a dezena saiu na posição
+            - probabilidade_dezena: P(dezena | posição), frequência / total da posição
+            - probabilidade_posicao: P(posição | dezena), frequência / total da dezena
+        """
+        janela_completa = ultimos is None and data_inicio is None and data_fim is None
+        
+        snapshot = self.resultado_model.obter_snapshot()
+        cache = self._posicional_cache
+        if janela_completa and cache is not None and cache[0] == snapshot.versao:
+            return cache[1]
+        
+        matriz = snapshot.matriz
+        inicio, fim = self._linhas_janela(matriz, ultimos, data_inicio, data_fim)
+        total = fim - inicio
+        
+        frequencia = (matriz.posicoes_acumuladas[fim] - matriz.posicoes_acumuladas[inicio]).astype(np.int64)
+        
+        if total:
+            ultima = matriz.ultima_linha_posicao[fim - 1]
+            atraso = np.where(ultima >= inicio, fim - 1 - ultima, total)
+        else:
+            atraso = np.zeros_like(frequencia)
+        
+        por_posicao = frequencia.sum(axis=1, keepdims=True)
+        por_dezena = frequencia.sum(axis=0, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            probabilidade_dezena = np.where(por_posicao > 0, frequencia / por_posicao, 0.0)
+            probabilidade_posicao = np.where(por_dezena > 0, frequencia / por_dezena, 0.0)
+        
+        analise = {
+            'total_concursos': total,
+            'frequencia': frequencia.tolist(),
+            'atraso': atraso.tolist(),
+            'probabilidade_dezena': np.round(probabilidade_dezena, 6).tolist(),
+            'probabilidade_posicao': np.round(probabilidade_posicao, 6).tolist()
+        }
+        
+        if janela_completa:
+            self._posicional_cache = (snapshot.versao, analise)
+        return analise
+    
+    def calcular_coocorrencia(self) -> np.ndarray:
+        """
+        Retorna a matriz de coocorrência de pares de dezenas.
+        
+        A matriz vem da tabela de pares mantida a cada gravação e fica em
+        cache até a versão dos dados mudar; a consulta de um par é O(1).
+        
+        Returns:
+            Matriz simétrica (80, 80) int64; [a - 1, b - 1] = concursos em que
+            a e b saíram juntas (diagonal zerada)
+        """
+        versao = self.resultado_model.versao_dados()
+        cache = self._coocorrencia_cache
+        if cache is not None and cache[0] == versao:
+            return cache[1]
+        
+        coocorrencia = self._coocorrencia_persistida()
+        
+        self._coocorrencia_cache = (versao, coocorrencia)
+        return coocorrencia
+    
+    def _coocorrencia_persistida(self) -> np.ndarray:
+        """
+        Monta a matriz de coocorrência a partir da tabela de pares.
+        
+        Returns:
+            Matriz simétrica (80, 80) int64
+        """
+        coocorrencia = np.zeros((config.MAX_NUMEROS, config.MAX_NUMEROS), dtype=np.int64)
+        pares = self.resultado_model.obter_pares()
+        if pares:
+            a, b, frequencia = np.array(pares, dtype=np.int64).T
+            validos = (a >= config.MIN_NUMEROS) & (b <= config.MAX_NUMEROS)
+            coocorrencia[a[validos] - 1, b[validos] - 1] = frequencia[validos]
+            coocorrencia[b[validos] - 1, a[validos] - 1] = frequencia[validos]
+        return coocorrencia
+    
+    def calcular_resumo_coocorrencia(self, limite_pares: int = 20, limite_trios: int = 10) -> Dict:
+        """
+        Resume a coocorrência de dezenas: matriz de pares e os pares e trios mais frequentes.
+        
+        Args:
+            limite_pares: Quantidade de pares mais frequentes
+            limite_trios: Quantidade de trios mais frequentes
+        
+        Returns:
+            Dicionário com total_concursos, matriz (80 x 80), pares_mais_frequentes
+            e trios_mais_frequentes ({dezenas, frequencia})
+        """
+        coocorrencia = self.calcular_coocorrencia()
+        
+        # Triângulo superior, da maior para a menor frequência (empates pelo menor par)
+        a, b = np.triu_indices(config.MAX_NUMEROS, k=1)
+        frequencia = coocorrencia[a, b]
+        ordem = np.argsort(-frequencia, kind='stable')[:limite_pares]
+        ordem = ordem[frequencia[ordem] > 0]
+        
+        return {
+            'total_concursos': self.calcular_agregados()['total_concursos'],
+            'matriz': coocorrencia.tolist(),
+            'pares_mais_frequentes': [
+                {'dezenas': [int(a[i]) + 1, int(b[i]) + 1], 'frequencia': int(frequencia[i])}
+                for i in ordem
+            ],
+            'trios_mais_frequentes': [
+                {'dezenas': [x, y, z], 'frequencia': quantidade}
+                for x, y, z, quantidade in self.resultado_model.buscar_trios_frequentes(limite_trios)
+            ]
+        }
+    
+    def calcular_frequencia_times_coracao(self, agregados: Optional[Dict] = None) -> List[Dict]:
         """
         Calcula a frequência de cada time do coração.
         
+        Args:
+            agregados: Agregados já calculados (None para calcular)
+        
         Returns:
             Lista ordenada por frequência com {time, frequencia}
         """
-        resultados = self.resultado_model.buscar_todos()
-        contador = Counter()
+        if agregados is None:
+            agregados = self.calcular_agregados()
         
-        for resultado in resultados:
-            time = resultado.get('nomeTimeCoracaoMesSorte', '')
-            if time:
-                contador[time] += 1
+        frequencia = agregados['times_frequencia']
+        nomes = agregados['times_nomes']
+        ordem = np.argsort(-frequencia, kind='stable')
         
         return [
-            {'time': time, 'frequencia': freq}
-            for time, freq in contador.most_common()
+            {'time': nomes[codigo], 'frequencia': freq}
+            for codigo, freq in zip(ordem.tolist(), frequencia[ordem].tolist())
         ]
     
-    def calcular_times_mais_sorteados(self, limite: int = 10) -> List[Dict]:
+    def calcular_times_mais_sorteados(
+        self,
+        limite: int = 10,
+        agregados: Optional[Dict] = None
+    ) -> List[Dict]:
         """
         Retorna os times do coração mais sorteados.
         
         Args:
             limite: Quantidade de times a retornar (padrão: 10)
+            agregados: Agregados já calculados (None para calcular)
             
         Returns:
             Lista dos times mais sorteados
         """
-        frequencia = self.calcular_frequencia_times_coracao()
+        frequencia = self.calcular_frequencia_times_coracao(agregados)
         return frequencia[:limite]
     
-    def calcular_times_mais_atrasados(self, limite: int = 10) -> List[Dict]:
+    def calcular_times_mais_atrasados(
+        self,
+        limite: Optional[int] = 10,
+        agregados: Optional[Dict] = None
+    ) -> List[Dict]:
         """
         Calcula os times do coração com maior atraso (mais tempo sem serem sorteados).
         
         Args:
-            limite: Quantidade de times a retornar (padrão: 10)
+            limite: Quantidade de times a retornar (padrão: 10, None para todos)
+            agregados: Agregados já calculados (None para calcular)
             
         Returns:
             Lista dos times mais atrasados
         """
-        resultados = self.resultado_model.buscar_todos()
-        if not resultados:
+        if agregados is None:
+            agregados = self.calcular_agregados()
+        
+        if not agregados['total_concursos']:
             return []
         
-        # Mapear último concurso de cada time
-        ultimos = {}
-        todos_times = set()
+        # Ordenar por atraso decrescente
+        atraso = agregados['times_atraso']
+        nomes = agregados['times_nomes']
+        ordem = np.argsort(-atraso, kind='stable')[:limite]
         
-        for idx, resultado in enumerate(resultados):
-            time = resultado.get('nomeTimeCoracaoMesSorte', '')
-            if time:
-                todos_times.add(time)
-                if time not in ultimos:
-                    ultimos[time] = idx
+        return [
+            {'time': nomes[codigo], 'atraso': valor}
+            for codigo, valor in zip(ordem.tolist(), atraso[ordem].tolist())
+        ]
+    
+    def calcular_estatisticas_dezena(
+        self,
+        dezena: int,
+        posicao: Optional[int] = None
+    ) -> Dict:
+        """
+        Calcula as estatísticas de uma dezena com consultas indexadas na
+        tabela de dezenas, sem carregar o histórico completo.
         
-        # Calcular atrasos
-        atrasos = []
-        for time in todos_times:
-            atraso = ultimos.get(time, len(resultados))
-            atrasos.append({'time': time, 'atraso': atraso})
+        Args:
+            dezena: Dezena analisada (1-80)
+            posicao: Restringe à posição do sorteio (1-7), None para qualquer posição
+            
+        Returns:
+            Dicionário com frequência, atraso, frequência por posição e
+            concursos em que a dezena saiu (do mais recente ao mais antigo)
+        """
+        ocorrencias = self.resultado_model.buscar_ocorrencias_dezena(dezena, posicao)
         
-        # Ordenar por atraso decrescente
-        atrasos.sort(key=lambda x: x['atraso'], reverse=True)
+        if ocorrencias:
+            atraso = self.resultado_model.contar_concursos_apos(ocorrencias[0]['concurso'])
+        else:
+            atraso = self.resultado_model.contar_resultados()
         
-        return atrasos[:limite]
+        por_posicao = Counter(ocorrencia['posicao'] for ocorrencia in ocorrencias)
+        
+        return {
+            'dezena': dezena,
+            'posicao': posicao,
+            'frequencia': len(ocorrencias),
+            'atraso': atraso,
+            'por_posicao': [
+                {'posicao': pos, 'frequencia': por_posicao[pos]}
+                for pos in range(1, config.NUMEROS_SORTEADOS + 1)
+                if posicao is None or pos == posicao
+            ],
+            'concursos': [ocorrencia['concurso'] for ocorrencia in ocorrencias]
+        }
+    
+    def calcular_combinacao(self, numeros: List[int]) -> Dict:
+        """
+        Calcula quantas vezes um conjunto de dezenas saiu inteiro e quantas
+        dezenas dele saíram em cada concurso do histórico.
+        
+        Usa as máscaras de bits do snapshot: o conjunto saiu inteiro quando
+        (sorteio & conjunto) == conjunto, e os acertos de cada concurso são a
+        contagem de bits de sorteio & conjunto.
+        
+        Args:
+            numeros: Dezenas do conjunto (1-80, sem repetição)
+            
+        Returns:
+            Dicionário com dezenas, frequencia (concursos com todas as dezenas),
+            atraso, concursos (do mais recente ao mais antigo) e acertos
+            (concursos por quantidade de dezenas do conjunto sorteadas)
+        """
+        matriz = self.resultado_model.obter_snapshot().matriz
+        conjunto = palavras_da_mascara(criar_mascara(numeros))
+        
+        intersecao = matriz.mascaras & conjunto
+        completos = np.nonzero((intersecao == conjunto).all(axis=1))[0]
+        acertos = np.bincount(
+            contar_bits_palavras(intersecao),
+            minlength=min(len(numeros), config.NUMEROS_SORTEADOS) + 1
+        )
+        
+        return {
+            'dezenas': sorted(numeros),
+            'frequencia': len(completos),
+            'atraso': int(len(matriz) - 1 - completos[-1]) if len(completos) else len(matriz),
+            'concursos': matriz.concursos[completos[::-1]].tolist(),
+            'acertos': {str(quantidade): total for quantidade, total in enumerate(acertos.tolist())}
+        }
+    
+    def obter_rankings(self) -> Dict:
+        """
+        Retorna as listas ordenadas usadas na geração de palpites.
+        
+        As listas são calculadas uma vez por versão dos dados e compartilhadas
+        entre todos os jogos e requisições até a próxima atualização da base.
+        
+        Returns:
+            Dicionário com:
+            - frequentes: Números do mais ao menos frequente
+            - atrasados: Números do mais ao menos atrasado
+            - por_posicao: Números de cada posição, do mais ao menos frequente
+              (formato de calcular_por_posicao_sorteio, sem limite)
+            - times_frequencia: Times do mais ao menos sorteado, com frequência
+            - times_atrasados: Times do mais ao menos atrasado, com atraso
+            - coocorrencia: Matriz (80, 80) de coocorrência de pares
+        """
+        versao = self.resultado_model.versao_dados()
+        cache = self._rankings_cache
+        if cache is not None and cache[0] == versao:
+            return cache[1]
+        
+        rankings = self.montar_rankings(self.calcular_agregados(), self.calcular_coocorrencia())
+        
+        self._rankings_cache = (versao, rankings)
+        return rankings
+    
+    def montar_rankings(self, agregados: Dict, coocorrencia: np.ndarray) -> Dict:
+        """
+        Monta as listas de obter_rankings a partir de agregados quaisquer
+        (por exemplo, os de uma janela do histórico).
+        
+        Args:
+            agregados: Agregados de calcular_agregados ou de uma janela
+            coocorrencia: Matriz (80, 80) de coocorrência de pares
+            
+        Returns:
+            Dicionário no formato de obter_rankings
+        """
+        return {
+            'frequentes': [item['numero'] for item in self.calcular_frequencia_numeros(agregados)],
+            'atrasados': [item['numero'] for item in self.calcular_atrasos(agregados)],
+            'por_posicao': self.calcular_por_posicao_sorteio(agregados, limite=None),
+            'times_frequencia': self.calcular_frequencia_times_coracao(agregados),
+            'times_atrasados': self.calcular_times_mais_atrasados(None, agregados),
+            'coocorrencia': coocorrencia
+        }
     
     def obter_numeros_mais_frequentes(self, limite: int = 20) -> List[int]:
         """
@@ -300,8 +793,7 @@ class EstatisticaService:
         Returns:
             Lista dos números mais frequentes
         """
-        frequencias = self.calcular_frequencia_numeros()
-        return [item['numero'] for item in frequencias[:limite]]
+        return self.obter_rankings()['frequentes'][:limite]
     
     def obter_numeros_mais_atrasados(self, limite: int = 20) -> List[int]:
         """
@@ -313,5 +805,4 @@ class EstatisticaService:
         Returns:
             Lista dos números mais atrasados
         """
-        atrasos = self.calcular_atrasos()
-        return [item['numero'] for item in atrasos[:limite]]
+        return self.obter_rankings()['atrasados'][:limite]
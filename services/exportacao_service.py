@@ -0,0 +1,99 @@
+"""
+Serviço para exportar o histórico de resultados da Timemania em NDJSON ou CSV.
+"""
+import csv
+import io
+import json
+from typing import Iterator, List, Optional
+from models.resultado_model import ResultadoModel
+
+
+class ExportacaoService:
+    """
+    Classe para gerar exportações do histórico linha a linha.
+    
+    As exportações são geradores de texto: cada concurso é lido do cursor do
+    banco, formatado e entregue, então a memória usada não cresce com o
+    tamanho do histórico.
+    """
+    
+    FORMATOS = ('ndjson', 'csv')
+    
+    def __init__(self):
+        """Inicializa o serviço de exportação."""
+        self.resultado_model = ResultadoModel()
+    
+    def exportar(
+        self,
+        formato: str = 'ndjson',
+        inicio: Optional[int] = None,
+        fim: Optional[int] = None,
+        campos: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """
+        Gera a exportação dos resultados em ordem crescente de concurso.
+        
+        Args:
+            formato: 'ndjson' (um objeto JSON por linha) ou 'csv'
+            inicio: Primeiro concurso (inclusive)
+            fim: Último concurso (inclusive)
+            campos: Colunas a exportar (None para todas)
+            
+        Returns:
+            Gerador de trechos de texto da exportação
+        """
+        if formato not in self.FORMATOS:
+            raise ValueError(f'Formato inválido: {formato}')
+        
+        if formato == 'csv':
+            return self._gerar_csv(inicio, fim, campos)
+        return self._gerar_ndjson(inicio, fim, campos)
+    
+    def _gerar_ndjson(
+        self,
+        inicio: Optional[int],
+        fim: Optional[int],
+        campos: Optional[List[str]]
+    ) -> Iterator[str]:
+        """
+        Gera uma linha JSON por concurso.
+        
+        Args:
+            inicio: Primeiro concurso (inclusive)
+            fim: Último concurso (inclusive)
+            campos: Colunas a exportar (None para todas)
+            
+        Yields:
+            Linhas NDJSON terminadas em quebra de linha
+        """
+        for resultado in self.resultado_model.iterar_resultados(inicio, fim, campos):
+            yield json.dumps(resultado, ensure_ascii=False) + '\n'
+    
+    def _gerar_csv(
+        self,
+        inicio: Optional[int],
+        fim: Optional[int],
+        campos: Optional[List[str]]
+    ) -> Iterator[str]:
+        """
+        Gera um CSV com cabeçalho; as colunas JSON (listas) saem como texto JSON.
+        
+        Args:
+            inicio: Primeiro concurso (inclusive)
+            fim: Último concurso (inclusive)
+            campos: Colunas a exportar (None para todas)
+            
+        Yields:
+            Linhas CSV
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        writer.writerow(self.resultado_model.colunas_projetadas(campos))
+        yield buffer.getvalue()
+        
+        for resultado in self.resultado_model.iterar_resultados(inicio, fim, campos, decodificar=False):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(resultado.values())
+            yield buffer.getvalue()
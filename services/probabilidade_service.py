@@ -0,0 +1,162 @@
+"""
+Serviço para calcular probabilidades exatas e o valor esperado dos jogos da Timemania.
+"""
+from math import comb, isfinite
+from typing import Dict, Optional
+import numpy as np
+import config
+from models.resultado_model import ResultadoModel
+
+# Combinações C(n, k) para n, k de 0 a 80, calculadas uma vez na importação
+TABELA_BINOMIAL = [[comb(n, k) for k in range(config.MAX_NUMEROS + 1)] for n in range(config.MAX_NUMEROS + 1)]
+
+# Total de sorteios possíveis: C(80, 7)
+TOTAL_SORTEIOS = TABELA_BINOMIAL[config.MAX_NUMEROS][config.NUMEROS_SORTEADOS]
+
+# Casos favoráveis por quantidade de números do jogo e de acertos (hipergeométrica):
+# C(q, k) * C(80 - q, 7 - k)
+CASOS_POR_ACERTOS = {
+    quantidade: [
+        TABELA_BINOMIAL[quantidade][acertos]
+        * TABELA_BINOMIAL[config.MAX_NUMEROS - quantidade][config.NUMEROS_SORTEADOS - acertos]
+        for acertos in range(config.NUMEROS_SORTEADOS + 1)
+    ]
+    for quantidade in range(config.MIN_JOGO, config.MAX_JOGO + 1)
+}
+
+# Faixas premiadas por acertos
+FAIXAS_PREMIADAS = tuple(range(3, config.NUMEROS_SORTEADOS + 1))
+
+
+class ProbabilidadeService:
+    """
+    Classe para calcular as chances de cada faixa e o valor esperado de um jogo.
+    
+    As probabilidades são exatas (hipergeométrica sobre as tabelas de
+    combinações montadas na importação do módulo); o valor esperado usa o
+    rateio médio histórico de cada faixa, em cache até a base mudar.
+    """
+    
+    def __init__(self):
+        """Inicializa o serviço de probabilidades."""
+        self.resultado_model = ResultadoModel()
+        self._rateio_cache = None
+    
+    def calcular_probabilidades(self, quantidade_numeros: int = 10) -> Dict:
+        """
+        Calcula a chance de cada faixa para um jogo com a quantidade de números informada.
+        
+        Args:
+            quantidade_numeros: Quantidade de números do jogo (10-15)
+            
+        Returns:
+            Dicionário com total_sorteios, a chance de cada quantidade de
+            acertos (casos favoráveis, probabilidade e "1 em N") e a do Time
+            do Coração
+            
+        Raises:
+            ValueError: Se a quantidade de números for inválida
+        """
+        if quantidade_numeros not in CASOS_POR_ACERTOS:
+            raise ValueError(f'Quantidade de números deve estar entre {config.MIN_JOGO} e {config.MAX_JOGO}')
+        
+        acertos = {}
+        for quantidade, casos in enumerate(CASOS_POR_ACERTOS[quantidade_numeros]):
+            acertos[str(quantidade)] = {
+                'casos_favoraveis': casos,
+                'probabilidade': casos / TOTAL_SORTEIOS,
+                'uma_em': round(TOTAL_SORTEIOS / casos, 2) if casos else None
+            }
+        
+        return {
+            'quantidade_numeros': quantidade_numeros,
+            'total_sorteios': TOTAL_SORTEIOS,
+            'acertos': acertos,
+            'time_coracao': {
+                'casos_favoraveis': 1,
+                'probabilidade': 1 / config.TOTAL_TIMES,
+                'uma_em': config.TOTAL_TIMES
+            }
+        }
+    
+    def calcular_rateio_medio(self) -> Dict:
+        """
+        Calcula o prêmio médio histórico de cada faixa a partir de listaRateioPremio.
+        
+        Cada faixa é média só dos concursos em que ela pagou prêmio: sem
+        ganhadores, o valor da faixa 7 acumula para o concurso seguinte, e
+        contá-lo como 0 subestimaria o que um acertador recebe.
+        
+        Returns:
+            Dicionário com concursos (com rateio informado), faixas
+            (acertos -> prêmio médio), concursos_premiados (acertos ->
+            concursos em que a faixa pagou) e time_coracao (prêmio médio)
+        """
+        versao = self.resultado_model.versao_dados()
+        cache = self._rateio_cache
+        if cache is not None and cache[0] == versao:
+            return cache[1]
+        
+        matriz = self.resultado_model.obter_snapshot().matriz
+        
+        # Só concursos com rateio divulgado (os sem listaRateioPremio ficam de fora)
+        com_rateio = (matriz.premios.any(axis=1)) | (matriz.premios_time > 0)
+        premios = matriz.premios[com_rateio]
+        premios_time = matriz.premios_time[com_rateio]
+        
+        def media_paga(valores: np.ndarray) -> float:
+            pagos = valores[valores > 0]
+            return round(float(pagos.mean()), 2) if len(pagos) else 0.0
+        
+        rateio = {
+            'concursos': int(com_rateio.sum()),
+            'faixas': {str(acertos): media_paga(premios[:, acertos]) for acertos in FAIXAS_PREMIADAS},
+            'concursos_premiados': {
+                str(acertos): int((premios[:, acertos] > 0).sum()) for acertos in FAIXAS_PREMIADAS
+            },
+            'time_coracao': media_paga(premios_time)
+        }
+        
+        self._rateio_cache = (versao, rateio)
+        return rateio
+    
+    def calcular_valor_esperado(self, quantidade_numeros: int = 10, preco: Optional[float] = None) -> Dict:
+        """
+        Combina as probabilidades exatas com o rateio médio histórico.
+        
+        Args:
+            quantidade_numeros: Quantidade de números do jogo (10-15)
+            preco: Preço da aposta (padrão: config.PRECO_APOSTA)
+            
+        Returns:
+            Dicionário com as probabilidades, o rateio médio, a contribuição
+            de cada faixa, valor_esperado, preco e retorno_esperado
+            (valor esperado menos o preço)
+            
+        Raises:
+            ValueError: Se a quantidade de números ou o preço forem inválidos
+        """
+        if preco is None:
+            preco = config.PRECO_APOSTA
+        if not isfinite(preco) or preco < 0:
+            raise ValueError('O preço da aposta deve ser um número finito e não negativo')
+        
+        probabilidades = self.calcular_probabilidades(quantidade_numeros)
+        rateio = self.calcular_rateio_medio()
+        
+        contribuicoes = {
+            str(acertos): probabilidades['acertos'][str(acertos)]['probabilidade'] * rateio['faixas'][str(acertos)]
+            for acertos in FAIXAS_PREMIADAS
+        }
+        contribuicoes['time_coracao'] = probabilidades['time_coracao']['probabilidade'] * rateio['time_coracao']
+        
+        valor_esperado = float(np.sum(list(contribuicoes.values())))
+        
+        return {
+            'probabilidades': probabilidades,
+            'rateio_medio': rateio,
+            'contribuicoes': {faixa: round(valor, 4) for faixa, valor in contribuicoes.items()},
+            'valor_esperado': round(valor_esperado, 4),
+            'preco': preco,
+            'retorno_esperado': round(valor_esperado - preco, 4)
+        }
@@ -0,0 +1,460 @@
+"""
+Serviço para simular sorteios (Monte Carlo) e comparar as estratégias com jogos aleatórios.
+"""
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import config
+from models.mascara_dezenas import contar_bits_palavras, empacotar_incidencia
+from services.probabilidade_service import CASOS_POR_ACERTOS, TOTAL_SORTEIOS
+from services.timemania_service import TimemaniaService
+
+# Estado de cada processo do pool, preparado por _inicializar_processo
+_estado_processo: Dict = {}
+
+
+def _inicializar_processo(rankings: Dict, codigos_times: Dict[str, int]):
+    """
+    Prepara um processo do pool com os rankings do histórico e os serviços.
+    
+    Args:
+        rankings: Listas ordenadas de EstatisticaService.obter_rankings
+        codigos_times: Nome do time (maiúsculo) -> código entre os 80 times
+    """
+    _estado_processo['rankings'] = rankings
+    _estado_processo['codigos_times'] = codigos_times
+    _estado_processo['timemania_service'] = TimemaniaService()
+
+
+def _conferir_bloco(
+    escolhidos: np.ndarray,
+    times: np.ndarray,
+    mascaras_sorteios: np.ndarray,
+    times_sorteados: np.ndarray,
+    placar: np.ndarray,
+    quadrados: Dict[str, np.ndarray]
+) -> np.ndarray:
+    """
+    Confere um bloco de jogos com os sorteios e acumula o placar.
+    
+    Os acertos são contados como em conferir_palpite: máscaras de 80 bits e
+    contagem de bits da interseção. Além do placar, guarda as somas dos
+    quadrados das contagens de cada sorteio, de onde saem as variâncias
+    por sorteio dos intervalos.
+    
+    Args:
+        escolhidos: Matriz booleana (sorteios * jogos, 80) dos jogos
+        times: Códigos (sorteios, jogos) dos times escolhidos (-1 = nenhum)
+        mascaras_sorteios: Máscaras (sorteios, 1, 2) dos sorteios
+        times_sorteados: Códigos (sorteios, 1) dos times sorteados
+        placar: Matriz (2, 8) da estratégia, alterada no lugar
+        quadrados: Somas dos quadrados da estratégia, alteradas no lugar
+        
+    Returns:
+        Vetor (sorteios,) com a soma dos acertos dos jogos de cada sorteio
+    """
+    quantidade, jogos = times.shape
+    mascaras = empacotar_incidencia(escolhidos).reshape(quantidade, jogos, -1)
+    acertos_sorteio = contar_bits_palavras(mascaras & mascaras_sorteios)
+    acertou_time = times == times_sorteados
+    
+    # Jogos de cada sorteio por quantidade de acertos (sorteios, 8)
+    contagens = (acertos_sorteio[:, :, None] == np.arange(config.NUMEROS_SORTEADOS + 1)).sum(axis=1)
+    soma_sorteio = acertos_sorteio.sum(axis=1)
+    
+    placar[0] += contagens.sum(axis=0)
+    placar[1] += np.bincount(acertos_sorteio[acertou_time], minlength=config.NUMEROS_SORTEADOS + 1)
+    quadrados['acertos'] += (contagens * contagens).sum(axis=0)
+    quadrados['premiados'] += (contagens[:, 3:].sum(axis=1) ** 2).sum()
+    quadrados['time'] += (acertou_time.sum(axis=1) ** 2).sum()
+    quadrados['soma'] += (soma_sorteio * soma_sorteio).sum()
+    return soma_sorteio
+
+
+def _executar_trecho(
+    sorteios: int,
+    estrategias: List[str],
+    quantidade_numeros: int,
+    jogos_por_sorteio: int,
+    semente: np.random.SeedSequence
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]]:
+    """
+    Simula um trecho de sorteios em um processo do pool.
+    
+    Cada sorteio simulado é uniforme (7 de 80 dezenas e 1 de 80 times). A
+    linha de base escolhe dezenas e time uniformemente; as estratégias
+    geram cada jogo com o mesmo código de gerar_palpite (gerar_numeros e
+    sugerir_time_coracao), sorteado com um random.Random da semente do trecho.
+    
+    Todas as estratégias jogam contra os mesmos sorteios, então as amostras
+    são pareadas: para cada sorteio, guarda-se a diferença entre a soma dos
+    acertos da estratégia e a da linha de base (em inteiros, para que a soma
+    entre trechos seja exata).
+    
+    Args:
+        sorteios: Quantidade de sorteios do trecho
+        estrategias: Estratégias simuladas (sem a linha de base)
+        quantidade_numeros: Quantidade de números por jogo
+        jogos_por_sorteio: Jogos gerados por estratégia para cada sorteio
+        semente: Semente do trecho
+        
+    Returns:
+        Dicionário estrategia -> (placar, diferencas, quadrados): placar é a
+        matriz (2, 8) com jogos por quantidade de acertos (0 a 7) na linha 0
+        e jogos que também acertaram o time na linha 1; diferencas é o vetor
+        (2,) com a soma e a soma dos quadrados das diferenças por sorteio para
+        a linha de base; quadrados tem as somas dos quadrados, por sorteio,
+        das contagens de acertos, premiados, acertos do time e da soma dos acertos
+    """
+    rankings = _estado_processo['rankings']
+    codigos_times = _estado_processo['codigos_times']
+    timemania_service = _estado_processo['timemania_service']
+    
+    semente_sorteios, semente_jogos = semente.spawn(2)
+    rng = np.random.default_rng(semente_sorteios)
+    timemania_service.aleatorio = random.Random(int(semente_jogos.generate_state(1)[0]))
+    
+    todas = [SimulacaoService.ESTRATEGIA_ALEATORIA] + estrategias
+    placar = {estrategia: np.zeros((2, config.NUMEROS_SORTEADOS + 1), dtype=np.int64) for estrategia in todas}
+    diferencas = {estrategia: np.zeros(2, dtype=np.int64) for estrategia in todas}
+    quadrados = {
+        estrategia: {
+            'acertos': np.zeros(config.NUMEROS_SORTEADOS + 1, dtype=np.int64),
+            'premiados': np.zeros((), dtype=np.int64),
+            'time': np.zeros((), dtype=np.int64),
+            'soma': np.zeros((), dtype=np.int64)
+        }
+        for estrategia in todas
+    }
+    
+    # Sorteios por bloco, para manter cada bloco de jogos do tamanho de gerar_lote
+    por_bloco = max(1, TimemaniaService.TAMANHO_BLOCO_LOTE // jogos_por_sorteio)
+    
+    for inicio in range(0, sorteios, por_bloco):
+        quantidade = min(por_bloco, sorteios - inicio)
+        jogos = quantidade * jogos_por_sorteio
+        
+        # Sem blocos, sortear_jogos completa cada linha com dezenas uniformes
+        sorteadas = timemania_service.sortear_jogos(rng, [], config.NUMEROS_SORTEADOS, quantidade)
+        mascaras_sorteios = empacotar_incidencia(sorteadas)[:, None, :]
+        times_sorteados = rng.integers(config.TOTAL_TIMES, size=(quantidade, 1))
+        
+        # Linha de base antes das estratégias, que se comparam a ela
+        soma_base = _conferir_bloco(
+            timemania_service.sortear_jogos(rng, [], quantidade_numeros, jogos),
+            rng.integers(config.TOTAL_TIMES, size=(quantidade, jogos_por_sorteio)),
+            mascaras_sorteios,
+            times_sorteados,
+            placar[SimulacaoService.ESTRATEGIA_ALEATORIA],
+            quadrados[SimulacaoService.ESTRATEGIA_ALEATORIA]
+        )
+        
+        for estrategia in estrategias:
+            escolhidos = np.zeros((jogos, config.MAX_NUMEROS), dtype=bool)
+            times = np.empty(jogos, dtype=np.int64)
+            for jogo in range(jogos):
+                numeros = timemania_service.gerar_numeros(estrategia, quantidade_numeros, rankings)
+                escolhidos[jogo, np.asarray(numeros, dtype=np.int64) - 1] = True
+                time = timemania_service.sugerir_time_coracao(estrategia, rankings)['time']
+                times[jogo] = codigos_times.get(time.strip().upper(), -1)
+            
+            soma_sorteio = _conferir_bloco(
+                escolhidos,
+                times.reshape(quantidade, jogos_por_sorteio),
+                mascaras_sorteios,
+                times_sorteados,
+                placar[estrategia],
+                quadrados[estrategia]
+            )
+            diferenca = soma_sorteio - soma_base
+            diferencas[estrategia] += [diferenca.sum(), (diferenca * diferenca).sum()]
+    
+    return {estrategia: (placar[estrategia], diferencas[estrategia], quadrados[estrategia]) for estrategia in todas}
+
+
+class SimulacaoService:
+    """
+    Classe para comparar as estratégias com jogos aleatórios em sorteios simulados.
+    
+    As estratégias geram seus jogos com o código de gerar_palpite e os
+    rankings do histórico atual; a linha de base 'aleatoria' escolhe
+    dezenas e time uniformemente. Os sorteios são
+    divididos em trechos de tamanho fixo, executados em um pool de
+    processos; cada trecho tem sua própria semente (SeedSequence.spawn),
+    então o resultado depende só da semente, nunca da quantidade de
+    processos.
+    """
+    
+    # Sorteios por trecho enviado ao pool
+    TAMANHO_TRECHO = 20000
+    
+    # Linha de base: dezenas e time escolhidos uniformemente
+    ESTRATEGIA_ALEATORIA = 'aleatoria'
+    
+    def __init__(self):
+        """Inicializa o serviço de simulação."""
+        self.timemania_service = TimemaniaService()
+    
+    def executar(
+        self,
+        estrategias: Optional[List[str]] = None,
+        quantidade_numeros: int = 10,
+        sorteios: int = 100000,
+        jogos_por_sorteio: int = 1,
+        semente: Optional[int] = None,
+        processos: Optional[int] = None,
+        confianca: float = 0.95
+    ) -> Dict:
+        """
+        Executa a simulação.
+        
+        Args:
+            estrategias: Estratégias simuladas (None para todas de config.ESTRATEGIAS);
+                a linha de base 'aleatoria' é sempre incluída
+            quantidade_numeros: Quantidade de números por jogo (10-15)
+            sorteios: Quantidade de sorteios simulados
+            jogos_por_sorteio: Jogos gerados por estratégia para cada sorteio
+            semente: Semente da simulação (None para sortear uma)
+            processos: Processos do pool (padrão: config.SIMULACAO_PROCESSOS;
+                0 = um por CPU, 1 = sem pool)
+            confianca: Nível de confiança dos intervalos (entre 0 e 1)
+            
+        Returns:
+            Dicionário com os parâmetros, a semente e, por estratégia, a
+            distribuição de acertos, média de acertos, premiados e acertos
+            do time, cada um com seu intervalo de confiança
+            
+        Raises:
+            ValueError: Se algum parâmetro for inválido
+        """
+        estrategias = list(estrategias or config.ESTRATEGIAS)
+        invalidas = [estrategia for estrategia in estrategias if estrategia not in config.ESTRATEGIAS]
+        if invalidas:
+            raise ValueError(f'Estratégias inválidas: {", ".join(invalidas)}')
+        
+        if not config.MIN_JOGO <= quantidade_numeros <= config.MAX_JOGO:
+            raise ValueError(f'Quantidade de números deve estar entre {config.MIN_JOGO} e {config.MAX_JOGO}')
+        
+        if sorteios < 1 or jogos_por_sorteio < 1:
+            raise ValueError('As quantidades de sorteios e de jogos por sorteio devem ser positivas')
+        
+        if not 0 < confianca < 1:
+            raise ValueError('O nível de confiança deve estar entre 0 e 1')
+        
+        if semente is None:
+            semente = int(np.random.SeedSequence().generate_state(1)[0])
+        
+        rankings = self.timemania_service.estatistica_service.obter_rankings()
+        
+        # Os times já sorteados ocupam os primeiros códigos entre os 80 times
+        codigos_times = {
+            time['time'].strip().upper(): codigo
+            for codigo, time in enumerate(rankings['times_frequencia'])
+        }
+        
+        trechos = [
+            min(self.TAMANHO_TRECHO, sorteios - inicio)
+            for inicio in range(0, sorteios, self.TAMANHO_TRECHO)
+        ]
+        sementes = np.random.SeedSequence(semente).spawn(len(trechos))
+        argumentos = [
+            (trecho, estrategias, quantidade_numeros, jogos_por_sorteio, trecho_semente)
+            for trecho, trecho_semente in zip(trechos, sementes)
+        ]
+        
+        if processos is None:
+            processos = config.SIMULACAO_PROCESSOS
+        processos = min(processos or os.cpu_count() or 1, len(trechos))
+        
+        if processos <= 1:
+            _inicializar_processo(rankings, codigos_times)
+            placares = [_executar_trecho(*args) for args in argumentos]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processos,
+                initializer=_inicializar_processo,
+                initargs=(rankings, codigos_times)
+            ) as executor:
+                placares = list(executor.map(_executar_trecho, *zip(*argumentos)))
+        
+        z = NormalDist().inv_cdf((1 + confianca) / 2)
+        totais = {
+            estrategia: (
+                sum(placar[estrategia][0] for placar in placares),
+                sum(placar[estrategia][1] for placar in placares),
+                {
+                    chave: sum(placar[estrategia][2][chave] for placar in placares)
+                    for chave in placares[0][estrategia][2]
+                }
+            )
+            for estrategia in [self.ESTRATEGIA_ALEATORIA] + estrategias
+        }
+        
+        return {
+            'quantidade_numeros': quantidade_numeros,
+            'sorteios': sorteios,
+            'jogos_por_sorteio': jogos_por_sorteio,
+            'semente': semente,
+            'confianca': confianca,
+            'estrategias': {
+                estrategia: self._resumir(
+                    placar,
+                    None if estrategia == self.ESTRATEGIA_ALEATORIA else diferencas,
+                    quadrados,
+                    sorteios,
+                    jogos_por_sorteio,
+                    quantidade_numeros,
+                    z
+                )
+                for estrategia, (placar, diferencas, quadrados) in totais.items()
+            }
+        }
+    
+    @staticmethod
+    def _variancia_por_sorteio(soma: int, soma_quadrados: int, sorteios: int) -> float:
+        """
+        Variância amostral de um valor medido uma vez por sorteio.
+        
+        Args:
+            soma: Soma do valor entre os sorteios
+            soma_quadrados: Soma dos quadrados do valor
+            sorteios: Quantidade de sorteios
+            
+        Returns:
+            Variância amostral (0 com menos de dois sorteios)
+        """
+        if sorteios < 2:
+            return 0.0
+        return max(0.0, (soma_quadrados - soma * soma / sorteios) / (sorteios - 1))
+    
+    @classmethod
+    def _intervalo_proporcao(
+        cls,
+        sucessos: int,
+        soma_quadrados: int,
+        sorteios: int,
+        jogos_por_sorteio: int,
+        z: float
+    ) -> List[float]:
+        """
+        Intervalo de Wilson para uma proporção (válido também com 0 sucessos).
+        
+        Os jogos de um mesmo sorteio não são independentes (conferem contra
+        as mesmas dezenas), então a variância vem das contagens por sorteio e
+        o intervalo usa o tamanho efetivo da amostra: jogos / efeito do
+        agrupamento, no máximo o número de jogos (que é o tamanho com um jogo
+        por sorteio). Com 0 ou só sucessos não há variância para estimar o
+        efeito, e o tamanho efetivo é a quantidade de sorteios.
+        
+        Args:
+            sucessos: Quantidade de sucessos
+            soma_quadrados: Soma dos quadrados dos sucessos de cada sorteio
+            sorteios: Quantidade de sorteios
+            jogos_por_sorteio: Jogos por sorteio
+            z: Quantil da normal para o nível de confiança
+            
+        Returns:
+            Lista [inferior, superior]
+        """
+        total = sorteios * jogos_por_sorteio
+        if not total:
+            return [0.0, 0.0]
+        
+        proporcao = sucessos / total
+        efetivo = total
+        if jogos_por_sorteio > 1:
+            # Variância da proporção pelos sorteios e supondo jogos independentes
+            agrupada = cls._variancia_por_sorteio(sucessos, soma_quadrados, sorteios) / (sorteios * jogos_por_sorteio ** 2)
+            independente = proporcao * (1 - proporcao) / total
+            if independente == 0:
+                efetivo = sorteios
+            elif agrupada > independente:
+                efetivo = total * independente / agrupada
+        
+        denominador = 1 + z * z / efetivo
+        centro = (proporcao + z * z / (2 * efetivo)) / denominador
+        margem = z * math.sqrt(proporcao * (1 - proporcao) / efetivo + z * z / (4 * efetivo * efetivo)) / denominador
+        return [max(0.0, centro - margem), min(1.0, centro + margem)]
+    
+    def _resumir(
+        self,
+        placar: np.ndarray,
+        diferencas: Optional[np.ndarray],
+        quadrados: Dict[str, np.ndarray],
+        sorteios: int,
+        jogos_por_sorteio: int,
+        quantidade_numeros: int,
+        z: float
+    ) -> Dict:
+        """
+        Resume o placar de uma estratégia com intervalos de confiança.
+        
+        Args:
+            placar: Matriz (2, 8) de _executar_trecho somada entre os trechos
+            diferencas: Soma e soma dos quadrados das diferenças por sorteio
+                para a linha de base (None para a própria linha de base)
+            quadrados: Somas dos quadrados por sorteio de _executar_trecho,
+                somadas entre os trechos
+            sorteios: Quantidade de sorteios simulados
+            jogos_por_sorteio: Jogos por estratégia em cada sorteio
+            quantidade_numeros: Quantidade de números por jogo
+            z: Quantil da normal para o nível de confiança
+            
+        Returns:
+            Dicionário com jogos, acertos (jogos, proporção, intervalo e a
+            probabilidade exata de cada quantidade de acertos), media_acertos,
+            premiados, acertos_time e, exceto na linha de base,
+            diferenca_media (em relação a ela)
+        """
+        por_acertos, com_time = placar
+        jogos = int(por_acertos.sum())
+        
+        def proporcao(sucessos: int, soma_quadrados: int) -> Dict:
+            return {
+                'jogos': sucessos,
+                'proporcao': sucessos / jogos if jogos else 0.0,
+                'intervalo': self._intervalo_proporcao(sucessos, soma_quadrados, sorteios, jogos_por_sorteio, z)
+            }
+        
+        acertos = {}
+        for quantidade, (total, soma_quadrados) in enumerate(zip(por_acertos.tolist(), quadrados['acertos'].tolist())):
+            acertos[str(quantidade)] = proporcao(total, soma_quadrados)
+            acertos[str(quantidade)]['probabilidade_exata'] = (
+                CASOS_POR_ACERTOS[quantidade_numeros][quantidade] / TOTAL_SORTEIOS
+            )
+        
+        # Média por jogo; a variância vem da soma dos acertos de cada sorteio
+        soma = int(por_acertos @ np.arange(len(por_acertos)))
+        media = soma / jogos if jogos else 0.0
+        variancia = self._variancia_por_sorteio(soma, int(quadrados['soma']), sorteios)
+        margem = z * math.sqrt(variancia / sorteios) / jogos_por_sorteio if sorteios else 0.0
+        
+        resumo = {
+            'jogos': jogos,
+            'acertos': acertos,
+            'media_acertos': {
+                'valor': round(media, 6),
+                'intervalo': [round(media - margem, 6), round(media + margem, 6)],
+                'exata': quantidade_numeros * config.NUMEROS_SORTEADOS / config.MAX_NUMEROS
+            },
+            'premiados': proporcao(int(por_acertos[3:].sum()), int(quadrados['premiados'])),
+            'acertos_time': proporcao(int(com_time.sum()), int(quadrados['time']))
+        }
+        
+        if diferencas is not None:
+            # Amostras pareadas (mesmos sorteios): intervalo da média das
+            # diferenças por sorteio, média ± z * desvio / raiz(n)
+            soma, soma_quadrados = (int(valor) for valor in diferencas)
+            diferenca = soma / (sorteios * jogos_por_sorteio)
+            variancia_diferenca = self._variancia_por_sorteio(soma, soma_quadrados, sorteios)
+            margem_diferenca = z * math.sqrt(variancia_diferenca / sorteios) / jogos_por_sorteio
+            resumo['diferenca_media'] = {
+                'valor': round(diferenca, 6),
+                'intervalo': [round(diferenca - margem_diferenca, 6), round(diferenca + margem_diferenca, 6)]
+            }
+        
+        return resumo
@@ -2,8 +2,11 @@
 Serviço para geração de palpites da Timemania usando estatísticas.
 """
 import random
-from typing import List, Dict, Set
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import config
+from models.mascara_dezenas import contar_bits, criar_mascara, mascara_das_palavras, numeros_da_mascara
+from models.resultado_model import ResultadoModel
 from services.estatistica_service import EstatisticaService
 
 
@@ -12,9 +15,21 @@ class TimemaniaService:
     Classe para gerar palpites baseados em estratégias estatísticas.
     """
     
+    # Jogos sorteados por vez em gerar_lote (limita a memória das chaves)
+    TAMANHO_BLOCO_LOTE = 16384
+    
+    # Blocos seguidos sem nenhum jogo novo antes de encerrar um lote sem repetição
+    MAX_RODADAS_SEM_NOVOS = 20
+    
+    # Palpites conferidos por vez em conferir_lote (limita a matriz palpites x concursos)
+    TAMANHO_BLOCO_CONFERENCIA = 1024
+    
     def __init__(self):
         """Inicializa o serviço de palpites."""
         self.estatistica_service = EstatisticaService()
+        self.resultado_model = ResultadoModel()
+        # Sorteios das estratégias jogo a jogo (o backtest troca por um random.Random com semente)
+        self.aleatorio = random
     
     def gerar_palpite(
         self,
@@ -43,11 +58,14 @@ class TimemaniaService:
         if estrategia not in config.ESTRATEGIAS:
             estrategia = 'equilibrada'
         
+        # Estatísticas resolvidas uma única vez para todos os jogos
+        rankings = self.estatistica_service.obter_rankings()
+        
         # Gerar jogos
         jogos = []
         for _ in range(quantidade_jogos):
-            numeros = self._gerar_numeros_por_estrategia(estrategia, quantidade_numeros)
-            time = self.sugerir_time_coracao(estrategia)
+            numeros = self.gerar_numeros(estrategia, quantidade_numeros, rankings)
+            time = self.sugerir_time_coracao(estrategia, rankings)
             
             jogos.append({
                 'numeros': sorted(numeros),
@@ -58,129 +76,484 @@ class TimemaniaService:
         
         return jogos
     
-    def _gerar_numeros_por_estrategia(
+    def gerar_lote(
+        self,
+        estrategia: str = 'equilibrada',
+        quantidade_numeros: int = 10,
+        quantidade_jogos: int = 1000,
+        semente: Optional[int] = None
+    ) -> Dict:
+        """
+        Gera muitos jogos de uma vez, com todos os sorteios vetorizados.
+        
+        Cada estratégia vira uma sequência de blocos (pesos das 80 dezenas,
+        quantidade). Cada bloco é um sorteio ponderado sem reposição feito para
+        todos os jogos ao mesmo tempo pelo truque Gumbel-top-k, na forma
+        exponencial: cada dezena recebe a chave E / peso, com E ~ Exp(1), e as
+        menores chaves vencem. O que os blocos não preencherem é completado
+        com dezenas uniformes.
+        
+        Args:
+            estrategia: Tipo de estratégia ('equilibrada', 'agressiva', etc.)
+            quantidade_numeros: Quantidade de números por jogo (10-15)
+            quantidade_jogos: Quantidade de jogos (1 a config.PALPITES_LOTE_MAX_JOGOS)
+            semente: Semente do gerador (None para sortear uma); com a mesma
+                semente, parâmetros e base, os jogos se repetem
+            
+        Returns:
+            Dicionário com estrategia, quantidade_numeros, quantidade_jogos,
+            semente, numeros (ndarray (jogos, quantidade_numeros), cada linha em
+            ordem crescente) e times (time sugerido para cada jogo)
+        """
+        semente, rng, blocos, nomes_times = self._preparar_lote(
+            estrategia, quantidade_numeros, quantidade_jogos, semente, config.PALPITES_LOTE_MAX_JOGOS
+        )
+        
+        numeros = np.empty((quantidade_jogos, quantidade_numeros), dtype=np.uint8)
+        for inicio in range(0, quantidade_jogos, self.TAMANHO_BLOCO_LOTE):
+            fim = min(inicio + self.TAMANHO_BLOCO_LOTE, quantidade_jogos)
+            escolhidos = self.sortear_jogos(rng, blocos, quantidade_numeros, fim - inicio)
+            numeros[inicio:fim] = self._numeros_escolhidos(escolhidos, quantidade_numeros)
+        
+        times = nomes_times[rng.integers(len(nomes_times), size=quantidade_jogos)].tolist()
+        
+        return {
+            'estrategia': estrategia,
+            'quantidade_numeros': quantidade_numeros,
+            'quantidade_jogos': quantidade_jogos,
+            'semente': semente,
+            'numeros': numeros,
+            'times': times
+        }
+    
+    def iterar_lote(
+        self,
+        estrategia: str = 'equilibrada',
+        quantidade_numeros: int = 10,
+        quantidade_jogos: int = 1000,
+        semente: Optional[int] = None,
+        sem_repeticao: bool = False
+    ) -> Tuple[int, Iterator[Tuple[np.ndarray, List[str]]]]:
+        """
+        Gera um lote de jogos aos poucos, para respostas em streaming.
+        
+        Os jogos saem em blocos de config.PALPITES_STREAM_BLOCO, sorteados só
+        quando o bloco anterior foi consumido; fora o conjunto de jogos já
+        vistos (com sem_repeticao), nada do lote fica em memória.
+        
+        Args:
+            estrategia: Tipo de estratégia ('equilibrada', 'agressiva', etc.)
+            quantidade_numeros: Quantidade de números por jogo (10-15)
+            quantidade_jogos: Quantidade de jogos (1 a config.PALPITES_STREAM_MAX_JOGOS)
+            semente: Semente do gerador (None para sortear uma)
+            sem_repeticao: Se True, nenhum jogo se repete no lote; se a estratégia
+                não tiver combinações distintas suficientes, o lote termina antes
+            
+        Returns:
+            Tupla (semente usada, gerador de blocos (numeros, times))
+        
+        Raises:
+            ValueError: Se algum parâmetro for inválido
+        """
+        semente, rng, blocos, nomes_times = self._preparar_lote(
+            estrategia, quantidade_numeros, quantidade_jogos, semente, config.PALPITES_STREAM_MAX_JOGOS
+        )
+        jogos = self._gerar_blocos_lote(
+            rng, blocos, nomes_times, quantidade_numeros, quantidade_jogos, sem_repeticao
+        )
+        return semente, jogos
+    
+    def _gerar_blocos_lote(
+        self,
+        rng: np.random.Generator,
+        blocos: List[Tuple[np.ndarray, int]],
+        nomes_times: np.ndarray,
+        quantidade_numeros: int,
+        quantidade_jogos: int,
+        sem_repeticao: bool
+    ) -> Iterator[Tuple[np.ndarray, List[str]]]:
+        """
+        Sorteia os jogos de iterar_lote bloco a bloco.
+        
+        Args:
+            rng: Gerador de números aleatórios
+            blocos: Blocos da estratégia (_blocos_estrategia)
+            nomes_times: Times candidatos
+            quantidade_numeros: Quantidade de números por jogo
+            quantidade_jogos: Quantidade de jogos
+            sem_repeticao: Se True, descarta jogos já gerados; sem combinações
+                distintas novas por MAX_RODADAS_SEM_NOVOS blocos, para antes
+                de quantidade_jogos
+            
+        Yields:
+            Tuplas (numeros (n, quantidade_numeros), times)
+        """
+        # Jogos já gerados, como 10 bytes (uma marca por dezena)
+        vistos = set()
+        rodadas_sem_novos = 0
+        restantes = quantidade_jogos
+        
+        while restantes > 0:
+            escolhidos = self.sortear_jogos(
+                rng, blocos, quantidade_numeros, min(config.PALPITES_STREAM_BLOCO, restantes)
+            )
+            
+            if sem_repeticao:
+                novos = []
+                for linha, chave in enumerate(map(bytes, np.packbits(escolhidos, axis=1))):
+                    if chave not in vistos:
+                        vistos.add(chave)
+                        novos.append(linha)
+                
+                if not novos:
+                    rodadas_sem_novos += 1
+                    if rodadas_sem_novos >= self.MAX_RODADAS_SEM_NOVOS:
+                        return
+                    continue
+                
+                rodadas_sem_novos = 0
+                escolhidos = escolhidos[novos]
+            
+            restantes -= len(escolhidos)
+            times = nomes_times[rng.integers(len(nomes_times), size=len(escolhidos))].tolist()
+            yield self._numeros_escolhidos(escolhidos, quantidade_numeros), times
+    
+    def _preparar_lote(
+        self,
+        estrategia: str,
+        quantidade_numeros: int,
+        quantidade_jogos: int,
+        semente: Optional[int],
+        maximo_jogos: int
+    ) -> Tuple[int, np.random.Generator, List[Tuple[np.ndarray, int]], np.ndarray]:
+        """
+        Valida os parâmetros de um lote e resolve o que o sorteio precisa.
+        
+        Args:
+            estrategia: Nome da estratégia
+            quantidade_numeros: Quantidade de números por jogo
+            quantidade_jogos: Quantidade de jogos
+            semente: Semente do gerador (None para sortear uma)
+            maximo_jogos: Limite de jogos do lote
+            
+        Returns:
+            Tupla (semente, gerador, blocos da estratégia, times candidatos)
+        
+        Raises:
+            ValueError: Se algum parâmetro for inválido
+        """
+        if not config.MIN_JOGO <= quantidade_numeros <= config.MAX_JOGO:
+            raise ValueError(f'Quantidade de números deve estar entre {config.MIN_JOGO} e {config.MAX_JOGO}')
+        
+        if not 1 <= quantidade_jogos <= maximo_jogos:
+            raise ValueError(f'Quantidade de jogos deve estar entre 1 e {maximo_jogos}')
+        
+        if estrategia not in config.ESTRATEGIAS:
+            raise ValueError(f'Estratégia inválida: {estrategia}')
+        
+        if semente is None:
+            semente = int(np.random.SeedSequence().generate_state(1)[0])
+        rng = np.random.default_rng(semente)
+        
+        rankings = self.estatistica_service.obter_rankings()
+        blocos = self._blocos_estrategia(estrategia, quantidade_numeros, rankings)
+        
+        candidatos = self._candidatos_time(estrategia, rankings)
+        nomes_times = np.array([time['time'] for time in candidatos] or ['Não disponível'], dtype=object)
+        
+        return semente, rng, blocos, nomes_times
+    
+    def sortear_jogos(
+        self,
+        rng: np.random.Generator,
+        blocos: List[Tuple[np.ndarray, int]],
+        quantidade_numeros: int,
+        quantidade_jogos: int
+    ) -> np.ndarray:
+        """
+        Sorteia um bloco de jogos seguindo os blocos da estratégia.
+        
+        Sem blocos, cada jogo recebe quantidade_numeros dezenas uniformes.
+        Também usado pela simulação.
+        
+        Args:
+            rng: Gerador de números aleatórios
+            blocos: Blocos da estratégia (_blocos_estrategia)
+            quantidade_numeros: Quantidade de números por jogo
+            quantidade_jogos: Quantidade de jogos
+            
+        Returns:
+            Matriz booleana (jogos, 80) com quantidade_numeros marcas por linha
+        """
+        escolhidos = np.zeros((quantidade_jogos, config.MAX_NUMEROS), dtype=bool)
+        
+        for pesos, quantidade in blocos:
+            self._sortear_bloco(rng, escolhidos, pesos, quantidade)
+        
+        # Completar o que faltou (pool esgotado pelas dezenas já escolhidas)
+        faltam = quantidade_numeros - escolhidos.sum(axis=1)
+        self._sortear_bloco(rng, escolhidos, np.ones(config.MAX_NUMEROS), faltam)
+        
+        return escolhidos
+    
+    @staticmethod
+    def _numeros_escolhidos(escolhidos: np.ndarray, quantidade_numeros: int) -> np.ndarray:
+        """
+        Converte a matriz de marcas em números dos jogos.
+        
+        Args:
+            escolhidos: Matriz booleana (jogos, 80)
+            quantidade_numeros: Quantidade de números por jogo
+            
+        Returns:
+            Matriz (jogos, quantidade_numeros) uint8, cada linha em ordem crescente
+        """
+        return (np.nonzero(escolhidos)[1] + 1).reshape(-1, quantidade_numeros).astype(np.uint8)
+    
+    @staticmethod
+    def _sortear_bloco(
+        rng: np.random.Generator,
+        escolhidos: np.ndarray,
+        pesos: np.ndarray,
+        quantidade
+    ):
+        """
+        Marca, em cada jogo, dezenas sorteadas sem reposição com probabilidade
+        proporcional aos pesos, ignorando as já escolhidas.
+        
+        Args:
+            rng: Gerador de números aleatórios
+            escolhidos: Matriz (jogos, 80) de dezenas escolhidas, alterada no lugar
+            pesos: Pesos (80,) das dezenas; peso zero fica fora do sorteio
+            quantidade: Dezenas a sortear (um inteiro ou um por jogo); se o pool
+                acabar, o jogo recebe menos
+        """
+        quantidade = np.broadcast_to(np.asarray(quantidade), (len(escolhidos),))
+        colunas = np.flatnonzero(pesos > 0)
+        maximo = min(int(quantidade.max()) if len(quantidade) else 0, len(colunas))
+        if maximo <= 0:
+            return
+        
+        # Chaves só para as dezenas do pool; menor E / peso vence
+        # (equivale a Gumbel-top-k sobre log(peso)). Com pesos iguais, basta
+        # uma chave uniforme, que é mais barata de gerar.
+        forma = (len(escolhidos), len(colunas))
+        if np.ptp(pesos[colunas]) == 0:
+            chaves = rng.random(forma, dtype=np.float32)
+        else:
+            chaves = rng.standard_exponential(forma, dtype=np.float32)
+            chaves /= pesos[colunas].astype(np.float32)
+        np.copyto(chaves, np.inf, where=escolhidos[:, colunas])
+        
+        candidatas = np.argpartition(chaves, maximo - 1, axis=1)[:, :maximo]
+        chaves_candidatas = np.take_along_axis(chaves, candidatas, axis=1)
+        
+        if quantidade.min() < maximo:
+            # Quantidades diferentes por jogo: ordenar só as candidatas
+            ordem = np.argsort(chaves_candidatas, axis=1)
+            candidatas = np.take_along_axis(candidatas, ordem, axis=1)
+            chaves_candidatas = np.take_along_axis(chaves_candidatas, ordem, axis=1)
+        
+        selecionadas = np.isfinite(chaves_candidatas) & (np.arange(maximo) < quantidade[:, None])
+        escolhidos[np.nonzero(selecionadas)[0], colunas[candidatas[selecionadas]]] = True
+    
+    def _blocos_estrategia(
         self,
         estrategia: str,
-        quantidade: int
+        quantidade: int,
+        rankings: Dict
+    ) -> List[Tuple[np.ndarray, int]]:
+        """
+        Traduz uma estratégia para os blocos de sorteio usados em gerar_lote
+        e iterar_lote.
+        
+        Os blocos seguem as proporções das estratégias de gerar_palpite; por
+        posição e coocorrência, que lá são gulosas, viram pesos (maior
+        frequência em alguma posição e coocorrência com os 10 mais frequentes).
+        
+        Args:
+            estrategia: Nome da estratégia
+            quantidade: Quantidade de números por jogo
+            rankings: Listas ordenadas de EstatisticaService.obter_rankings
+            
+        Returns:
+            Lista de (pesos (80,), quantidade a sortear)
+        """
+        def pool(numeros: List[int]) -> np.ndarray:
+            pesos = np.zeros(config.MAX_NUMEROS)
+            pesos[np.asarray(numeros, dtype=np.int64) - 1] = 1
+            return pesos
+        
+        frequentes = rankings['frequentes']
+        atrasados = rankings['atrasados']
+        
+        if estrategia == 'agressiva':
+            return [(pool(frequentes[:30]), int(quantidade * 0.8))]
+        elif estrategia == 'conservadora':
+            return [(pool(atrasados[:30]), int(quantidade * 0.8))]
+        elif estrategia == 'mista':
+            return [
+                (pool(frequentes[:20]), int(quantidade * 0.4)),
+                (pool(atrasados[:20]), int(quantidade * 0.4))
+            ]
+        elif estrategia == 'atrasados':
+            return [(pool(atrasados[:quantidade * 2]), quantidade)]
+        elif estrategia == 'por_faixa':
+            # 8 faixas de 10 números, as primeiras recebem o resto
+            return [
+                (pool(range(inicio, inicio + 10)), quantidade // 8 + (1 if i < quantidade % 8 else 0))
+                for i, inicio in enumerate(range(1, config.MAX_NUMEROS + 1, 10))
+            ]
+        elif estrategia == 'por_posicao':
+            pesos = np.zeros(config.MAX_NUMEROS)
+            for posicao_data in rankings['por_posicao']:
+                for item in posicao_data.get('numeros', []):
+                    pesos[item['numero'] - 1] = max(pesos[item['numero'] - 1], item['frequencia'])
+            return [(pesos, quantidade)]
+        elif estrategia == 'coocorrencia':
+            nucleo = np.asarray(frequentes[:10], dtype=np.int64) - 1
+            pesos = rankings['coocorrencia'][nucleo].sum(axis=0).astype(np.float64)
+            return [(pesos, quantidade)]
+        else:
+            return [
+                (pool(frequentes[:20]), quantidade // 2),
+                (pool(atrasados[:20]), quantidade - quantidade // 2)
+            ]
+    
+    @staticmethod
+    def _candidatos_time(estrategia: str, rankings: Dict) -> List[Dict]:
+        """
+        Times entre os quais gerar_lote sorteia o time de cada jogo (os mesmos
+        critérios de sugerir_time_coracao).
+        
+        Args:
+            estrategia: Nome da estratégia
+            rankings: Listas ordenadas de EstatisticaService.obter_rankings
+            
+        Returns:
+            Lista de times candidatos
+        """
+        if estrategia == 'agressiva' and rankings['times_frequencia']:
+            return rankings['times_frequencia'][:3]
+        if estrategia == 'conservadora' and rankings['times_atrasados']:
+            return rankings['times_atrasados'][:3]
+        
+        todos_times = rankings['times_frequencia']
+        meio = len(todos_times) // 2
+        candidatos = todos_times[meio - 5:meio + 5] if len(todos_times) > 10 else todos_times
+        return candidatos or todos_times
+    
+    def gerar_numeros(
+        self,
+        estrategia: str,
+        quantidade: int,
+        rankings: Dict
     ) -> List[int]:
         """
-        Gera números baseados na estratégia específica.
+        Gera os números de um jogo pela estratégia específica.
+        
+        Usado por gerar_palpite e, com os rankings de cada concurso passado,
+        pelo backtest.
         
         Args:
             estrategia: Nome da estratégia
             quantidade: Quantidade de números a gerar
+            rankings: Listas ordenadas de EstatisticaService.obter_rankings
             
         Returns:
             Lista de números gerados
         """
         if estrategia == 'equilibrada':
-            return self._estrategia_equilibrada(quantidade)
+            return self._estrategia_equilibrada(quantidade, rankings)
         elif estrategia == 'agressiva':
-            return self._estrategia_agressiva(quantidade)
+            return self._estrategia_agressiva(quantidade, rankings)
         elif estrategia == 'conservadora':
-            return self._estrategia_conservadora(quantidade)
+            return self._estrategia_conservadora(quantidade, rankings)
         elif estrategia == 'mista':
-            return self._estrategia_mista(quantidade)
+            return self._estrategia_mista(quantidade, rankings)
         elif estrategia == 'atrasados':
-            return self._estrategia_atrasados(quantidade)
+            return self._estrategia_atrasados(quantidade, rankings)
         elif estrategia == 'por_faixa':
-            return self._estrategia_por_faixa(quantidade)
+            return self._estrategia_por_faixa(quantidade, rankings)
         elif estrategia == 'por_posicao':
-            return self._estrategia_por_posicao(quantidade)
+            return self._estrategia_por_posicao(quantidade, rankings)
+        elif estrategia == 'coocorrencia':
+            return self._estrategia_coocorrencia(quantidade, rankings)
         else:
-            return self._estrategia_equilibrada(quantidade)
+            return self._estrategia_equilibrada(quantidade, rankings)
     
-    def _estrategia_equilibrada(self, quantidade: int) -> List[int]:
+    def _estrategia_equilibrada(self, quantidade: int, rankings: Dict) -> List[int]:
         """
         Estratégia equilibrada: Mix de números frequentes e atrasados.
         50% frequentes, 50% atrasados.
         """
-        frequentes = self.estatistica_service.obter_numeros_mais_frequentes(40)
-        atrasados = self.estatistica_service.obter_numeros_mais_atrasados(40)
+        frequentes = rankings['frequentes'][:40]
+        atrasados = rankings['atrasados'][:40]
         
         metade = quantidade // 2
         numeros = set()
         
         # Adicionar metade de frequentes
-        numeros.update(random.sample(frequentes[:20], min(metade, len(frequentes[:20]))))
+        numeros.update(self.aleatorio.sample(frequentes[:20], min(metade, len(frequentes[:20]))))
         
         # Completar com atrasados
-        while len(numeros) < quantidade:
-            candidatos = [n for n in atrasados if n not in numeros]
-            if candidatos:
-                numeros.add(random.choice(candidatos[:20]))
-            else:
-                # Se não houver mais candidatos, adicionar aleatório
-                todos = list(range(1, config.MAX_NUMEROS + 1))
-                disponiveis = [n for n in todos if n not in numeros]
-                if disponiveis:
-                    numeros.add(random.choice(disponiveis))
-                else:
-                    break
+        candidatos = [n for n in atrasados if n not in numeros][:20]
+        numeros.update(self.aleatorio.sample(candidatos, min(quantidade - len(numeros), len(candidatos))))
+        
+        # Se não houver mais candidatos, completar com aleatórios
+        self._completar_aleatorio(numeros, quantidade)
         
         return list(numeros)
     
-    def _estrategia_agressiva(self, quantidade: int) -> List[int]:
+    def _estrategia_agressiva(self, quantidade: int, rankings: Dict) -> List[int]:
         """
         Estratégia agressiva: Prioriza números mais frequentes.
         80% frequentes, 20% outros.
         """
-        frequentes = self.estatistica_service.obter_numeros_mais_frequentes(40)
+        frequentes = rankings['frequentes'][:40]
         
         quantidade_frequentes = int(quantidade * 0.8)
         numeros = set()
         
         # Adicionar números frequentes
-        numeros.update(random.sample(
+        numeros.update(self.aleatorio.sample(
             frequentes[:30],
             min(quantidade_frequentes, len(frequentes[:30]))
         ))
         
         # Completar com números aleatórios
-        while len(numeros) < quantidade:
-            todos = list(range(1, config.MAX_NUMEROS + 1))
-            disponiveis = [n for n in todos if n not in numeros]
-            if disponiveis:
-                numeros.add(random.choice(disponiveis))
-            else:
-                break
+        self._completar_aleatorio(numeros, quantidade)
         
         return list(numeros)
     
-    def _estrategia_conservadora(self, quantidade: int) -> List[int]:
+    def _estrategia_conservadora(self, quantidade: int, rankings: Dict) -> List[int]:
         """
         Estratégia conservadora: Prioriza números atrasados.
         80% atrasados, 20% outros.
         """
-        atrasados = self.estatistica_service.obter_numeros_mais_atrasados(40)
+        atrasados = rankings['atrasados'][:40]
         
         quantidade_atrasados = int(quantidade * 0.8)
         numeros = set()
         
         # Adicionar números atrasados
-        numeros.update(random.sample(
+        numeros.update(self.aleatorio.sample(
             atrasados[:30],
             min(quantidade_atrasados, len(atrasados[:30]))
         ))
         
         # Completar com números aleatórios
-        while len(numeros) < quantidade:
-            todos = list(range(1, config.MAX_NUMEROS + 1))
-            disponiveis = [n for n in todos if n not in numeros]
-            if disponiveis:
-                numeros.add(random.choice(disponiveis))
-            else:
-                break
+        self._completar_aleatorio(numeros, quantidade)
         
         return list(numeros)
     
-    def _estrategia_mista(self, quantidade: int) -> List[int]:
+    def _estrategia_mista(self, quantidade: int, rankings: Dict) -> List[int]:
         """
         Estratégia mista: Combina múltiplas estratégias.
         40% frequentes, 40% atrasados, 20% aleatórios.
         """
-        frequentes = self.estatistica_service.obter_numeros_mais_frequentes(30)
-        atrasados = self.estatistica_service.obter_numeros_mais_atrasados(30)
+        frequentes = rankings['frequentes'][:30]
+        atrasados = rankings['atrasados'][:30]
         
         qtd_frequentes = int(quantidade * 0.4)
         qtd_atrasados = int(quantidade * 0.4)
@@ -188,7 +561,7 @@ class TimemaniaService:
         numeros = set()
         
         # Adicionar frequentes
-        numeros.update(random.sample(
+        numeros.update(self.aleatorio.sample(
             frequentes[:20],
             min(qtd_frequentes, len(frequentes[:20]))
         ))
@@ -196,30 +569,35 @@ class TimemaniaService:
         # Adicionar atrasados
         candidatos_atrasados = [n for n in atrasados[:20] if n not in numeros]
         if candidatos_atrasados:
-            numeros.update(random.sample(
+            numeros.update(self.aleatorio.sample(
                 candidatos_atrasados,
                 min(qtd_atrasados, len(candidatos_atrasados))
             ))
         
         # Completar com aleatórios
-        while len(numeros) < quantidade:
-            todos = list(range(1, config.MAX_NUMEROS + 1))
-            disponiveis = [n for n in todos if n not in numeros]
-            if disponiveis:
-                numeros.add(random.choice(disponiveis))
-            else:
-                break
+        self._completar_aleatorio(numeros, quantidade)
         
         return list(numeros)
     
-    def _estrategia_atrasados(self, quantidade: int) -> List[int]:
+    def _completar_aleatorio(self, numeros: set, quantidade: int):
+        """
+        Completa o jogo com números aleatórios ainda não escolhidos.
+        
+        Args:
+            numeros: Números já escolhidos, alterado no lugar
+            quantidade: Tamanho final do jogo
+        """
+        disponiveis = [n for n in range(config.MIN_NUMEROS, config.MAX_NUMEROS + 1) if n not in numeros]
+        numeros.update(self.aleatorio.sample(disponiveis, max(0, min(quantidade - len(numeros), len(disponiveis)))))
+    
+    def _estrategia_atrasados(self, quantidade: int, rankings: Dict) -> List[int]:
         """
         Estratégia focada em atrasados: Apenas números com maior atraso.
         """
-        atrasados = self.estatistica_service.obter_numeros_mais_atrasados(quantidade * 2)
-        return random.sample(atrasados[:quantidade * 2], min(quantidade, len(atrasados)))
+        atrasados = rankings['atrasados'][:quantidade * 2]
+        return self.aleatorio.sample(atrasados[:quantidade * 2], min(quantidade, len(atrasados)))
     
-    def _estrategia_por_faixa(self, quantidade: int) -> List[int]:
+    def _estrategia_por_faixa(self, quantidade: int, rankings: Dict) -> List[int]:
         """
         Estratégia por faixa: Distribui números uniformemente pelas faixas.
         """
@@ -234,25 +612,19 @@ class TimemaniaService:
         for i, faixa in enumerate(faixas):
             qtd = numeros_por_faixa + (1 if i < resto else 0)
             if qtd > 0:
-                numeros.update(random.sample(faixa, min(qtd, len(faixa))))
+                numeros.update(self.aleatorio.sample(faixa, min(qtd, len(faixa))))
         
         # Se ainda faltam números, completar aleatoriamente
-        while len(numeros) < quantidade:
-            todos = list(range(1, config.MAX_NUMEROS + 1))
-            disponiveis = [n for n in todos if n not in numeros]
-            if disponiveis:
-                numeros.add(random.choice(disponiveis))
-            else:
-                break
+        self._completar_aleatorio(numeros, quantidade)
         
         return list(numeros)
     
-    def _estrategia_por_posicao(self, quantidade: int) -> List[int]:
+    def _estrategia_por_posicao(self, quantidade: int, rankings: Dict) -> List[int]:
         """
         Estratégia por posição: Usa análise posicional do sorteio.
         Seleciona números mais frequentes em cada posição.
         """
-        por_posicao = self.estatistica_service.calcular_por_posicao_sorteio()
+        por_posicao = rankings['por_posicao']
         
         numeros = set()
         
@@ -266,32 +638,75 @@ class TimemaniaService:
                 # Escolher aleatoriamente entre os top 3 dessa posição
                 candidatos = [n['numero'] for n in numeros_posicao[:3] if n['numero'] not in numeros]
                 if candidatos:
-                    numeros.add(random.choice(candidatos))
+                    numeros.add(self.aleatorio.choice(candidatos))
+        
+        # Completar percorrendo as posições em rodízio, cada uma do mais ao menos frequente
+        filas = [[n['numero'] for n in posicao_data.get('numeros', [])] for posicao_data in por_posicao]
+        while len(numeros) < quantidade and any(filas):
+            for fila in filas:
+                while fila and fila[0] in numeros:
+                    fila.pop(0)
+                if fila and len(numeros) < quantidade:
+                    numeros.add(fila.pop(0))
         
         # Completar se necessário
         if len(numeros) < quantidade:
-            frequentes = self.estatistica_service.obter_numeros_mais_frequentes(40)
+            frequentes = rankings['frequentes'][:40]
             candidatos = [n for n in frequentes if n not in numeros]
             while len(numeros) < quantidade and candidatos:
                 numeros.add(candidatos.pop(0))
         
         return list(numeros)
     
-    def sugerir_time_coracao(self, estrategia: str = 'equilibrada') -> Dict:
+    def _estrategia_coocorrencia(self, quantidade: int, rankings: Dict) -> List[int]:
+        """
+        Estratégia por coocorrência: Parte de um número frequente e acrescenta
+        os números que mais saíram junto com os já escolhidos.
+        """
+        coocorrencia = rankings['coocorrencia']
+        
+        # Semente entre os 10 mais frequentes
+        numeros = [self.aleatorio.choice(rankings['frequentes'][:10])]
+        
+        # Soma, para cada dezena, a coocorrência com as escolhidas (uma linha por passo)
+        afinidade = coocorrencia[numeros[0] - 1].copy()
+        afinidade[numeros[0] - 1] = -1
+        
+        while len(numeros) < quantidade:
+            # Escolher aleatoriamente entre os top 3 de maior afinidade
+            candidatos = [int(i) + 1 for i in afinidade.argsort()[::-1][:3] if afinidade[i] >= 0]
+            if not candidatos:
+                break
+            escolhido = self.aleatorio.choice(candidatos)
+            numeros.append(escolhido)
+            afinidade += coocorrencia[escolhido - 1]
+            afinidade[[n - 1 for n in numeros]] = -1
+        
+        return numeros
+    
+    def sugerir_time_coracao(
+        self,
+        estrategia: str = 'equilibrada',
+        rankings: Optional[Dict] = None
+    ) -> Dict:
         """
         Sugere um time do coração baseado em estatísticas.
         
         Args:
             estrategia: Tipo de estratégia para sugerir o time
+            rankings: Listas ordenadas já resolvidas (None para obter)
             
         Returns:
             Dicionário com informações do time sugerido
         """
+        if rankings is None:
+            rankings = self.estatistica_service.obter_rankings()
+        
         if estrategia == 'agressiva':
             # Time mais sorteado recentemente
-            times = self.estatistica_service.calcular_times_mais_sorteados(10)
+            times = rankings['times_frequencia'][:10]
             if times:
-                time_escolhido = random.choice(times[:3])  # Top 3
+                time_escolhido = self.aleatorio.choice(times[:3])  # Top 3
                 return {
                     'time': time_escolhido['time'],
                     'motivo': 'Time mais sorteado recentemente',
@@ -300,9 +715,9 @@ class TimemaniaService:
         
         elif estrategia == 'conservadora':
             # Time mais atrasado
-            times = self.estatistica_service.calcular_times_mais_atrasados(10)
+            times = rankings['times_atrasados'][:10]
             if times:
-                time_escolhido = random.choice(times[:3])  # Top 3 atrasados
+                time_escolhido = self.aleatorio.choice(times[:3])  # Top 3 atrasados
                 return {
                     'time': time_escolhido['time'],
                     'motivo': 'Time mais atrasado',
@@ -311,13 +726,13 @@ class TimemaniaService:
         
         else:
             # Equilibrada ou outras: escolher aleatoriamente com peso
-            todos_times = self.estatistica_service.calcular_frequencia_times_coracao()
+            todos_times = rankings['times_frequencia']
             if todos_times:
                 # Escolher aleatoriamente entre times com frequência mediana
                 meio = len(todos_times) // 2
                 candidatos = todos_times[meio - 5:meio + 5] if len(todos_times) > 10 else todos_times
                 if candidatos:
-                    time_escolhido = random.choice(candidatos)
+                    time_escolhido = self.aleatorio.choice(candidatos)
                     return {
                         'time': time_escolhido['time'],
                         'motivo': 'Time com frequência equilibrada',
@@ -325,9 +740,9 @@ class TimemaniaService:
                     }
         
         # Fallback: retornar time aleatório
-        todos_times = self.estatistica_service.calcular_frequencia_times_coracao()
+        todos_times = rankings['times_frequencia']
         if todos_times:
-            time_escolhido = random.choice(todos_times)
+            time_escolhido = self.aleatorio.choice(todos_times)
             return {
                 'time': time_escolhido['time'],
                 'motivo': 'Time escolhido aleatoriamente',
@@ -349,6 +764,9 @@ class TimemaniaService:
         """
         Confere um palpite com o resultado de um concurso.
         
+        O concurso vem do snapshot em memória, e os acertos são a contagem
+        de bits da interseção das máscaras do palpite e do sorteio.
+        
         Args:
             numeros: Lista de números do palpite
             time_coracao: Time do coração escolhido
@@ -357,20 +775,22 @@ class TimemaniaService:
         Returns:
             Dicionário com resultado da conferência
         """
-        from models.resultado_model import ResultadoModel
+        snapshot = self.resultado_model.obter_snapshot()
+        linha = snapshot.matriz.linha_concurso(int(numero_concurso))
         
-        resultado_model = ResultadoModel()
-        resultado = resultado_model.buscar_por_numero(numero_concurso)
-        
-        if not resultado:
+        if linha is None:
             return {
                 'sucesso': False,
                 'mensagem': 'Concurso não encontrado'
             }
         
+        # Snapshot do mais recente ao mais antigo, matriz em ordem cronológica
+        resultado = snapshot.resultados[len(snapshot.resultados) - 1 - linha]
+        
         # Conferir números
-        numeros_sorteados = [int(n) for n in resultado.get('listaDezenas', [])]
-        acertos = len(set(numeros) & set(numeros_sorteados))
+        sorteio = mascara_das_palavras(snapshot.matriz.mascaras[linha])
+        acertados = criar_mascara(numeros) & sorteio
+        acertos = contar_bits(acertados)
         
         # Conferir time
         time_sorteado = resultado.get('nomeTimeCoracaoMesSorte', '')
@@ -394,10 +814,138 @@ class TimemaniaService:
             'concurso': numero_concurso,
             'data': resultado.get('dataApuracao'),
             'acertos': acertos,
-            'numeros_sorteados': numeros_sorteados,
-            'numeros_acertados': list(set(numeros) & set(numeros_sorteados)),
+            'numeros_sorteados': numeros_da_mascara(sorteio),
+            'numeros_acertados': numeros_da_mascara(acertados),
             'acertou_time': acertou_time,
             'time_sorteado': time_sorteado,
             'faixa_premio': faixa_premio,
             'premiado': acertos >= 3 or acertou_time
         }
+    
+    def conferir_lote(
+        self,
+        palpites: List[Dict],
+        inicio: Optional[int] = None,
+        fim: Optional[int] = None,
+        detalhar: bool = False
+    ) -> Dict:
+        """
+        Confere muitos palpites contra um intervalo de concursos de uma vez.
+        
+        Palpites e concursos viram vetores 0/1 de 80 posições (float32); os
+        acertos de todos os pares (palpite, concurso) saem de um único produto
+        de matrizes, feito pelo BLAS. Para blocos de muitos pares, ele é mais
+        rápido do que o AND com contagem de bits das máscaras de 80 bits
+        (matriz.mascaras), usado para um palpite só. Os prêmios vêm de
+        listaRateioPremio de cada concurso.
+        
+        Args:
+            palpites: Lista de {numeros, time_coracao (opcional)}
+            inicio: Primeiro concurso (inclusive, padrão: o mais antigo)
+            fim: Último concurso (inclusive, padrão: o mais recente)
+            detalhar: Se True, inclui cada premiação (palpite, concurso, faixa)
+            
+        Returns:
+            Dicionário com o intervalo conferido, o resumo por palpite (acertos
+            por faixa, concursos premiados e valor), os totais por faixa e o
+            valor total
+        
+        Raises:
+            ValueError: Se algum palpite ou o intervalo for inválido
+        """
+        if not palpites:
+            raise ValueError('Informe ao menos um palpite')
+        
+        if len(palpites) > config.CONFERENCIA_MAX_PALPITES:
+            raise ValueError(f'No máximo {config.CONFERENCIA_MAX_PALPITES} palpites por conferência')
+        
+        apostas = np.zeros((len(palpites), config.MAX_NUMEROS), dtype=np.float32)
+        for indice, palpite in enumerate(palpites):
+            numeros = palpite.get('numeros') if isinstance(palpite, dict) else None
+            if (
+                not isinstance(numeros, list)
+                or not all(isinstance(n, int) and config.MIN_NUMEROS <= n <= config.MAX_NUMEROS for n in numeros)
+                or len(set(numeros)) != len(numeros)
+                or not config.MIN_JOGO <= len(numeros) <= config.MAX_JOGO
+            ):
+                raise ValueError(f'Palpite {indice} inválido: informe de {config.MIN_JOGO} a {config.MAX_JOGO} números distintos entre 1 e 80')
+            apostas[indice, np.array(numeros) - 1] = 1
+        
+        matriz = self.resultado_model.obter_snapshot().matriz
+        linha_inicio = 0 if inicio is None else int(np.searchsorted(matriz.concursos, inicio))
+        linha_fim = len(matriz) if fim is None else int(np.searchsorted(matriz.concursos, fim, side='right'))
+        if linha_inicio >= linha_fim:
+            raise ValueError('Nenhum concurso no intervalo informado')
+        
+        concursos = matriz.concursos[linha_inicio:linha_fim]
+        sorteios = matriz.incidencia[linha_inicio:linha_fim].astype(np.float32)
+        premios = matriz.premios[linha_inicio:linha_fim]
+        premios_time = matriz.premios_time[linha_inicio:linha_fim]
+        times_sorteados = matriz.times[linha_inicio:linha_fim]
+        
+        # Time de cada palpite como código da matriz (-2 = nunca sorteado)
+        codigos = {nome.strip().upper(): codigo for codigo, nome in enumerate(matriz.nomes_times)}
+        times_palpites = np.array([
+            codigos.get(str(palpite.get('time_coracao') or '').strip().upper(), -2)
+            for palpite in palpites
+        ])
+        
+        faixas = list(range(3, config.NUMEROS_SORTEADOS + 1))
+        por_faixa = np.zeros((len(palpites), len(faixas) + 1), dtype=np.int64)
+        concursos_premiados = np.zeros(len(palpites), dtype=np.int64)
+        valores = np.zeros(len(palpites))
+        premiacoes = []
+        
+        colunas = np.arange(len(concursos))
+        for bloco in range(0, len(palpites), self.TAMANHO_BLOCO_CONFERENCIA):
+            fatia = slice(bloco, bloco + self.TAMANHO_BLOCO_CONFERENCIA)
+            
+            # (palpites, concursos): acertos = bits em comum entre as máscaras
+            acertos = (apostas[fatia] @ sorteios.T).astype(np.int64)
+            acertou_time = times_palpites[fatia, None] == times_sorteados[None, :]
+            valor = premios[colunas, acertos] + acertou_time * premios_time
+            premiado = (acertos >= 3) | acertou_time
+            
+            for posicao, faixa in enumerate(faixas):
+                por_faixa[fatia, posicao] = (acertos == faixa).sum(axis=1)
+            por_faixa[fatia, -1] = acertou_time.sum(axis=1)
+            concursos_premiados[fatia] = premiado.sum(axis=1)
+            valores[fatia] = valor.sum(axis=1)
+            
+            if detalhar:
+                for linha, coluna in zip(*np.nonzero(premiado)):
+                    premiacoes.append({
+                        'palpite': bloco + int(linha),
+                        'concurso': int(concursos[coluna]),
+                        'acertos': int(acertos[linha, coluna]),
+                        'acertou_time': bool(acertou_time[linha, coluna]),
+                        'valor': round(float(valor[linha, coluna]), 2)
+                    })
+        
+        nomes_faixas = [f'{faixa} acertos' for faixa in faixas] + ['Time do Coração']
+        
+        resultado = {
+            'sucesso': True,
+            'concurso_inicial': int(concursos[0]),
+            'concurso_final': int(concursos[-1]),
+            'total_concursos': len(concursos),
+            'total_palpites': len(palpites),
+            'palpites': [
+                {
+                    'palpite': indice,
+                    'faixas': dict(zip(nomes_faixas, contagem)),
+                    'concursos_premiados': premiados,
+                    'valor_total': round(valor, 2)
+                }
+                for indice, (contagem, premiados, valor) in enumerate(zip(
+                    por_faixa.tolist(), concursos_premiados.tolist(), valores.tolist()
+                ))
+            ],
+            'faixas': dict(zip(nomes_faixas, por_faixa.sum(axis=0).tolist())),
+            'valor_total': round(float(valores.sum()), 2)
+        }
+        
+        if detalhar:
+            resultado['premiacoes'] = premiacoes
+        
+        return resultado
@@ -41,7 +41,35 @@ const formatDate = (dateStr) => {
     return dateStr;
 };
 
+const aguardar = (ms) => {
+    return new Promise(resolve => setTimeout(resolve, ms));
+};
+
 // Funções da API
+async function acompanharAtualizacao(tarefaId, btn) {
+    // A atualização roda em segundo plano; consultar o progresso até terminar
+    while (true) {
+        const response = await fetch(`${API_BASE}/atualizar/${tarefaId}`);
+        const data = await response.json();
+        
+        if (!data.sucesso) {
+            throw new Error(data.mensagem || 'Tarefa de atualização não encontrada');
+        }
+        
+        const tarefa = data.tarefa;
+        if (tarefa.status === 'concluida' || tarefa.status === 'erro') {
+            return tarefa;
+        }
+        
+        if (btn && tarefa.progresso.total > 0) {
+            const processados = tarefa.progresso.baixados + tarefa.progresso.falhas;
+            btn.textContent = `Atualizando... ${processados}/${tarefa.progresso.total}`;
+        }
+        
+        await aguardar(2000);
+    }
+}
+
 async function atualizarBase() {
     try {
         const btn = document.getElementById('btn-atualizar');
@@ -57,7 +85,15 @@ async function atualizarBase() {
             }
         });
         
-        const data = await response.json();
+        const inicio = await response.json();
+        
+        if (!inicio.sucesso) {
+            alert(`Erro ao atualizar: ${inicio.mensagem}`);
+            return;
+        }
+        
+        const tarefa = await acompanharAtualizacao(inicio.tarefa.id, btn);
+        const data = tarefa.resultado || {};
         
         if (data.sucesso) {
             alert(`Base atualizada com sucesso!\n\nNovos concursos: ${data.novos}\nTotal cadastrados: ${data.total_cadastrados}`);
@@ -120,16 +156,24 @@ async function carregarUltimoResultado() {
     }
 }
 
-async function carregarEstatisticas() {
+async function carregarEstatisticas(ultimos = null) {
     try {
-        showLoading('estatisticas-gerais');
+        // Ao mover a janela, manter as estatísticas atuais na tela até chegar a resposta
+        if (!document.querySelector('#estatisticas-gerais .card')) {
+            showLoading('estatisticas-gerais');
+        }
         
-        const response = await fetch(`${API_BASE}/estatisticas`);
+        const url = ultimos === null ? `${API_BASE}/estatisticas` : `${API_BASE}/estatisticas?ultimos=${ultimos}`;
+        const response = await fetch(url);
         const data = await response.json();
         
         if (data.sucesso && data.estatisticas) {
             const stats = data.estatisticas;
             
+            if (ultimos === null) {
+                configurarJanelaEstatisticas(stats.total_concursos);
+            }
+            
             // Estatísticas Gerais
             let html = `
                 <div class="card">
@@ -287,6 +331,32 @@ async function carregarEstatisticas() {
     }
 }
 
+function configurarJanelaEstatisticas(total) {
+    // Slider "últimos N concursos"; no máximo (o total exato), o histórico todo.
+    // Passo 1 para que o máximo seja alcançável com qualquer total
+    const janela = document.getElementById('janela-estatisticas');
+    const slider = document.getElementById('janela-ultimos');
+    if (!janela || !slider || total <= 10) return;
+    
+    slider.max = total;
+    slider.value = total;
+    janela.hidden = false;
+    
+    if (slider.dataset.configurado) return;
+    slider.dataset.configurado = 'true';
+    
+    let temporizador = null;
+    slider.addEventListener('input', () => {
+        const valor = parseInt(slider.value);
+        const todos = valor >= parseInt(slider.max);
+        document.getElementById('janela-ultimos-valor').textContent =
+            todos ? 'todos os concursos' : `últimos ${valor} concursos`;
+        
+        clearTimeout(temporizador);
+        temporizador = setTimeout(() => carregarEstatisticas(todos ? null : valor), 150);
+    });
+}
+
 async function gerarPalpites() {
     try {
         const estrategia = document.getElementById('estrategia').value;
@@ -351,7 +421,7 @@ async function gerarPalpites() {
 async function conferirPalpite() {
     try {
         const numerosInput = document.getElementById('numeros-conferir').value;
-        const timeCor acao = document.getElementById('time-conferir').value;
+        const timeCoracao = document.getElementById('time-conferir').value;
         const concurso = parseInt(document.getElementById('concurso-conferir').value);
         
         // Validar entrada
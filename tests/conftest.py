@@ -0,0 +1,200 @@
+"""
+Fixtures compartilhadas pelos testes do sistema de análise da Timemania.
+"""
+import json
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+import pytest
+
+# Os módulos do projeto são importados a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+
+TIMES = [f'TIME {i:02d}        UF' for i in range(1, config.TOTAL_TIMES + 1)]
+
+
+def concurso_falso(numero: int, rng: random.Random) -> Dict:
+    """
+    Monta um concurso no formato da API da Caixa.
+    
+    Args:
+        numero: Número do concurso
+        rng: Gerador usado para as dezenas, o time e o rateio
+        
+    Returns:
+        Dicionário com os campos que o sistema lê da API
+    """
+    ordem = rng.sample(range(config.MIN_NUMEROS, config.MAX_NUMEROS + 1), config.NUMEROS_SORTEADOS)
+    data = date(2008, 3, 1) + timedelta(days=2 * numero)
+    return {
+        'numero': numero,
+        'acumulado': False,
+        'dataApuracao': data.strftime('%d/%m/%Y'),
+        'dezenasSorteadasOrdemSorteio': [f'{dezena:02d}' for dezena in ordem],
+        'listaDezenas': sorted(f'{dezena:02d}' for dezena in ordem),
+        'listaRateioPremio': [
+            {
+                'descricaoFaixa': f'{acertos} acertos',
+                'faixa': 8 - acertos,
+                'numeroDeGanhadores': rng.randint(0, 50),
+                'valorPremio': round(10.0 ** (acertos - 2) * rng.random(), 2)
+            }
+            for acertos in range(7, 2, -1)
+        ] + [{'descricaoFaixa': 'Time do Coração', 'faixa': 6, 'numeroDeGanhadores': 100, 'valorPremio': 7.5}],
+        'nomeTimeCoracaoMesSorte': rng.choice(TIMES),
+        'valorArrecadado': 1000.0
+    }
+
+
+@pytest.fixture
+def banco(tmp_path, monkeypatch):
+    """Aponta o sistema para um banco SQLite vazio em um diretório temporário."""
+    caminho = str(tmp_path / 'timemania.db')
+    monkeypatch.setattr(config, 'DATABASE_PATH', caminho)
+    yield caminho
+    
+    from models.resultado_model import devolver_conexoes
+    devolver_conexoes()
+
+
+@pytest.fixture
+def historico(banco):
+    """Banco temporário com 300 concursos falsos (sementes fixas)."""
+    from models.resultado_model import ResultadoModel
+    
+    rng = random.Random(42)
+    modelo = ResultadoModel()
+    modelo.inserir_lote([concurso_falso(numero, rng) for numero in range(1, 301)])
+    return modelo
+
+
+@pytest.fixture(scope='session')
+def cliente(tmp_path_factory):
+    """
+    Cliente de teste da aplicação, sobre um banco com 300 concursos falsos.
+    
+    Os serviços das rotas guardam o caminho do banco ao serem criados, então
+    a aplicação é importada depois de apontar o config para o banco da sessão.
+    """
+    from models.resultado_model import ResultadoModel, devolver_conexoes
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, 'DATABASE_PATH', str(tmp_path_factory.mktemp('app') / 'timemania.db'))
+        rng = random.Random(42)
+        ResultadoModel().inserir_lote([concurso_falso(numero, rng) for numero in range(1, 301)])
+        devolver_conexoes()
+        
+        from app import app
+        app.config['TESTING'] = True
+        with app.test_client() as cliente:
+            yield cliente
+        devolver_conexoes()
+
+
+class ApiLocal:
+    """
+    Servidor HTTP local que imita a API da Caixa.
+    
+    GET / devolve o concurso mais recente e GET /<numero> um concurso. Cada
+    resposta tem ETag; um If-None-Match igual recebe 304. Em falhas, cada
+    caminho pode receber uma lista de status a responder antes do 200.
+    """
+    
+    def __init__(self, ultimo: int = 20, atraso: float = 0.0):
+        self.rng = random.Random(7)
+        self.concursos = {numero: concurso_falso(numero, self.rng) for numero in range(1, ultimo + 1)}
+        self.ultimo = ultimo
+        self.atraso = atraso
+        self.falhas: Dict[str, List[int]] = {}
+        self.requisicoes: Dict[str, int] = {}
+        self.respostas_304 = 0
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+        self._lock = threading.Lock()
+        
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', 0), self._criar_handler())
+        self.servidor.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.servidor.server_address[1]}'
+        self._thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+    
+    def _criar_handler(self):
+        api = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, formato, *args):
+                pass
+            
+            def do_GET(self):
+                api._responder(self)
+        
+        return Handler
+    
+    def _responder(self, handler: BaseHTTPRequestHandler):
+        caminho = handler.path.rstrip('/') or '/'
+        with self._lock:
+            self.requisicoes[caminho] = self.requisicoes.get(caminho, 0) + 1
+            self.simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self.simultaneas)
+            pendentes = self.falhas.get(caminho)
+            status_falha = pendentes.pop(0) if pendentes else None
+        
+        try:
+            if self.atraso:
+                time.sleep(self.atraso)
+            
+            if status_falha is not None:
+                handler.send_response(status_falha)
+                handler.send_header('Content-Length', '0')
+                handler.end_headers()
+                return
+            
+            numero = self.ultimo if caminho == '/' else int(caminho.lstrip('/'))
+            dados = self.concursos.get(numero)
+            if dados is None:
+                handler.send_response(404)
+                handler.send_header('Content-Length', '0')
+                handler.end_headers()
+                return
+            
+            etag = f'"{numero}-v1"'
+            if handler.headers.get('If-None-Match') == etag:
+                with self._lock:
+                    self.respostas_304 += 1
+                handler.send_response(304)
+                handler.send_header('ETag', etag)
+                handler.end_headers()
+                return
+            
+            corpo = json.dumps(dados).encode('utf-8')
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'application/json')
+            handler.send_header('Content-Length', str(len(corpo)))
+            handler.send_header('ETag', etag)
+            handler.end_headers()
+            handler.wfile.write(corpo)
+        finally:
+            with self._lock:
+                self.simultaneas -= 1
+    
+    def iniciar(self):
+        self._thread.start()
+    
+    def parar(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+@pytest.fixture
+def api_local():
+    """Servidor local no lugar da API da Caixa (20 concursos, 50 ms por resposta)."""
+    api = ApiLocal(ultimo=20, atraso=0.05)
+    api.iniciar()
+    yield api
+    api.parar()
@@ -0,0 +1,63 @@
+"""
+Testes do download de concursos contra um servidor local no lugar da API da Caixa.
+"""
+import pytest
+import config
+from services.api_caixa_service import ApiCaixaService
+from services.cache_api_service import CacheApiService
+
+
+@pytest.fixture
+def servico(banco, api_local, tmp_path, monkeypatch):
+    """Serviço apontado para o servidor local, sem espera entre tentativas."""
+    monkeypatch.setattr(config, 'API_BACKOFF', 0)
+    cache = CacheApiService(str(tmp_path / 'cache_api'), ativo=True)
+    return ApiCaixaService(api_url=api_local.url, paralelismo=4, cache=cache)
+
+
+def test_baixar_concursos_em_paralelo(servico, api_local):
+    resultados = list(servico.baixar_concursos(range(1, 13)))
+    
+    assert sorted(numero for numero, _, _ in resultados) == list(range(1, 13))
+    assert all(dados == api_local.concursos[numero] and erro is None for numero, dados, erro in resultados)
+    assert 2 <= api_local.max_simultaneas <= 4
+
+
+def test_repete_apos_5xx_e_429(servico, api_local):
+    api_local.falhas['/5'] = [503, 429]
+    
+    assert servico.baixar_concurso(5) == api_local.concursos[5]
+    assert api_local.requisicoes['/5'] == 3
+
+
+def test_desiste_apos_esgotar_as_tentativas(servico, api_local):
+    api_local.falhas['/6'] = [500] * (config.API_TENTATIVAS + 5)
+    
+    assert servico.baixar_concurso(6) is None
+    assert api_local.requisicoes['/6'] == config.API_TENTATIVAS + 1
+
+
+def test_requisicao_condicional_recebe_304(servico, api_local):
+    primeiro = servico.buscar_ultimo_concurso()
+    segundo = servico.buscar_ultimo_concurso()
+    
+    assert primeiro == segundo == api_local.concursos[api_local.ultimo]
+    assert api_local.respostas_304 == 1
+    assert servico.resultado_model.contar_resultados() == 1
+
+
+def test_concurso_encerrado_vem_do_cache(servico, api_local):
+    servico.buscar_ultimo_concurso()
+    servico.baixar_concurso(3)
+    servico.baixar_concurso(3)
+    
+    # Concurso anterior ao último: depois de gravado no cache, não há nova requisição
+    assert api_local.requisicoes['/3'] == 1
+
+
+def test_cache_nao_deixa_temporario_se_a_gravacao_falha(tmp_path):
+    cache = CacheApiService(str(tmp_path), ativo=True)
+    cache.salvar(1, {'numero': 1, 'invalido': object()})
+    
+    assert list(tmp_path.iterdir()) == []
+    assert cache.obter(1) is None
@@ -0,0 +1,139 @@
+"""
+Testes das rotas da API: validação de parâmetros, paginação e streaming.
+"""
+import json
+import numpy as np
+import pytest
+import config
+
+
+@pytest.mark.parametrize('consulta', [
+    'ultimos=0',
+    'ultimos=-5',
+    'ultimos=abc',
+    'de=2009-01-01&ate=2008-12-31',
+    'de=01/01/2009'
+])
+def test_janela_invalida_retorna_400(cliente, consulta):
+    resposta = cliente.get(f'/api/estatisticas?{consulta}')
+    
+    assert resposta.status_code == 400
+    assert resposta.get_json()['sucesso'] is False
+
+
+def test_janela_valida(cliente):
+    resposta = cliente.get('/api/estatisticas?ultimos=50')
+    
+    assert resposta.status_code == 200
+    assert resposta.get_json()['sucesso'] is True
+
+
+def test_paginacao_por_cursor_percorre_o_historico(cliente):
+    vistos = []
+    consulta = '/api/resultados?limite=70&fields=numero,dataApuracao'
+    while consulta:
+        dados = cliente.get(consulta).get_json()
+        assert all(set(r) == {'numero', 'dataApuracao'} for r in dados['resultados'])
+        vistos.extend(r['numero'] for r in dados['resultados'])
+        antes = dados['paginacao']['before']
+        consulta = f'/api/resultados?limite=70&fields=numero,dataApuracao&before={antes}' if antes else None
+    
+    assert vistos == list(range(300, 0, -1))
+
+
+def test_paginacao_volta_com_after(cliente):
+    dados = cliente.get('/api/resultados?limite=10&before=200').get_json()
+    assert [r['numero'] for r in dados['resultados']] == list(range(199, 189, -1))
+    
+    anterior = cliente.get(f"/api/resultados?limite=10&after={dados['paginacao']['after']}").get_json()
+    assert [r['numero'] for r in anterior['resultados']] == list(range(209, 199, -1))
+    assert anterior['paginacao']['after'] == 209
+
+
+def test_campos_invalidos_retornam_400(cliente):
+    assert cliente.get('/api/resultados?fields=numero,senha').status_code == 400
+
+
+def _linhas_ndjson(resposta):
+    return [json.loads(linha) for linha in resposta.data.decode().splitlines()]
+
+
+def test_stream_termina_com_linha_de_status(cliente):
+    resposta = cliente.post('/api/gerar-palpite/stream', json={'quantidade_jogos': 30, 'semente': 3})
+    linhas = _linhas_ndjson(resposta)
+    
+    assert len(linhas) == 31
+    assert linhas[-1] == {'fim': True, 'quantidade_jogos': 30, 'completo': True}
+
+
+def test_stream_sem_repeticao_esgotado_avisa_lote_incompleto(cliente, monkeypatch):
+    from routes import api_routes
+    
+    # Só 11 dezenas possíveis: há apenas 11 jogos distintos de 10 números
+    pesos = np.zeros(config.MAX_NUMEROS)
+    pesos[:11] = 1
+    monkeypatch.setattr(api_routes.timemania_service, '_blocos_estrategia', lambda *args: [(pesos, 10)])
+    
+    resposta = cliente.post('/api/gerar-palpite/stream', json={'quantidade_jogos': 50, 'sem_repeticao': True})
+    linhas = _linhas_ndjson(resposta)
+    
+    assert len({tuple(linha['numeros']) for linha in linhas[:-1]}) == len(linhas) - 1 == 11
+    assert linhas[-1] == {'fim': True, 'quantidade_jogos': 11, 'completo': False}
+
+
+@pytest.mark.parametrize('valor', ['false', 'true', 0, 1, None])
+def test_sem_repeticao_so_aceita_booleano(cliente, valor):
+    resposta = cliente.post('/api/gerar-palpite/stream', json={'quantidade_jogos': 5, 'sem_repeticao': valor})
+    
+    assert resposta.status_code == 400
+
+
+def test_conferir_lote_confere_com_conferir(cliente):
+    palpites = [{'numeros': list(range(1, 11))}, {'numeros': list(range(31, 43)), 'time_coracao': 'TIME 05        UF'}]
+    lote = cliente.post('/api/conferir-lote', json={'palpites': palpites, 'inicio': 250, 'detalhar': True}).get_json()
+    
+    assert lote['total_concursos'] == 51
+    assert lote['premiacoes']
+    for premiacao in lote['premiacoes']:
+        palpite = palpites[premiacao['palpite']]
+        individual = cliente.post('/api/conferir', json={
+            'numeros': palpite['numeros'],
+            'time_coracao': palpite.get('time_coracao', '-'),
+            'numero_concurso': premiacao['concurso']
+        }).get_json()
+        assert individual['acertos'] == premiacao['acertos']
+        assert individual['premiado']
+
+
+def test_conferir_lote_detalhar_so_aceita_booleano(cliente):
+    resposta = cliente.post('/api/conferir-lote', json={'palpites': [{'numeros': list(range(1, 11))}], 'detalhar': 'false'})
+    
+    assert resposta.status_code == 400
+
+
+@pytest.mark.parametrize('concurso', ['abc', '12a', -3, 1.5, True, [12]])
+def test_conferir_concurso_invalido_retorna_400(cliente, concurso):
+    resposta = cliente.post('/api/conferir', json={
+        'numeros': list(range(1, 11)), 'time_coracao': 'TIME 01        UF', 'numero_concurso': concurso
+    })
+    
+    assert resposta.status_code == 400
+    assert resposta.get_json()['mensagem'] == 'Número do concurso inválido'
+
+
+def test_conferir_aceita_concurso_como_texto(cliente):
+    corpo = {'numeros': list(range(1, 11)), 'time_coracao': 'TIME 01        UF'}
+    
+    como_texto = cliente.post('/api/conferir', json={**corpo, 'numero_concurso': '120'})
+    inexistente = cliente.post('/api/conferir', json={**corpo, 'numero_concurso': 999})
+    
+    assert como_texto.status_code == 200 and como_texto.get_json()['concurso'] == 120
+    assert inexistente.status_code == 404
+
+
+def test_conferir_numeros_invalidos_retorna_400(cliente):
+    resposta = cliente.post('/api/conferir', json={
+        'numeros': ['a'] * 10, 'time_coracao': 'TIME 01        UF', 'numero_concurso': 120
+    })
+    
+    assert resposta.status_code == 400
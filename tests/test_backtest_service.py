@@ -0,0 +1,35 @@
+"""
+Testes do backtest das estratégias.
+"""
+import config
+from services.backtest_service import BacktestService
+from services.timemania_service import TimemaniaService
+
+
+def test_backtest_nao_depende_da_quantidade_de_processos(historico):
+    servico = BacktestService()
+    parametros = dict(jogos_por_concurso=5, inicio=180, semente=9)
+    
+    sequencial = servico.executar(processos=1, **parametros)
+    paralelo = servico.executar(processos=2, **parametros)
+    
+    assert sequencial == paralelo
+    assert sequencial['total_concursos'] == 121
+    for resumo in sequencial['estrategias'].values():
+        assert resumo['jogos'] == 121 * 5
+        assert sum(resumo['acertos'].values()) == resumo['jogos']
+    assert set(sequencial['estrategias']) == set(config.ESTRATEGIAS)
+
+
+def test_backtest_usa_as_estrategias_de_gerar_palpite(historico, monkeypatch):
+    chamadas = []
+    gerar_numeros = TimemaniaService.gerar_numeros
+    
+    def registrar(self, estrategia, quantidade, rankings):
+        chamadas.append(estrategia)
+        return gerar_numeros(self, estrategia, quantidade, rankings)
+    
+    monkeypatch.setattr(TimemaniaService, 'gerar_numeros', registrar)
+    BacktestService().executar(estrategias=['coocorrencia'], jogos_por_concurso=3, inicio=291, semente=1, processos=1)
+    
+    assert chamadas == ['coocorrencia'] * 30
@@ -0,0 +1,47 @@
+"""
+Testes das máscaras de 80 bits e da contagem de acertos por máscara.
+"""
+import numpy as np
+from models.mascara_dezenas import (
+    contar_bits, contar_bits_palavras, criar_mascara, empacotar_incidencia,
+    mascara_das_palavras, numeros_da_mascara, palavras_da_mascara
+)
+from services.estatistica_service import EstatisticaService
+
+
+def test_mascara_ida_e_volta():
+    numeros = [1, 2, 33, 64, 65, 80]
+    mascara = criar_mascara(numeros)
+    
+    assert numeros_da_mascara(mascara) == numeros
+    assert contar_bits(mascara) == len(numeros)
+    assert mascara_das_palavras(palavras_da_mascara(mascara)) == mascara
+
+
+def test_incidencia_empacotada_conta_como_a_intersecao():
+    rng = np.random.default_rng(0)
+    incidencia = np.zeros((200, 80), dtype=np.uint8)
+    for linha in incidencia:
+        linha[rng.choice(80, 7, replace=False)] = 1
+    conjunto = rng.choice(80, 12, replace=False) + 1
+    
+    mascaras = empacotar_incidencia(incidencia)
+    intersecao = mascaras & palavras_da_mascara(criar_mascara(conjunto.tolist()))
+    
+    assert [mascara_das_palavras(m) for m in mascaras] == [
+        criar_mascara((np.flatnonzero(linha) + 1).tolist()) for linha in incidencia
+    ]
+    assert np.array_equal(contar_bits_palavras(intersecao), incidencia[:, conjunto - 1].sum(axis=1))
+
+
+def test_combinacao_confere_com_o_historico(historico):
+    resultados = historico.buscar_todos()
+    # Três dezenas de um concurso gravado: o conjunto saiu inteiro ao menos uma vez
+    numeros = [int(d) for d in resultados[100]['listaDezenas'][:3]]
+    
+    combinacao = EstatisticaService().calcular_combinacao(numeros)
+    
+    acertos = [len(set(numeros) & {int(d) for d in r['listaDezenas']}) for r in resultados]
+    assert combinacao['concursos'] == [r['numero'] for r, a in zip(resultados, acertos) if a == 3]
+    assert combinacao['frequencia'] == acertos.count(3) >= 1
+    assert combinacao['acertos'] == {str(q): acertos.count(q) for q in range(4)}
@@ -0,0 +1,67 @@
+"""
+Testes do modelo de resultados: agregados, paginação e versão dos dados.
+"""
+import random
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+from conftest import concurso_falso
+from models.resultado_model import _snapshots
+
+
+def test_escrita_de_outro_processo_muda_a_versao(historico, banco):
+    versao = historico.versao_dados()
+    snapshot = historico.obter_snapshot()
+    assert snapshot.versao == versao
+    
+    # Outro processo: grava direto no banco, sem passar pelos caches deste
+    with sqlite3.connect(banco) as outro:
+        outro.execute(
+            "UPDATE estatisticas_estado SET valor = valor + 1 WHERE chave = 'geracao_dados'"
+        )
+    
+    assert historico.versao_dados() != versao
+    assert historico.obter_snapshot() is not snapshot
+
+
+def test_versao_sem_snapshot_acompanha_o_banco(historico, banco):
+    versao = historico.versao_dados()
+    _snapshots.pop(banco, None)
+    
+    # Um segundo processo (como outro worker) grava um concurso novo
+    codigo = (
+        'import random; from conftest import concurso_falso; '
+        'import config; config.DATABASE_PATH = sys.argv[1]; '
+        'from models.resultado_model import ResultadoModel; '
+        'ResultadoModel().inserir_lote([concurso_falso(301, random.Random(1))])'
+    )
+    subprocess.run(
+        [sys.executable, '-c', 'import sys; ' + codigo, banco],
+        cwd=str(Path(__file__).parent), check=True
+    )
+    
+    nova = historico.versao_dados()
+    assert nova[0] > versao[0]
+    assert nova[1:] == (301, 301)
+    assert historico.obter_snapshot().versao == nova
+
+
+def _ordenar(estatisticas):
+    return {chave: sorted(valor) if isinstance(valor, list) else valor for chave, valor in estatisticas.items()}
+
+
+def test_agregados_incrementais_batem_com_a_reconstrucao(historico):
+    rng = random.Random(3)
+    # Substitui concursos já gravados e acrescenta novos, em lotes separados
+    historico.inserir_lote([concurso_falso(numero, rng) for numero in (5, 120, 300)])
+    historico.inserir_lote([concurso_falso(numero, rng) for numero in range(295, 311)])
+    historico.inserir(concurso_falso(150, rng))
+    
+    incrementais = _ordenar(historico.obter_estatisticas())
+    pares = sorted(historico.obter_pares())
+    assert incrementais['total_concursos'] == 310
+    
+    assert historico.reconstruir_estatisticas()
+    assert _ordenar(historico.obter_estatisticas()) == incrementais
+    assert sorted(historico.obter_pares()) == pares
@@ -0,0 +1,49 @@
+"""
+Testes da simulação de Monte Carlo das estratégias.
+"""
+import pytest
+from services.simulacao_service import SimulacaoService
+
+
+@pytest.fixture
+def servico(historico):
+    return SimulacaoService()
+
+
+def test_simulacao_nao_depende_da_quantidade_de_processos(servico, monkeypatch):
+    monkeypatch.setattr(SimulacaoService, 'TAMANHO_TRECHO', 300)
+    parametros = dict(estrategias=['agressiva', 'coocorrencia'], sorteios=900, jogos_por_sorteio=2, semente=4)
+    
+    sequencial = servico.executar(processos=1, **parametros)
+    paralelo = servico.executar(processos=3, **parametros)
+    
+    assert sequencial == paralelo
+    assert list(sequencial['estrategias']) == ['aleatoria', 'agressiva', 'coocorrencia']
+    assert all(resumo['jogos'] == 1800 for resumo in sequencial['estrategias'].values())
+
+
+def test_intervalo_usa_a_variancia_por_sorteio():
+    # 100 sorteios, 10 jogos cada: todos premiados em 10 sorteios, nenhum nos demais
+    agrupado = SimulacaoService._intervalo_proporcao(100, 10 * 10 ** 2, 100, 10, 1.96)
+    # Mesma proporção com os sucessos espalhados, um por sorteio
+    espalhado = SimulacaoService._intervalo_proporcao(100, 100, 100, 10, 1.96)
+    independente = SimulacaoService._intervalo_proporcao(100, 100, 1000, 1, 1.96)
+    
+    assert agrupado[0] < espalhado[0] and agrupado[1] > espalhado[1]
+    assert espalhado == independente
+    assert independente[0] < 0.1 < independente[1]
+
+
+def test_intervalo_da_media_considera_jogos_do_mesmo_sorteio(servico):
+    # 'atrasados' tira os 10 números de 20 dezenas: os jogos de um sorteio acertam juntos
+    resumo = servico.executar(estrategias=['atrasados'], sorteios=400, jogos_por_sorteio=5, semente=2, processos=1)
+    atrasados = resumo['estrategias']['atrasados']
+    
+    por_acertos = [atrasados['acertos'][str(q)]['jogos'] for q in range(8)]
+    media = atrasados['media_acertos']['valor']
+    variancia_jogo = sum(n * (q - media) ** 2 for q, n in enumerate(por_acertos)) / (atrasados['jogos'] - 1)
+    margem_independente = 1.96 * (variancia_jogo / atrasados['jogos']) ** 0.5
+    
+    inferior, superior = atrasados['media_acertos']['intervalo']
+    assert inferior < media < superior
+    assert superior - media > 1.2 * margem_independente
@@ -0,0 +1,25 @@
+"""
+Testes da geração de palpites em lote.
+"""
+import numpy as np
+import pytest
+import config
+from services.timemania_service import TimemaniaService
+
+
+@pytest.fixture
+def servico(historico):
+    return TimemaniaService()
+
+
+@pytest.mark.parametrize('estrategia', config.ESTRATEGIAS)
+def test_lote_com_semente_se_repete(servico, estrategia):
+    primeiro = servico.gerar_lote(estrategia, quantidade_numeros=10, quantidade_jogos=500, semente=11)
+    segundo = servico.gerar_lote(estrategia, quantidade_numeros=10, quantidade_jogos=500, semente=11)
+    numeros = primeiro['numeros']
+    
+    assert np.array_equal(numeros, segundo['numeros'])
+    assert primeiro['times'] == segundo['times']
+    assert numeros.shape == (500, 10)
+    assert numeros.min() >= config.MIN_NUMEROS and numeros.max() <= config.MAX_NUMEROS
+    assert (np.diff(numeros.astype(int), axis=1) > 0).all()